@@ -6,6 +6,7 @@
     "author": "Coulibaly Yadjiman",
     "website": "http://www.example.com",
     "depends": ["base", "web", "hr", "stock", "account", "fleet", "bus", "mail"],
+    "external_dependencies": {"python": ["numpy"]},
     "pre_init_hook": "pre_init_hook",
     "post_init_hook": "post_init_hook",
     "data": [
@@ -1,20 +1,49 @@
 from odoo import http, _, fields 
 from odoo.fields import Date
-from dateutil.relativedelta import relativedelta
 from odoo.http import request
 from odoo.exceptions import AccessError, ValidationError
 import json
 from odoo.osv import expression
 from werkzeug.exceptions import BadRequest
 import base64  # Pour encoder/décoder les fichiers
+from datetime import datetime
 import logging
-from .common import Response, handle_api_errors, json_response, CORS_HEADERS
+from .common import Response, conditional_get, handle_api_errors, json_dumps, json_response, CORS_HEADERS
+from .cube import cube
+from .dashboard import (
+    SERIES_GROUPBY,
+    dashboard_stats,
+    etat_summary,
+    grouped_counts,
+    monthly_series,
+    net_book_value,
+)
+from .export import NDJSON_CONTENT_TYPE, iter_ndjson
+from .pagination import page_envelope, search_page, wants_pagination
+from .serializers import (
+    AssetDetailSerializer,
+    AssetImportSerializer,
+    AssetSerializer,
+    DemandeSerializer,
+    PanneSerializer,
+    PerteManagerSerializer,
+    PerteSerializer,
+    versioned_image_url,
+)
+from .sync import asset_changes
 
 _logger = logging.getLogger(__name__)
 
+# Champs acceptés dans le modèle de /api/patrimoine/assets/clone.
+CLONE_TEMPLATE_FIELDS = {
+    "name", "subcategory_id", "date_acquisition", "valeur_acquisition", "etat",
+    "department_id", "employee_id", "location_id", "fournisseur", "custom_values",
+}
+
 
 class PatrimoineAssetController(http.Controller):
     @http.route("/api/patrimoine/categories", auth="public", type="http", methods=["GET"], csrf=False)
+    @conditional_get("asset.category", "asset.subcategory")
     def list_categories(self, **kw):
 
         try:
@@ -30,8 +59,8 @@ class PatrimoineAssetController(http.Controller):
                     "type": cat.type,
                     "filter_type": cat.code,  # Pour le filtrage frontend
                     "image": (
-                        f"/web/image/asset.category/{cat.id}/image"
-                        if cat.image
+                        versioned_image_url("asset.category", cat.id, cat.image_checksum, "image_128")
+                        if cat.has_image
                         else None
                     ),
                     "subcategories": [
@@ -42,7 +71,7 @@ class PatrimoineAssetController(http.Controller):
                 for cat in categories
             ]
             return Response(
-                json.dumps(category_data), headers={"Content-Type": "application/json"}
+                json_dumps(category_data), headers={"Content-Type": "application/json"}
             )
         except Exception as e:
             _logger.error("Error listing categories: %s", str(e))
@@ -74,7 +103,7 @@ class PatrimoineAssetController(http.Controller):
             demande = request.env['patrimoine.demande_materiel'].browse(demande_id)
             if not demande.exists():
                 return Response(
-                    json.dumps({"error": "Demande not found"}),
+                    json_dumps({"error": "Demande not found"}),
                     status=404,
                     headers=CORS_HEADERS,
                 )
@@ -93,7 +122,7 @@ class PatrimoineAssetController(http.Controller):
                 ],
             }
 
-            return Response(json.dumps(data), headers=CORS_HEADERS)
+            return Response(json_dumps(data), headers=CORS_HEADERS)
         except Exception as e:
             _logger.error("Error getting demande details: %s", str(e))
             return Response(status=500, headers=CORS_HEADERS)
@@ -113,7 +142,7 @@ class PatrimoineAssetController(http.Controller):
             category = request.env["asset.category"].browse(category_id)
             if not category.exists():
                 return Response(
-                    json.dumps({
+                    json_dumps({
                         "status": "error",
                         "code": 404,
                         "message": "Category not found"
@@ -129,7 +158,9 @@ class PatrimoineAssetController(http.Controller):
         for sub in subcategories:
             # Construit une URL valide vers l'image si elle existe
             image_url = (
-                f"/web/image/asset.subcategory/{sub.id}/image" if sub.image else None
+                versioned_image_url("asset.subcategory", sub.id, sub.image_checksum, "image_256")
+                if sub.has_image
+                else None
             )
 
             subcategory_data.append(
@@ -162,10 +193,10 @@ class PatrimoineAssetController(http.Controller):
             )
 
         return Response(
-            json.dumps({
+            json_dumps({
                 "status": "success",
                 "data": subcategory_data
-            }, default=str),
+            }),
             headers=CORS_HEADERS
         )
 
@@ -176,56 +207,17 @@ class PatrimoineAssetController(http.Controller):
         methods=["GET"])
     @handle_api_errors
     def list_items(self, subcategory_id, **kw):
-        items = request.env["patrimoine.asset"].search(
-            [("subcategory_id", "=", subcategory_id)]
+        items, next_cursor = search_page(
+            request.env["patrimoine.asset"],
+            [("subcategory_id", "=", subcategory_id)],
+            kw,
         )
-        item_data = []
-        for item in items:
-            item_data.append(
-                {
-                    "id": item.id,
-                    "name": item.name,
-                    "code": item.code,
-                    "subcategory_id": item.subcategory_id.id,
-                    "subcategory_name": item.subcategory_id.name,
-                    "category_id": item.category_id.id,
-                    "category_name": item.category_id.name,
-                    "image": (
-                        f"/web/image/patrimoine.asset/{item.id}/image"
-                        if item.image
-                        else None
-                    ),
-                    "custom_values": item.custom_values,
-                    "status": item.etat,
-                    "assigned_to": (
-                        item.employee_id.name if item.employee_id else None
-                    ),
-                    "assigned_to_id": (
-                        item.employee_id.id if item.employee_id else None
-                    ),
-                    "department": (
-                        item.department_id.name if item.department_id else None
-                    ),
-                    "department_id": (
-                        item.department_id.id if item.department_id else None
-                    ),
-                    "location": item.location_id.name if item.location_id else None,
-                    "location_id": (
-                        item.location_id.id if item.location_id else None
-                    ),
-                    "acquisition_date": (
-                        item.date_acquisition.strftime("%Y-%m-%d")
-                        if item.date_acquisition
-                        else None
-                    ),
-                    "acquisition_value": item.valeur_acquisition,
-                }
-            )
+        item_data = AssetSerializer(request.env, "item", fields=kw.get("fields")).serialize(items)
+        payload = {"status": "success", "data": item_data}
+        if wants_pagination(kw):
+            payload = page_envelope(item_data, next_cursor)
         return Response(
-            json.dumps({
-                "status": "success",
-                "data": item_data
-            }, default=str),
+            json_dumps(payload),
             headers=CORS_HEADERS
         )
 
@@ -372,15 +364,8 @@ class PatrimoineAssetController(http.Controller):
                     }
                 )
 
-            # 6. Créer une entrée dans la fiche de vie
-            request.env["patrimoine.fiche.vie"].create(
-                {
-                    "asset_id": new_item.id,
-                    "action": "creation",
-                    "description": f"Création de l'item {new_item.name}",
-                    "utilisateur_id": request.env.uid,
-                }
-            )
+            # 6. L'entrée « création » de la fiche de vie est écrite par
+            # patrimoine.asset.create.
 
             return {
                 "status": "success",
@@ -403,55 +388,26 @@ class PatrimoineAssetController(http.Controller):
         # AJOUTEZ CETTE LIGNE POUR LE TEST
 
         try:
-            # AUCUN FILTRE APPLIQUÉ DANS CETTE ROUTE, elle renvoie tout.
-            assets = request.env["patrimoine.asset"].search([])
+            # AUCUN FILTRE APPLIQUÉ DANS CETTE ROUTE, elle renvoie tout
+            # (ou une page si 'limit'/'cursor' sont fournis).
+            assets, next_cursor = search_page(request.env["patrimoine.asset"], [], kw)
             _logger.info(f"list_all_assets: {len(assets)} assets trouvés (pas de filtre).")
 
-            asset_data = []
-            for asset in assets:
-                date_acquisition_str = (
-                    asset.date_acquisition.strftime("%Y-%m-%d")
-                    if asset.date_acquisition
-                    else None
-                )
-                details = {}
-                image_url = (
-                    f"/web/image/patrimoine.asset/{asset.id}/image" if asset.image else None
-                )
-
-                asset_data.append(
-                    {
-                        "id": asset.id,
-                        "name": asset.name,
-                        "image": image_url,
-                        "code": asset.code,
-                        "type": asset.type,
-                        "location": (asset.location_id.name if asset.location_id else None),
-                        "category_general_name": (
-                            asset.subcategory_id.category_id.name
-                            if asset.subcategory_id and asset.subcategory_id.category_id
-                            else None
-                        ),
-                        "category_detailed_name": (
-                            asset.subcategory_id.name if asset.subcategory_id else None
-                        ),
-                        "acquisitionDate": date_acquisition_str,
-                        "value": asset.valeur_acquisition,
-                        "status": asset.etat,
-                        "assignedTo": (
-                            asset.employee_id.name if asset.employee_id else None
-                        ),
-                        "details": details,
-                        "customValues": asset.custom_values or {},
-                    }
-                )
+            asset_data = AssetSerializer(request.env, "list", fields=kw.get("fields")).serialize(assets)
+            payload = page_envelope(asset_data, next_cursor) if wants_pagination(kw) else asset_data
             return Response(
-                json.dumps(asset_data), headers={"Content-Type": "application/json"}
+                json_dumps(payload), headers={"Content-Type": "application/json"}
+            )
+        except ValidationError as e:
+            return Response(
+                json_dumps({"status": "error", "message": str(e)}),
+                status=400,
+                headers={"Content-Type": "application/json"},
             )
         except Exception as e:
             _logger.error("Error listing ALL assets: %s", str(e))
             return Response(
-                json.dumps({"status": "error", "message": str(e)}),
+                json_dumps({"status": "error", "message": str(e)}),
                 status=500,
                 headers={"Content-Type": "application/json"},
             )
@@ -502,63 +458,34 @@ class PatrimoineAssetController(http.Controller):
                     _logger.warning(
                         f"list_assets_filtered: Sous-catégorie '{subcategory_code}' non trouvée par code. Retourne une liste vide pour les assets."
                     )
+                    empty = page_envelope([], None) if wants_pagination(kw) else []
                     return Response(
-                        json.dumps([]), headers={"Content-Type": "application/json"}
+                        json_dumps(empty), headers={"Content-Type": "application/json"}
                     )
 
             _logger.info(
                 f"list_assets_filtered: Domaine FINAL utilisé pour la recherche sur patrimoine.asset: {domain}"
             )
-            assets = request.env["patrimoine.asset"].search(domain)
+            assets, next_cursor = search_page(request.env["patrimoine.asset"], domain, kw)
             _logger.info(
                 f"list_assets_filtered: {len(assets)} assets trouvés avec le domaine final {domain}."
             )
 
-            asset_data = []
-            for asset in assets:
-                date_acquisition_str = (
-                    asset.date_acquisition.strftime("%Y-%m-%d")
-                    if asset.date_acquisition
-                    else None
-                )
-                details = {}
-                image_url = (
-                    f"/web/image/patrimoine.asset/{asset.id}/image" if asset.image else None
-                )
-
-                asset_data.append(
-                    {
-                        "id": asset.id,
-                        "name": asset.name,
-                        "image": image_url,
-                        "code": asset.code,
-                        "type": asset.type,
-                        "location": (asset.location_id.name if asset.location_id else None),
-                        "category_general_name": (
-                            asset.subcategory_id.category_id.name
-                            if asset.subcategory_id and asset.subcategory_id.category_id
-                            else None
-                        ),
-                        "category_detailed_name": (
-                            asset.subcategory_id.name if asset.subcategory_id else None
-                        ),
-                        "acquisitionDate": date_acquisition_str,
-                        "value": asset.valeur_acquisition,
-                        "status": asset.etat,
-                        "assignedTo": (
-                            asset.employee_id.name if asset.employee_id else None
-                        ),
-                        "details": details,
-                        "customValues": asset.custom_values or {},
-                    }
-                )
+            asset_data = AssetSerializer(request.env, "list", fields=kw.get("fields")).serialize(assets)
+            payload = page_envelope(asset_data, next_cursor) if wants_pagination(kw) else asset_data
+            return Response(
+                json_dumps(payload), headers={"Content-Type": "application/json"}
+            )
+        except ValidationError as e:
             return Response(
-                json.dumps(asset_data), headers={"Content-Type": "application/json"}
+                json_dumps({"status": "error", "message": str(e)}),
+                status=400,
+                headers={"Content-Type": "application/json"},
             )
         except Exception as e:
             _logger.error("Error listing filtered assets: %s", str(e))
             return Response(
-                json.dumps({"status": "error", "message": str(e)}),
+                json_dumps({"status": "error", "message": str(e)}),
                 status=500,
                 headers={"Content-Type": "application/json"},
             )
@@ -585,55 +512,22 @@ class PatrimoineAssetController(http.Controller):
                     domain.append(('subcategory_id', '=', subcat.id))
 
             _logger.info(f"Domaine de recherche final: {domain}")
-            assets = request.env['patrimoine.asset'].search(domain)
+            assets, next_cursor = search_page(request.env['patrimoine.asset'], domain, kw)
 
-            details = {}
-            asset_data = []
-            for asset in assets:
-                image_url = f'/web/image/patrimoine.asset/{asset.id}/image' if asset.image else None
-
-                asset_data.append(
-                    {
-                        "id": asset.id,
-                        "name": asset.name,
-                        "code": asset.code,
-                        "image": image_url,
-                        "status": asset.etat,
-                        "type": asset.type,
-                        "category_general_name": (
-                            asset.subcategory_id.category_id.name
-                            if asset.subcategory_id and asset.subcategory_id.category_id
-                            else None
-                        ),
-                        "category_detailed_name": (
-                            asset.subcategory_id.name if asset.subcategory_id else None
-                        ),
-                        "location": (
-                            asset.location_id.name if asset.location_id else None
-                        ),
-                        "acquisitionDate": (
-                            asset.date_acquisition.strftime("%Y-%m-%d")
-                            if asset.date_acquisition
-                            else None
-                        ),
-                        "value": asset.valeur_acquisition,
-                        "assignedTo": (
-                            asset.employee_id.name if asset.employee_id else None
-                        ),
-                        "assigned_to_id": (
-                            asset.employee_id.id if asset.employee_id else None
-                        ),
-                        "details": details,
-                        "customValues": asset.custom_values or {},
-                    }
-                )
-
-            return Response(json.dumps(asset_data), headers={'Content-Type': 'application/json'})
+            asset_data = AssetSerializer(request.env, "list", fields=kw.get("fields")).serialize(assets)
+            payload = page_envelope(asset_data, next_cursor) if wants_pagination(kw) else asset_data
+            return Response(json_dumps(payload), headers={'Content-Type': 'application/json'})
 
+        except ValidationError as e:
+            return Response(
+                json_dumps({'status': 'error', 'message': str(e)}),
+                status=400,
+                headers={'Content-Type': 'application/json'}
+            )
         except Exception as e:
             _logger.error(f"Erreur lors de la récupération des matériels filtrés: {e}")
             return Response(
-                json.dumps({'status': 'error', 'message': str(e)}), 
+                json_dumps({'status': 'error', 'message': str(e)}), 
                 status=500,
                 headers={'Content-Type': 'application/json'}
             )
@@ -645,31 +539,136 @@ class PatrimoineAssetController(http.Controller):
         try:
             domain = [('department_id', '=', department_id)]
 
-            assets = request.env["patrimoine.asset"].search(domain)
+            assets, next_cursor = search_page(request.env["patrimoine.asset"], domain, kw)
             _logger.info(f"list_assets_by_department: {len(assets)} assets trouvés pour le département {department_id}.")
 
-            asset_data = []
-            for asset in assets:
-                date_acquisition_str = (asset.date_acquisition.strftime("%Y-%m-%d") if asset.date_acquisition else None)
-                details = {} 
-                image_url = f"/web/image/patrimoine.asset/{asset.id}/image" if asset.image else None
-
-                asset_data.append({
-                    "id": asset.id, "name": asset.name, "image": image_url, "code": asset.code, "type": asset.type, 
-                    "location": (asset.location_id.name if asset.location_id else None),
-                    "category_general_name": (asset.subcategory_id.category_id.name if asset.subcategory_id and asset.subcategory_id.category_id else None),
-                    "category_detailed_name": (asset.subcategory_id.name if asset.subcategory_id else None),
-                    "acquisitionDate": date_acquisition_str, "value": asset.valeur_acquisition, "status": asset.etat,
-                    "assignedTo": (asset.employee_id.name if asset.employee_id else None), 
-                    "department": (asset.department_id.name if asset.department_id else None), 
-                    "department_id": (asset.department_id.id if asset.department_id else None), # Inclure l'ID du département
-                    "details": details, 
-                    "customValues": asset.custom_values or {}
-                })
-            return Response(json.dumps(asset_data), headers={"Content-Type": "application/json"})
+            asset_data = AssetSerializer(request.env, "list", fields=kw.get("fields")).serialize(assets)
+            payload = page_envelope(asset_data, next_cursor) if wants_pagination(kw) else asset_data
+            return Response(json_dumps(payload), headers={"Content-Type": "application/json"})
+        except ValidationError as e:
+            return Response(json_dumps({'status': 'error', 'message': str(e)}), status=400, headers={"Content-Type": "application/json"})
         except Exception as e:
             _logger.error("Error listing assets by department: %s", str(e))
-            return Response(json.dumps({'status': 'error', 'message': str(e)}), status=500, headers={"Content-Type": "application/json"})
+            return Response(json_dumps({'status': 'error', 'message': str(e)}), status=500, headers={"Content-Type": "application/json"})
+
+    @http.route("/api/patrimoine/assets/changes", auth="user", type="http", methods=["GET"])
+    @handle_api_errors
+    def list_asset_changes(self, since=None, **kw):
+        """
+        Synchronisation différentielle : biens créés/modifiés depuis ``since``
+        et identifiants des biens supprimés (``deleted``). Le client rappelle la
+        route avec ``next_since`` tant que ``has_more`` est vrai.
+        """
+        payload = asset_changes(request.env, since, kw.get("limit"), kw.get("fields"))
+        return Response(json_dumps(payload), headers=CORS_HEADERS)
+
+    @http.route("/api/patrimoine/assets/export.ndjson", auth="user", type="http", methods=["GET"])
+    @handle_api_errors
+    def export_assets_ndjson(self, **kw):
+        """
+        Export du registre complet en NDJSON (un bien par ligne), envoyé en flux.
+        Accepte les filtres de /assets/filter (status, type, departmentId) et ``fields``.
+        """
+        domain = []
+        if kw.get('status'):
+            domain.append(('etat', '=', kw['status']))
+        if kw.get('type'):
+            domain.append(('type', '=', kw['type']))
+        if kw.get('departmentId'):
+            domain.append(('department_id', '=', int(kw['departmentId'])))
+
+        # Valide ``fields`` avant d'envoyer les en-têtes : une erreur reste un 400.
+        AssetSerializer(request.env, "list", fields=kw.get("fields"))
+        body = iter_ndjson(
+            request.env.registry,
+            request.env.uid,
+            dict(request.env.context),
+            domain,
+            fields=kw.get("fields"),
+        )
+        return Response(
+            body,
+            headers={
+                "Content-Type": NDJSON_CONTENT_TYPE,
+                "Content-Disposition": 'attachment; filename="patrimoine_assets.ndjson"',
+            },
+            direct_passthrough=True,
+        )
+
+    @http.route("/api/patrimoine/assets/clone", auth="user", type="http", methods=["POST"], csrf=False)
+    @handle_api_errors
+    def clone_assets(self, **kw):
+        """
+        Crée ``quantity`` biens identiques en une fois. Le modèle est soit un
+        bien existant (``template_id``), soit des valeurs (``template``, plus
+        ``specific`` pour le modèle d'extension du type).
+        Renvoie l'identifiant et le code de chaque bien créé.
+        """
+        data = json.loads(request.httprequest.data or b"{}")
+        try:
+            quantity = int(data.get("quantity") or 0)
+        except (TypeError, ValueError):
+            raise ValidationError("La quantité doit être un entier.")
+        assets_model = request.env["patrimoine.asset"]
+        if data.get("template_id"):
+            template = assets_model.browse(int(data["template_id"])).exists()
+            if not template:
+                return json_response({"status": "error", "message": "Bien modèle introuvable"}, status=404)
+            assets = template.action_clone(quantity)
+        else:
+            template = data.get("template") or {}
+            unknown = set(template) - CLONE_TEMPLATE_FIELDS
+            if unknown:
+                raise ValidationError("Champs inconnus : " + ", ".join(sorted(unknown)))
+            if not template.get("name") or not template.get("subcategory_id"):
+                raise ValidationError("Les champs name et subcategory_id sont obligatoires.")
+            specific = data.get("specific") or {}
+            if specific:
+                # Seuls les champs propres au modèle d'extension du type sont acceptés.
+                subcategory = request.env["asset.subcategory"].browse(int(template["subcategory_id"]))
+                allowed = assets_model._clone_extension_fields(subcategory.category_id.type)
+                unknown = set(specific) - allowed
+                if unknown:
+                    raise ValidationError("Champs inconnus : " + ", ".join(sorted(unknown)))
+            assets = assets_model.create_copies(template, quantity, specific)
+        created = [
+            {"id": row["id"], "code": row["code"]} for row in assets.read(["code"])
+        ]
+        return json_response({"status": "success", "count": len(created), "data": created}, status=201)
+
+    @http.route("/api/patrimoine/assets/import", auth="user", type="http", methods=["POST"], csrf=False)
+    @handle_api_errors
+    def import_assets(self, **post):
+        """
+        Import en masse (CSV ou XLSX, champ multipart ``file``). Le fichier est
+        traité en arrière-plan par lots ; suivre l'avancement avec
+        GET /api/patrimoine/assets/import/<id>.
+        """
+        upload = request.httprequest.files.get("file")
+        if not upload:
+            raise ValidationError("Le fichier à importer (champ « file ») est requis.")
+        vals = {
+            "name": upload.filename or "import.csv",
+            "file": base64.b64encode(upload.read()),
+        }
+        if post.get("chunk_size"):
+            vals["chunk_size"] = max(int(post["chunk_size"]), 1)
+        asset_import = request.env["patrimoine.asset.import"].create(vals)
+        asset_import.action_queue()
+        data = AssetImportSerializer(request.env, "status").serialize_one(asset_import)
+        return json_response({"status": "success", "data": data}, status=202)
+
+    @http.route("/api/patrimoine/assets/import/<int:import_id>", auth="user", type="http", methods=["GET"])
+    @handle_api_errors
+    def get_asset_import(self, import_id, **kw):
+        """Avancement et erreurs par ligne d'un import de biens."""
+        asset_import = request.env["patrimoine.asset.import"].browse(import_id)
+        if not asset_import.exists():
+            return json_response({"status": "error", "message": "Import introuvable"}, status=404)
+        data = AssetImportSerializer(request.env, "status", fields=kw.get("fields")).serialize_one(
+            asset_import
+        )
+        return json_response({"status": "success", "data": data})
 
     @http.route('/api/patrimoine/assets', auth="user", type="http", methods=["POST"], csrf=False)
     def create_asset(self, **post):
@@ -741,24 +740,19 @@ class PatrimoineAssetController(http.Controller):
                     specific_data['kilometrage'] = float(specific_data['kilometrage'])
                 request.env["patrimoine.asset.vehicule"].create(specific_data)
 
-            # 5. Créer une entrée dans la fiche de vie
-            request.env["patrimoine.fiche.vie"].create({
-                "asset_id": new_asset.id,
-                "action": "creation",
-                "description": f"Création de l'asset {new_asset.name}",
-                "utilisateur_id": request.env.uid,
-            })
+            # 5. L'entrée « création » de la fiche de vie est écrite par
+            # patrimoine.asset.create.
 
             # 6. Retourner une réponse de succès
             return Response(
-                json.dumps({"status": "success", "asset_id": new_asset.id, "asset_code": new_asset.code}),
+                json_dumps({"status": "success", "asset_id": new_asset.id, "asset_code": new_asset.code}),
                 headers={"Content-Type": "application/json"},
             )
 
         except Exception as e:
             _logger.error("Erreur lors de la création de l'asset: %s", str(e))
             return Response(
-                json.dumps({"status": "error", "message": str(e)}),
+                json_dumps({"status": "error", "message": str(e)}),
                 status=500,
                 headers={"Content-Type": "application/json"},
             )
@@ -872,7 +866,7 @@ class PatrimoineAssetController(http.Controller):
         asset = request.env["patrimoine.asset"].browse(asset_id)
         if not asset.exists():
             return Response(
-                json.dumps({
+                json_dumps({
                     "status": "error",
                     "code": 404,
                     "message": "Asset not found"
@@ -881,13 +875,6 @@ class PatrimoineAssetController(http.Controller):
                 headers=CORS_HEADERS
             )
 
-        # Conversion de la date d'acquisition
-        date_acquisition_str = (
-            asset.date_acquisition.strftime("%Y-%m-%d")
-            if asset.date_acquisition
-            else None
-        )
-
         # Récupération des détails spécifiques selon le type
         details = {}
         if asset.type == "informatique":
@@ -925,80 +912,124 @@ class PatrimoineAssetController(http.Controller):
             if details_record:
                 details = details_record.read(["categorie_mobilier", "etat_conservation"])[0]
 
-        image_url = f"/web/image/patrimoine.asset/{asset.id}/image" if asset.image else None
-
-        asset_data = {
-            "id": asset.id,
-            "name": asset.name,
-            "image": image_url,
-            "code": asset.code,
-            "type": asset.type,
-            "category": asset.subcategory_id.category_id.name if asset.subcategory_id and asset.subcategory_id.category_id else None,
-            "subcategory_id": asset.subcategory_id.id if asset.subcategory_id else None,
-            "location": asset.location_id.name if asset.location_id else None,
-            "location_id": asset.location_id.id if asset.location_id else None,
-            "department": asset.department_id.name if asset.department_id else None,
-            "department_id": asset.department_id.id if asset.department_id else None,
-            "acquisitionDate": date_acquisition_str,
-            "value": asset.valeur_acquisition,
-            "status": asset.etat,
-            "assignedTo": asset.employee_id.name if asset.employee_id else None,
-            "assigned_to_id": asset.employee_id.id if asset.employee_id else None,
-            "fournisseur_id": asset.fournisseur.id if asset.fournisseur else None,
-            "details": details,
-            "customValues": asset.custom_values or {}
-        }
+        asset_data = AssetDetailSerializer(request.env, "detail").serialize_one(asset)
+        asset_data["details"] = details
 
         return Response(
-            json.dumps({
+            json_dumps({
                 "status": "success",
                 "data": asset_data
-            }, default=str),
+            }),
             headers=CORS_HEADERS
         )
 
     # NOUVELLE ROUTE 1 : Pour l'âge du parc matériel
+    # L'âge des biens change chaque jour sans écriture : la date entre dans l'ETag.
     @http.route(
         "/api/patrimoine/stats/by_age", auth="user", type="http", methods=["GET"])
+    @conditional_get("patrimoine.asset", vary=lambda: str(Date.today()))
     def get_stats_by_age(self, **kw):
+        """
+        Nombre de biens par tranche d'âge, calculé par une seule requête
+        agrégée. Filtres optionnels : ``type`` et ``departmentId``.
+        """
         try:
-            assets = request.env["patrimoine.asset"].search(
-                [("date_acquisition", "!=", False)]
-            )
-            today = Date.today()
-
-            age_brackets = {
-                "Moins de 1 an": 0,
-                "1 à 2 ans": 0,
-                "2 à 3 ans": 0,
-                "3 à 5 ans": 0,
-                "Plus de 5 ans": 0,
-            }
-
-            for asset in assets:
-                age = relativedelta(today, asset.date_acquisition).years
-                if age < 1:
-                    age_brackets["Moins de 1 an"] += 1
-                elif age < 2:
-                    age_brackets["1 à 2 ans"] += 1
-                elif age < 3:
-                    age_brackets["2 à 3 ans"] += 1
-                elif age < 5:
-                    age_brackets["3 à 5 ans"] += 1
-                else:
-                    age_brackets["Plus de 5 ans"] += 1
+            domain = []
+            if kw.get("type"):
+                domain.append(("type", "=", kw["type"]))
+            if kw.get("departmentId"):
+                domain.append(("department_id", "=", int(kw["departmentId"])))
+            age_brackets = request.env["patrimoine.asset"]._count_by_age(domain)
 
             # Formater pour le graphique
-            data = [
-                {"name": key, "count": value} for key, value in age_brackets.items()
-            ]
+            data = [{"name": label, "count": count} for label, count in age_brackets]
 
             return Response(
-                json.dumps(data), headers={"Content-Type": "application/json"}
+                json_dumps(data), headers={"Content-Type": "application/json"}
             )
         except Exception as e:
             _logger.error(f"Error getting stats by age: {e}")
-            return Response(json.dumps({"error": str(e)}), status=500)
+            return Response(json_dumps({"error": str(e)}), status=500)
+
+    # Toutes les statistiques du tableau de bord en un aller-retour.
+    @http.route(
+        "/api/patrimoine/stats/dashboard", auth="user", type="http", methods=["GET"])
+    @conditional_get(
+        "patrimoine.asset", "hr.department", "asset.subcategory", vary=lambda: str(Date.today())
+    )
+    @handle_api_errors
+    def get_dashboard_stats(self, **kw):
+        """
+        Regroupe stats, by_age, by_department, by_department_value, by_type et
+        by_detailed_category (mêmes formats que les routes dédiées). Filtres
+        optionnels communs : ``type`` et ``departmentId``.
+        """
+        domain = []
+        if kw.get("type"):
+            domain.append(("type", "=", kw["type"]))
+        if kw.get("departmentId"):
+            domain.append(("department_id", "=", int(kw["departmentId"])))
+        return json_response(dashboard_stats(request.env, domain))
+
+    # Statistiques croisées à la demande (dimensions et mesures en liste blanche).
+    @http.route(
+        "/api/patrimoine/stats/cube", auth="user", type="http", methods=["GET"])
+    @handle_api_errors
+    def get_stats_cube(self, **kw):
+        """
+        ``dimensions`` : jusqu'à trois parmi type, subcategory, category,
+        department, location, etat, year. ``measures`` : count, sum, avg
+        (``valeur_acquisition``), ``count`` par défaut. Les mêmes noms servent
+        de filtres (``?department=3&year=2021``).
+        """
+        return json_response(cube(request.env, kw))
+
+    # Historique mensuel (effectif et valeur du parc), réservé aux administrateurs.
+    @http.route(
+        "/api/patrimoine/stats/series", auth="user", type="http", methods=["GET"])
+    @handle_api_errors
+    def get_stats_series(self, **kw):
+        """
+        Séries mensuelles ``[{key, name, points: [{month, count, value}]}]``.
+        ``groupby`` : ``type`` ou ``department`` (une seule série sinon) ;
+        ``from`` et ``to`` au format ``AAAA-MM`` ; filtres ``type`` et
+        ``departmentId``.
+        """
+        groupby = kw.get("groupby") or None
+        if groupby and groupby not in SERIES_GROUPBY:
+            raise ValidationError(f"groupby invalide : {groupby}")
+        domain = []
+        try:
+            if kw.get("from"):
+                domain.append(("month", ">=", datetime.strptime(kw["from"], "%Y-%m").date()))
+            if kw.get("to"):
+                domain.append(("month", "<=", datetime.strptime(kw["to"], "%Y-%m").date()))
+            if kw.get("departmentId"):
+                domain.append(("department_id", "=", int(kw["departmentId"])))
+        except ValueError:
+            raise ValidationError("Paramètres de filtre invalides.")
+        if kw.get("type"):
+            domain.append(("type", "=", kw["type"]))
+        return json_response(monthly_series(request.env, groupby, domain))
+
+    # Valeur nette comptable par département (plans d'amortissement stockés).
+    @http.route(
+        "/api/patrimoine/stats/net_book_value", auth="user", type="http", methods=["GET"])
+    @conditional_get(
+        "patrimoine.asset", "hr.department", "asset.subcategory", vary=lambda: Date.today().year
+    )
+    @handle_api_errors
+    def get_net_book_value(self, **kw):
+        """
+        ``[{id, name, count, gross, depreciation, net}]`` pour l'exercice
+        ``year`` (année en cours par défaut) ; filtre optionnel ``type``.
+        """
+        try:
+            year = int(kw["year"]) if kw.get("year") else None
+        except ValueError:
+            raise ValidationError("year doit être une année.")
+        domain = [("type", "=", kw["type"])] if kw.get("type") else []
+        return json_response(net_book_value(request.env, year, domain))
 
     # NOUVELLE ROUTE 2 : Pour la valeur du parc par département
     @http.route(
@@ -1006,41 +1037,33 @@ class PatrimoineAssetController(http.Controller):
         auth="user",
         type="http",
         methods=["GET"])
+    @conditional_get("patrimoine.asset", "hr.department")
     def get_stats_by_department_value(self, **kw):
         try:
             # On groupe par département et on somme la valeur d'acquisition
-            stats_raw = request.env["patrimoine.asset"].read_group(
-                domain=[("department_id", "!=", False)],
-                fields=["department_id", "valeur_acquisition"],
-                groupby=["department_id"],
-                lazy=False,
-            )
-
-            value_stats = []
-            for stat in stats_raw:
-                dept_id, dept_name = (
-                    stat.get("department_id")
-                    if stat.get("department_id")
-                    else (None, "Non défini")
-                )
-                total_value = stat.get("valeur_acquisition", 0)
-                value_stats.append(
-                    {
-                        "id": dept_id,
-                        "name": dept_name,
-                        "value": total_value,
-                    }
-                )
+            stats_raw = grouped_counts(
+                request.env, ["department_id"], [("department_id", "!=", False)]
+            )
+
+            value_stats = [
+                {
+                    "id": department.id,
+                    "name": department.display_name,
+                    "value": total_value or 0,
+                }
+                for department, _count, total_value in stats_raw
+            ]
 
             return Response(
-                json.dumps(value_stats), headers={"Content-Type": "application/json"}
+                json_dumps(value_stats), headers={"Content-Type": "application/json"}
             )
         except Exception as e:
             _logger.error(f"Error getting stats by department value: {e}")
-            return Response(json.dumps({"error": str(e)}), status=500)
+            return Response(json_dumps({"error": str(e)}), status=500)
 
     # Récupération des données de d'autres modules
     @http.route("/api/patrimoine/locations", auth="user", type="http", methods=["GET"])
+    @conditional_get("stock.location")
     def get_locations(self, **kw):
         try:
             # Modèle stock.location d'Odoo
@@ -1053,13 +1076,14 @@ class PatrimoineAssetController(http.Controller):
                 for loc in locations
             ]
             return Response(
-                json.dumps(location_data), headers={"Content-Type": "application/json"}
+                json_dumps(location_data), headers={"Content-Type": "application/json"}
             )
         except Exception as e:
             _logger.error("Error listing locations: %s", str(e))
             return Response(status=500)
 
     @http.route("/api/patrimoine/employees", auth="user", type="http", methods=["GET"])
+    @conditional_get("hr.employee")
     def get_employees(self, **kw):
         try:
             # Modèle hr.employee d'Odoo
@@ -1073,7 +1097,7 @@ class PatrimoineAssetController(http.Controller):
                 for emp in employees
             ]
             return Response(
-                json.dumps(employee_data), headers={"Content-Type": "application/json"}
+                json_dumps(employee_data), headers={"Content-Type": "application/json"}
             )
         except Exception as e:
             _logger.error("Error listing employees: %s", str(e))
@@ -1081,13 +1105,14 @@ class PatrimoineAssetController(http.Controller):
 
     @http.route(
         "/api/patrimoine/departments", auth="user", type="http", methods=["GET"])
+    @conditional_get("hr.department")
     def get_departments(self, **kw):
         try:
             # Modèle hr.department d'Odoo
             departments = request.env["hr.department"].search([])
             department_data = [{"id": emp.id, "name": emp.name} for emp in departments]
             return Response(
-                json.dumps(department_data),
+                json_dumps(department_data),
                 headers={"Content-Type": "application/json"},
             )
         except Exception as e:
@@ -1096,6 +1121,7 @@ class PatrimoineAssetController(http.Controller):
 
     @http.route(
         "/api/patrimoine/fournisseurs", auth="user", type="http", methods=["GET"])
+    @conditional_get("res.partner")
     def get_fournisseurs(self, **kw):
         try:
             # Modèle hr.department d'Odoo
@@ -1104,7 +1130,7 @@ class PatrimoineAssetController(http.Controller):
                 {"id": emp.id, "name": emp.name} for emp in fournisseurs
             ]
             return Response(
-                json.dumps(fournisseur_data),
+                json_dumps(fournisseur_data),
                 headers={"Content-Type": "application/json"},
             )
         except Exception as e:
@@ -1175,6 +1201,98 @@ class PatrimoineAssetController(http.Controller):
             _logger.error("Error deleting field: %s", str(e))
             return {"status": "error", "message": str(e)}
 
+    @http.route(
+        "/api/patrimoine/mouvements/bulk", auth="user", type="http", methods=["POST"], csrf=False)
+    @handle_api_errors
+    def create_mouvements_bulk(self, **kw):
+        """
+        Transfert ou affectation groupée : un mouvement identique par bien de
+        ``asset_ids``, créés et validés dans la même transaction.
+        """
+        data = json.loads(request.httprequest.data or b"{}")
+        if not request.env.user.has_group("gestion_patrimoine.group_patrimoine_admin"):
+            raise AccessError("Accès refusé. Seul un administrateur peut créer des mouvements.")
+
+        asset_ids = [int(asset_id) for asset_id in data.get("asset_ids") or []]
+        if not asset_ids:
+            raise ValidationError("La liste des biens (asset_ids) est obligatoire.")
+        if not data.get("type_mouvement"):
+            raise ValidationError("Le type de mouvement (type_mouvement) est obligatoire.")
+        assets = request.env["patrimoine.asset"].browse(asset_ids).exists()
+        missing = sorted(set(asset_ids) - set(assets.ids))
+        if missing:
+            raise ValidationError(
+                "Biens introuvables : " + ", ".join(str(asset_id) for asset_id in missing)
+            )
+
+        mouvements = request.env["patrimoine.mouvement"].bulk_move(
+            assets,
+            data["type_mouvement"],
+            to_department_id=int(data["to_department_id"]) if data.get("to_department_id") else False,
+            to_employee_id=int(data["to_employee_id"]) if data.get("to_employee_id") else False,
+            to_location_id=int(data["to_location_id"]) if data.get("to_location_id") else False,
+            motif=data.get("motif") or False,
+            date=data.get("date") or False,
+        )
+        return json_response(
+            {"status": "success", "count": len(mouvements), "mouvement_ids": mouvements.ids}
+        )
+
+    @http.route(
+        "/api/patrimoine/employees/<int:employee_id>/offboard",
+        auth="user", type="http", methods=["POST"], csrf=False)
+    @handle_api_errors
+    def offboard_employee(self, employee_id, **kw):
+        """
+        Départ d'un employé : tous ses biens retournent en stock (vers
+        ``to_location_id`` si fourni), en une opération.
+        """
+        data = json.loads(request.httprequest.data or b"{}")
+        if not request.env.user.has_group("gestion_patrimoine.group_patrimoine_admin"):
+            raise AccessError("Accès refusé. Seul un administrateur peut créer des mouvements.")
+        employee = request.env["hr.employee"].browse(employee_id).exists()
+        if not employee:
+            return json_response({"status": "error", "message": "Employé introuvable"}, status=404)
+        mouvements = request.env["patrimoine.mouvement"].offboard_employee(
+            employee,
+            to_location_id=int(data["to_location_id"]) if data.get("to_location_id") else False,
+            motif=data.get("motif") or False,
+        )
+        return json_response(
+            {"status": "success", "count": len(mouvements), "mouvement_ids": mouvements.ids}
+        )
+
+    @http.route(
+        "/api/patrimoine/departments/<int:department_id>/reassign",
+        auth="user", type="http", methods=["POST"], csrf=False)
+    @handle_api_errors
+    def reassign_department(self, department_id, **kw):
+        """
+        Réorganisation d'un département : ses biens sont transférés vers
+        ``to_department_id`` (ou retournent en stock sans département cible).
+        """
+        data = json.loads(request.httprequest.data or b"{}")
+        if not request.env.user.has_group("gestion_patrimoine.group_patrimoine_admin"):
+            raise AccessError("Accès refusé. Seul un administrateur peut créer des mouvements.")
+        departments = request.env["hr.department"]
+        department = departments.browse(department_id).exists()
+        if not department:
+            return json_response({"status": "error", "message": "Département introuvable"}, status=404)
+        to_department = departments
+        if data.get("to_department_id"):
+            to_department = departments.browse(int(data["to_department_id"])).exists()
+            if not to_department:
+                raise ValidationError("Département cible introuvable.")
+        mouvements = request.env["patrimoine.mouvement"].reassign_department(
+            department,
+            to_department=to_department,
+            to_location_id=int(data["to_location_id"]) if data.get("to_location_id") else False,
+            motif=data.get("motif") or False,
+        )
+        return json_response(
+            {"status": "success", "count": len(mouvements), "mouvement_ids": mouvements.ids}
+        )
+
     # --- create_mouvement (mise à jour des champs) ---
     @http.route(
         "/api/patrimoine/mouvements", auth="user", type="http", methods=["POST"], csrf=False)
@@ -1235,7 +1353,7 @@ class PatrimoineAssetController(http.Controller):
                 "mouvement_name": new_mouvement.name,
             }
             return Response(
-                json.dumps(response_data), content_type="application/json", status=200
+                json_dumps(response_data), content_type="application/json", status=200
             )
 
         except AccessError as e:
@@ -1243,7 +1361,7 @@ class PatrimoineAssetController(http.Controller):
                 "Access denied creating mouvement: %s", str(e)
             )
             return Response(
-                json.dumps({"status": "error", "message": str(e)}),
+                json_dumps({"status": "error", "message": str(e)}),
                 content_type="application/json",
                 status=403,
             )
@@ -1252,7 +1370,7 @@ class PatrimoineAssetController(http.Controller):
                 "Validation error creating mouvement: %s", str(e)
             )
             return Response(
-                json.dumps({"status": "error", "message": str(e)}),
+                json_dumps({"status": "error", "message": str(e)}),
                 content_type="application/json",
                 status=400,
             )
@@ -1260,7 +1378,7 @@ class PatrimoineAssetController(http.Controller):
             _logger.error("Erreur interne lors de la création du mouvement: %s", str(e))
             request.env.cr.rollback()
             return Response(
-                json.dumps(
+                json_dumps(
                     {"status": "error", "message": "Une erreur interne est survenue."}
                 ),
                 content_type="application/json",
@@ -1281,14 +1399,14 @@ class PatrimoineAssetController(http.Controller):
             mouvement = request.env["patrimoine.mouvement"].browse(mouvement_id)
             if not mouvement.exists():
                 return Response(
-                    json.dumps({"status": "error", "message": "Mouvement not found"}),
+                    json_dumps({"status": "error", "message": "Mouvement not found"}),
                     status=404,
                     headers={"Content-Type": "application/json"},
                 )
 
             mouvement.action_valider()
             return Response(
-                json.dumps({"status": "success"}),
+                json_dumps({"status": "success"}),
                 headers={"Content-Type": "application/json"},
             )
         except Exception as e:
@@ -1296,7 +1414,7 @@ class PatrimoineAssetController(http.Controller):
             if isinstance(e, ValidationError):
                 return {"status": "error", "message": e.name}
             return Response(
-                json.dumps({"status": "error", "message": str(e)}),
+                json_dumps({"status": "error", "message": str(e)}),
                 status=500,
                 headers={"Content-Type": "application/json"},
             )
@@ -1313,7 +1431,7 @@ class PatrimoineAssetController(http.Controller):
                 return Response(status=404)
 
             return Response(
-                json.dumps(item.custom_values or {}),
+                json_dumps(item.custom_values or {}),
                 headers={"Content-Type": "application/json"},
             )
         except Exception as e:
@@ -1369,7 +1487,7 @@ class PatrimoineAssetController(http.Controller):
         item = request.env["patrimoine.asset"].browse(item_id)
         if not item.exists():
             return Response(
-                json.dumps({
+                json_dumps({
                     "status": "error",
                     "code": 404,
                     "message": "Item not found"
@@ -1378,13 +1496,6 @@ class PatrimoineAssetController(http.Controller):
                 headers=CORS_HEADERS
             )
 
-        # Conversion des dates
-        date_acquisition_str = (
-            item.date_acquisition.strftime("%Y-%m-%d")
-            if item.date_acquisition
-            else None
-        )
-
         details = {}
         if item.type == "informatique":
             details_record = request.env["patrimoine.asset.informatique"].search(
@@ -1409,31 +1520,14 @@ class PatrimoineAssetController(http.Controller):
                 )[0]
                 details = details_data
 
-        image_url = (
-            f"/web/image/patrimoine.asset/{item.id}/image" if item.image else None
-        )
-
-        item_data = {
-            "id": item.id,
-            "name": item.name,
-            "image": image_url,
-            "code": item.code,
-            "type": item.type,
-            "location": item.location_id.name if item.location_id else None,
-            "department": item.department_id.name if item.department_id else None,
-            "assignedTo": item.employee_id.name if item.employee_id else None,
-            "acquisitionDate": date_acquisition_str,
-            "value": item.valeur_acquisition,
-            "status": item.etat,
-            "details": details,
-            "customValues": item.custom_values or {},
-        }
+        item_data = AssetDetailSerializer(request.env, "detail").serialize_one(item)
+        item_data["details"] = details
 
         return Response(
-            json.dumps({
+            json_dumps({
                 "status": "success",
                 "data": item_data
-            }, default=str),
+            }),
             headers=CORS_HEADERS
         )
 
@@ -1450,7 +1544,7 @@ class PatrimoineAssetController(http.Controller):
         item = request.env["patrimoine.asset"].browse(item_id)
         if not item.exists():
             return Response(
-                json.dumps({
+                json_dumps({
                     "error": "Asset not found"
                 }),
                 status=404,
@@ -1481,7 +1575,7 @@ class PatrimoineAssetController(http.Controller):
         }
 
         return Response(
-            json.dumps(item_data, default=str),
+            json_dumps(item_data),
             status=200,
             mimetype="application/json",
             headers=CORS_HEADERS
@@ -1519,7 +1613,7 @@ class PatrimoineAssetController(http.Controller):
         except Exception as e:
             _logger.error(f"Erreur finale lors de la génération PDF pour asset {asset_id}: {str(e)}")
             return Response(
-                json.dumps({"status": "error", "message": "Une erreur interne est survenue lors de la génération du PDF."}),
+                json_dumps({"status": "error", "message": "Une erreur interne est survenue lors de la génération du PDF."}),
                 status=500,
                 headers={"Content-Type": "application/json"},
             )
@@ -1550,7 +1644,7 @@ class PatrimoineAssetController(http.Controller):
                 for field in fields
             ]
             return Response(
-                json.dumps(field_data), headers={"Content-Type": "application/json"}
+                json_dumps(field_data), headers={"Content-Type": "application/json"}
             )
         except Exception as e:
             _logger.error("Error listing fields: %s", str(e))
@@ -1569,7 +1663,7 @@ class PatrimoineAssetController(http.Controller):
 
             values = item.custom_values or {}
             return Response(
-                json.dumps(values), headers={"Content-Type": "application/json"}
+                json_dumps(values), headers={"Content-Type": "application/json"}
             )
         except Exception as e:
             _logger.error("Error getting field values: %s", str(e))
@@ -1704,6 +1798,7 @@ class PatrimoineAssetController(http.Controller):
         type="http",
         methods=["GET"])
 
+    @conditional_get("patrimoine.asset", "asset.subcategory")
     def get_patrimoine_stats(self, general_type=None, subcategory_code=None, **kw):
         try:
             domain = []
@@ -1729,7 +1824,7 @@ class PatrimoineAssetController(http.Controller):
                     )
                     # Retourne des stats à zéro au lieu d'un 404, c'est plus gracieux
                     return Response(
-                        json.dumps(
+                        json_dumps(
                             {
                                 "total": 0,
                                 "inService": 0,
@@ -1741,38 +1836,15 @@ class PatrimoineAssetController(http.Controller):
                         headers={"Content-Type": "application/json"},
                     )
 
-            stats_raw = request.env["patrimoine.asset"].read_group(
-                domain, fields=["etat", "__count"], groupby=["etat"], lazy=False
-            )
-
-            total = 0
-            in_service = 0
-            in_stock = 0
-            out_of_service = 0
-
-            for stat in stats_raw:
-                count = stat["__count"]
-                total += count
-                if stat["etat"] == "service":
-                    in_service = count
-                elif stat["etat"] == "stock":
-                    in_stock = count
-                elif stat["etat"] in ("hs", "reforme"):
-                    out_of_service += count
-
-            stats = {
-                "total": total,
-                "inService": in_service,
-                "inStock": in_stock,
-                "outOfService": out_of_service,
-            }
+            stats_raw = grouped_counts(request.env, ["etat"], domain)
+            stats = etat_summary((etat, count) for etat, count, _value in stats_raw)
             return Response(
-                json.dumps(stats), headers={"Content-Type": "application/json"}
+                json_dumps(stats), headers={"Content-Type": "application/json"}
             )
         except Exception as e:
             _logger.error("Error getting patrimoine stats: %s", str(e))
             return Response(
-                json.dumps({"status": "error", "message": str(e)}),
+                json_dumps({"status": "error", "message": str(e)}),
                 status=500,
                 headers={"Content-Type": "application/json"},
             )
@@ -1780,94 +1852,68 @@ class PatrimoineAssetController(http.Controller):
     # --- NOUVELLE API : Statistiques par Département ---
     @http.route(
         "/api/patrimoine/stats/by_department", auth="user", type="http", methods=["GET"])
+    @conditional_get("patrimoine.asset", "hr.department")
     def get_stats_by_department(self, **kw):
         try:
-            # read_group pour compter les assets par département
-            stats_raw = request.env["patrimoine.asset"].read_group(
-                domain=[],  # Pas de filtre global pour cette stat, on veut tous les départements
-                fields=["department_id", "__count"],
-                groupby=["department_id"],
-                lazy=False,
-            )
+            # Nombre de biens par département (tous les départements)
+            stats_raw = grouped_counts(request.env, ["department_id"])
 
-            department_stats = []
-            for stat in stats_raw:
-                dept_name = (
-                    stat["department_id"][1] if stat["department_id"] else "Non affecté"
-                )
-                department_stats.append(
-                    {
-                        "id": (
-                            stat["department_id"][0] if stat["department_id"] else 0
-                        ),  # ID du département
-                        "name": dept_name,
-                        "count": stat["__count"],
-                    }
-                )
+            department_stats = [
+                {
+                    "id": department.id or 0,  # ID du département
+                    "name": department.display_name if department else "Non affecté",
+                    "count": count,
+                }
+                for department, count, _value in stats_raw
+            ]
             return Response(
-                json.dumps(department_stats),
+                json_dumps(department_stats),
                 headers={"Content-Type": "application/json"},
             )
         except Exception as e:
             _logger.error("Error getting stats by department: %s", str(e))
             return Response(
-                json.dumps({"status": "error", "message": str(e)}),
+                json_dumps({"status": "error", "message": str(e)}),
                 status=500,
                 headers={"Content-Type": "application/json"},
             )
     # Route pour obtenir les stats détaillées d'UN SEUL département
     @http.route('/api/patrimoine/stats/department/<int:department_id>', auth="user", type="http", methods=["GET"])
+    @conditional_get("patrimoine.asset")
     def get_stats_for_single_department(self, department_id, **kw):
         try:
             domain = [('department_id', '=', department_id)]
 
-            stats_raw = request.env["patrimoine.asset"].read_group(
-                domain, fields=["etat"], groupby=["etat"], lazy=False
-            )
-
-            stats = {'total': 0, 'inService': 0, 'inStock': 0, 'outOfService': 0}
-            for group in stats_raw:
-                # La clé pour le compte est '__count'
-                count = group['__count'] 
-                stats['total'] += count
-                if group['etat'] == 'service':
-                    stats['inService'] = count
-                elif group['etat'] == 'stock':
-                    stats['inStock'] = count
-                elif group['etat'] in ('hs', 'reforme'):
-                    stats['outOfService'] += count
+            stats_raw = grouped_counts(request.env, ["etat"], domain)
+            stats = etat_summary((etat, count) for etat, count, _value in stats_raw)
 
-            return Response(json.dumps(stats), headers={"Content-Type": "application/json"})
+            return Response(json_dumps(stats), headers={"Content-Type": "application/json"})
         except Exception as e:
             _logger.error(f"Error getting stats for department {department_id}: {e}")
-            return Response(json.dumps({'error': str(e)}), status=500)
+            return Response(json_dumps({'error': str(e)}), status=500)
     # --- NOUVELLE API : Statistiques par Type Général (informatique, mobilier, vehicule) ---
     @http.route(
         "/api/patrimoine/stats/by_type", auth="user", type="http", methods=["GET"])
+    @conditional_get("patrimoine.asset")
     def get_stats_by_type(self, **kw):
         try:
-            # Utilise le champ 'type' directement sur patrimoine.asset
-            stats_raw = request.env["patrimoine.asset"].read_group(
-                domain=[], fields=["type", "__count"], groupby=["type"], lazy=False
-            )
+            # Regroupe sur le champ 'type' de patrimoine.asset
+            stats_raw = grouped_counts(request.env, ["type"])
 
             type_stats = []
             # CORRECTION : Utiliser la méthode correcte pour accéder aux valeurs de sélection
             type_selection_map = dict(request.env['patrimoine.asset']._fields['type'].get_description(request.env)['selection'])
 
-            for stat in stats_raw:
-                type_code = stat["type"]
+            for type_code, count, _value in stats_raw:
                 type_name = type_selection_map.get(type_code, type_code)  # Nom lisible
-                type_stats.append(
-                    {"code": type_code, "name": type_name, "count": stat["__count"]}
-                )
+                type_stats.append({"code": type_code, "name": type_name, "count": count})
             return Response(
-                json.dumps(type_stats), headers={"Content-Type": "application/json"}
+                json_dumps(type_stats), headers={"Content-Type": "application/json"}
             )
         except Exception as e:
             _logger.error("Error getting stats by type: %s", str(e))
             return Response(
-                json.dumps({"status": "error", "message": str(e)}),
+                json_dumps({"status": "error", "message": str(e)}),
                 status=500,
                 headers={"Content-Type": "application/json"},
             )
@@ -1878,35 +1924,28 @@ class PatrimoineAssetController(http.Controller):
         auth="user",
         type="http",
         methods=["GET"])
+    @conditional_get("patrimoine.asset", "asset.subcategory")
     def get_stats_by_detailed_category(self, **kw):
         try:
-            # read_group sur 'subcategory_id'
-            stats_raw = request.env["patrimoine.asset"].read_group(
-                domain=[],
-                fields=["subcategory_id", "__count"],
-                groupby=["subcategory_id"],
-                lazy=False,
-            )
-
-            detailed_category_stats = []
-            for stat in stats_raw:
-                subcat_id = stat["subcategory_id"][0] if stat["subcategory_id"] else 0
-                subcat_name = (
-                    stat["subcategory_id"][1]
-                    if stat["subcategory_id"]
-                    else "Non classifié"
-                )
-                detailed_category_stats.append(
-                    {"id": subcat_id, "name": subcat_name, "count": stat["__count"]}
-                )
+            # Regroupement sur 'subcategory_id'
+            stats_raw = grouped_counts(request.env, ["subcategory_id"])
+
+            detailed_category_stats = [
+                {
+                    "id": subcategory.id or 0,
+                    "name": subcategory.display_name if subcategory else "Non classifié",
+                    "count": count,
+                }
+                for subcategory, count, _value in stats_raw
+            ]
             return Response(
-                json.dumps(detailed_category_stats),
+                json_dumps(detailed_category_stats),
                 headers={"Content-Type": "application/json"},
             )
         except Exception as e:
             _logger.error("Error getting stats by detailed category: %s", str(e))
             return Response(
-                json.dumps({"status": "error", "message": str(e)}),
+                json_dumps({"status": "error", "message": str(e)}),
                 status=500,
                 headers={"Content-Type": "application/json"},
             )
@@ -1919,44 +1958,32 @@ class PatrimoineAssetController(http.Controller):
             employee = request.env['hr.employee'].search([('user_id', '=', request.env.user.id)], limit=1)
             if not employee:
                 # Si aucun employé n'est lié à cet utilisateur, on renvoie une liste vide
-                return Response(json.dumps([]), headers={"Content-Type": "application/json"})
+                return Response(json_dumps([]), headers={"Content-Type": "application/json"})
 
             # On cherche tous les matériels affectés à cet employé
             domain = [('employee_id', '=', employee.id)]
             assets = request.env['patrimoine.asset'].search(domain)
 
-            asset_data = []
-            for asset in assets:
-                image_url = (
-                    f"/web/image/patrimoine.asset/{asset.id}/image"
-                    if asset.image
-                    else None
-                )
-                asset_data.append({
-                    'id': asset.id,
-                    'name': asset.name,
-                    'code': asset.code,
-                    'status': asset.etat,
-                    'category': asset.subcategory_id.category_id.name if asset.subcategory_id else None,
-                    'image': image_url,
-                    # Ajoutez d'autres champs si nécessaire
-                })
-
-            return Response(json.dumps(asset_data), headers={'Content-Type': 'application/json'})
+            asset_data = AssetSerializer(request.env, "user", fields=kw.get("fields")).serialize(assets)
+
+            return Response(json_dumps(asset_data), headers={'Content-Type': 'application/json'})
 
+        except ValidationError as e:
+            return Response(json_dumps({'error': str(e)}), status=400, headers={'Content-Type': 'application/json'})
         except Exception as e:
             _logger.error(f"Error listing assets for user {request.env.user.id}: {e}")
-            return Response(json.dumps({'error': str(e)}), status=500, headers={'Content-Type': 'application/json'})
+            return Response(json_dumps({'error': str(e)}), status=500, headers={'Content-Type': 'application/json'})
 
     # NOUVELLE ROUTE pour les stats de l'utilisateur connecté
     @http.route('/api/patrimoine/stats/user', auth="user", type="http", methods=["GET"])
+    @conditional_get("patrimoine.asset", "hr.employee")
     def get_stats_for_user(self, **kw):
         try:
             # On cherche l'employé correspondant à l'utilisateur connecté
             employee = request.env['hr.employee'].search([('user_id', '=', request.env.user.id)], limit=1)
             if not employee:
                 # Si aucun employé n'est lié, on renvoie des stats vides
-                return Response(json.dumps({'total': 0, 'inService': 0, 'inStock': 0, 'outOfService': 0}), headers={"Content-Type": "application/json"})
+                return Response(json_dumps({'total': 0, 'inService': 0, 'inStock': 0, 'outOfService': 0}), headers={"Content-Type": "application/json"})
 
             # On filtre les matériels par l'ID de cet employé
             domain = [('employee_id', '=', employee.id)]
@@ -1976,10 +2003,10 @@ class PatrimoineAssetController(http.Controller):
                 elif group['etat'] in ('hs', 'reforme'):
                     stats['outOfService'] += count
 
-            return Response(json.dumps(stats), headers={"Content-Type": "application/json"})
+            return Response(json_dumps(stats), headers={"Content-Type": "application/json"})
         except Exception as e:
             _logger.error(f"Error getting stats for user {request.env.user.id}: {e}")
-            return Response(json.dumps({'error': str(e)}), status=500)
+            return Response(json_dumps({'error': str(e)}), status=500)
 
     # --- API pour créer une demande (utilisée par le directeur) ---
     @http.route('/api/patrimoine/demandes', auth='user', type='http', methods=['POST'], csrf=False)
@@ -2056,7 +2083,7 @@ class PatrimoineAssetController(http.Controller):
             })
 
         return Response(
-            json.dumps({'status': 'success', 'demande_id': new_demande.id}),
+            json_dumps({'status': 'success', 'demande_id': new_demande.id}),
             headers=CORS_HEADERS,
         )
 
@@ -2108,81 +2135,23 @@ class PatrimoineAssetController(http.Controller):
                 domain, order="create_date desc"
             )
 
-            demande_data = []
-            for demande in demandes:
-                # On récupère le nom du département de l'employé qui a fait la demande
-                demandeur_employee = request.env['hr.employee'].search([('user_id', '=', demande.demandeur_id.id)], limit=1)
-                departement_name = demandeur_employee.department_id.name if demandeur_employee and demandeur_employee.department_id else "N/A"
-
-                demande_data.append(
-                    {
-                        "id": demande.id,
-                        "name": demande.name,
-                        "demandeur_id": demande.demandeur_id.id,
-                        "demandeur_name": demande.demandeur_id.name,
-                        "departement_demandeur": departement_name,
-                        "motif_demande": demande.motif_demande,
-                        "state": demande.state,
-                        "date_demande": (
-                            demande.date_demande.strftime("%Y-%m-%d %H:%M:%S")
-                            if demande.date_demande
-                            else None
-                        ),
-                        "date_traitement": (
-                            demande.date_traitement.strftime("%Y-%m-%d %H:%M:%S")
-                            if demande.date_traitement
-                            else None
-                        ),
-                        "lignes": [
-                            {
-                                "id": ligne.id,
-                                "demande_subcategory_id": ligne.demande_subcategory_id.id,
-                                "demande_subcategory_name": ligne.demande_subcategory_id.name,
-                                "quantite": ligne.quantite,
-                                "destinataire_department_id": (
-                                    ligne.destinataire_department_id.id
-                                    if ligne.destinataire_department_id
-                                    else None
-                                ),
-                                "destinataire_department_name": (
-                                    ligne.destinataire_department_id.name
-                                    if ligne.destinataire_department_id
-                                    else None
-                                ),
-                                "destinataire_location_id": (
-                                    ligne.destinataire_location_id.id
-                                    if ligne.destinataire_location_id
-                                    else None
-                                ),
-                                "destinataire_location_name": (
-                                    ligne.destinataire_location_id.name
-                                    if ligne.destinataire_location_id
-                                    else None
-                                ),
-                                "destinataire_employee_id": (
-                                    ligne.destinataire_employee_id.id
-                                    if ligne.destinataire_employee_id
-                                    else None
-                                ),
-                                "destinataire_employee_name": (
-                                    ligne.destinataire_employee_id.name
-                                    if ligne.destinataire_employee_id
-                                    else None
-                                ),
-                                "description": ligne.description,
-                            }
-                            for ligne in demande.ligne_ids
-                        ],
-                    }
-                )
+            demande_data = DemandeSerializer(
+                request.env, "list", fields=kw.get("fields")
+            ).serialize(demandes)
             return Response(
-                json.dumps(demande_data), 
+                json_dumps(demande_data), 
                 headers={"Content-Type": "application/json"}
             )
+        except ValidationError as e:
+            return Response(
+                json_dumps({"status": "error", "message": str(e)}),
+                status=400,
+                headers={"Content-Type": "application/json"},
+            )
         except Exception as e:
             _logger.error("Error listing demandes: %s", str(e))
             return Response(
-                json.dumps({"status": "error", "message": str(e)}),
+                json_dumps({"status": "error", "message": str(e)}),
                 status=500,
                 headers={"Content-Type": "application/json"},
             )
@@ -2253,19 +2222,18 @@ class PatrimoineAssetController(http.Controller):
                     )
 
             return Response(
-                json.dumps(
+                json_dumps(
                     {
                         "status": "success",
                         "perte_id": new_perte.id,
                         "perte_name": new_perte.name,
-                    },
-                    default=str,
+                    }
                 ),
                 headers=CORS_HEADERS,
             )
         except Exception as e:
             _logger.error(f"Erreur lors de la création de la déclaration de perte : {e}")
-            return Response(json.dumps({'error': str(e)}), status=500, headers = CORS_HEADERS, content_type='application/json')
+            return Response(json_dumps({'error': str(e)}), status=500, headers = CORS_HEADERS, content_type='application/json')
 
     # --- API pour lister les déclarations de perte ---
     @http.route("/api/patrimoine/pertes", auth="user", type="http", methods=["GET"])
@@ -2279,47 +2247,22 @@ class PatrimoineAssetController(http.Controller):
                 domain, order="date_perte desc"
             )
 
-            perte_data = []
-            for perte in pertes:
-                # On recherche la pièce jointe pour cette déclaration
-                attachment = request.env['ir.attachment'].search([
-                    ('res_model', '=', 'patrimoine.perte'),
-                    ('res_id', '=', perte.id)
-                ], limit=1)
-
-                # On construit l'URL si une pièce jointe est trouvée
-                document_url = f'/web/content/{attachment.id}/{attachment.name}' if attachment else None
-                perte_data.append(
-                    {
-                        "id": perte.id,
-                        "name": perte.name,  # Référence de la déclaration
-                        "asset_id": perte.asset_id.id,
-                        "asset_name": perte.asset_id.name,
-                        "asset_code": perte.asset_id.code,
-                        "date_perte": (
-                            perte.date_perte.strftime("%Y-%m-%d %H:%M:%S")
-                            if perte.date_perte
-                            else None
-                        ),
-                        "motif": perte.motif,
-                        "declarer_par_id": perte.declarer_par_id.id,
-                        "declarer_par_name": perte.declarer_par_id.name,
-                        "state": perte.state,
-                        # On peut aussi ajouter les autres champs ici pour la modal "Voir"
-                        "lieu_perte": perte.lieu_perte,
-                        "circonstances": perte.circonstances,
-                        "actions_entreprises": perte.actions_entreprises,
-                        "rapport_police": perte.rapport_police,
-                        "document_url": document_url,
-                    }
-                )
+            perte_data = PerteSerializer(
+                request.env, "list", fields=kw.get("fields")
+            ).serialize(pertes)
+            return Response(
+                json_dumps(perte_data), headers={"Content-Type": "application/json"}
+            )
+        except ValidationError as e:
             return Response(
-                json.dumps(perte_data), headers={"Content-Type": "application/json"}
+                json_dumps({"status": "error", "message": str(e)}),
+                status=400,
+                headers={"Content-Type": "application/json"},
             )
         except Exception as e:
             _logger.error("Error listing pertes: %s", str(e))
             return Response(
-                json.dumps({"status": "error", "message": str(e)}),
+                json_dumps({"status": "error", "message": str(e)}),
                 status=500,
                 headers={"Content-Type": "application/json"},
             )
@@ -2332,7 +2275,7 @@ class PatrimoineAssetController(http.Controller):
                 [("user_id", "=", request.env.user.id)], limit=1
             )
             if not current_employee:
-                return Response(json.dumps([]), headers={"Content-Type": "application/json"})
+                return Response(json_dumps([]), headers={"Content-Type": "application/json"})
 
             # Recherche des employés ayant ce manager comme supérieur hiérarchique
             employee_ids = (
@@ -2366,46 +2309,20 @@ class PatrimoineAssetController(http.Controller):
 
             pertes = request.env["patrimoine.perte"].search(domain, order="date_perte desc")
 
-            # La logique pour formater les données reste la même
-            perte_data = []
-            for perte in pertes:
-                # On recherche la pièce jointe pour cette déclaration
-                attachment = request.env['ir.attachment'].search([
-                    ('res_model', '=', 'patrimoine.perte'),
-                    ('res_id', '=', perte.id)
-                ], limit=1)
-
-                # On construit l'URL si une pièce jointe est trouvée
-                document_url = f'/web/content/{attachment.id}/{attachment.name}' if attachment else None
-
-                perte_data.append(
-                    {
-                        "id": perte.id,
-                        "name": perte.name,
-                        "asset_name": perte.asset_id.sudo().name,
-                        "declarer_par_name": perte.declarer_par_id.name,
-                        "date_perte": (
-                            perte.date_perte.strftime("%Y-%m-%d")
-                            if perte.date_perte
-                            else None
-                        ),
-                        "state": perte.state,
-                        # On ajoute tous les champs nécessaires pour la modale
-                        "lieu_perte": perte.lieu_perte,
-                        "circonstances": perte.circonstances,
-                        "actions_entreprises": perte.actions_entreprises,
-                        "rapport_police": perte.rapport_police,
-                        "document_url": document_url,
-                    }
-                )
+            # Le bien peut appartenir à un autre département : lecture en sudo.
+            perte_data = PerteManagerSerializer(
+                request.env, "manager", fields=kw.get("fields"), sudo_relations=("asset_id",)
+            ).serialize(pertes)
 
             return Response(
-                json.dumps(perte_data), headers={"Content-Type": "application/json"}
+                json_dumps(perte_data), headers={"Content-Type": "application/json"}
             )
 
+        except ValidationError as e:
+            return Response(json_dumps({'error': str(e)}), status=400, headers={'Content-Type': 'application/json'})
         except Exception as e:
             _logger.error(f"Error listing pertes for manager {request.env.user.name}: {e}")
-            return Response(json.dumps({'error': str(e)}), status=500, headers={'Content-Type': 'application/json'})
+            return Response(json_dumps({'error': str(e)}), status=500, headers={'Content-Type': 'application/json'})
 
     # NOUVELLE ROUTE pour que le manager traite une déclaration
     @http.route(
@@ -2489,9 +2406,9 @@ class PatrimoineAssetController(http.Controller):
     def add_perte_view(self, perte_id, **kw):
         perte = request.env['patrimoine.perte'].sudo().browse(perte_id)
         if not perte.exists():
-            return Response(json.dumps({'status': 'error', 'message': 'Perte not found'}), status=404, headers=CORS_HEADERS)
+            return Response(json_dumps({'status': 'error', 'message': 'Perte not found'}), status=404, headers=CORS_HEADERS)
         perte.write({'viewer_ids': [(4, request.env.user.id)]})
-        return Response(json.dumps({'status': 'success'}), headers=CORS_HEADERS)
+        return Response(json_dumps({'status': 'success'}), headers=CORS_HEADERS)
 
     @http.route('/api/patrimoine/pertes/unread_count', auth='user', type='http', methods=['GET'], csrf=False)
     def pertes_unread_count(self, **kw):
@@ -2500,7 +2417,7 @@ class PatrimoineAssetController(http.Controller):
             ('manager_id.user_id', '=', request.env.user.id),
             ('state', '=', 'to_approve'),
         ])
-        return Response(json.dumps({'status': 'success', 'data': {'count': count}}), headers=CORS_HEADERS)
+        return Response(json_dumps({'status': 'success', 'data': {'count': count}}), headers=CORS_HEADERS)
 
     # --- API pour créer un signalement de panne ---
     @http.route(
@@ -2556,44 +2473,32 @@ class PatrimoineAssetController(http.Controller):
                 new_panne.action_submit()
 
             return Response(
-                json.dumps({"status": "success", "panne_id": new_panne.id, "panne_name": new_panne.name}, default=str),
+                json_dumps({"status": "success", "panne_id": new_panne.id, "panne_name": new_panne.name}),
                 headers=CORS_HEADERS,
             )
 
         except Exception as e:
             _logger.error(f"Erreur lors de la création du signalement de panne : {e}")
-            return Response(json.dumps({'error': str(e)}), status=500, headers=CORS_HEADERS)
+            return Response(json_dumps({'error': str(e)}), status=500, headers=CORS_HEADERS)
     # --- API pour lister les pannes ---
     @http.route("/api/patrimoine/pannes", auth="user", type="http", methods=["GET"])
     def list_pannes(self, **kw):
         try:
             pannes = request.env["patrimoine.panne"].search([], order="date_panne desc")
-            data = []
-            for panne in pannes:
-                data.append(
-                    {
-                        "id": panne.id,
-                        "name": panne.name,
-                        "asset_id": panne.asset_id.id,
-                        "asset_name": panne.asset_id.name,
-                        "date_panne": panne.date_panne.strftime("%Y-%m-%d") if panne.date_panne else None,
-                        "description": panne.description,
-                        "declarer_par_id": panne.declarer_par_id.id,
-                        "declarer_par_name": panne.declarer_par_id.name,
-                        "state": panne.state,
-                    }
-                )
-            return Response(json.dumps(data), headers={"Content-Type": "application/json"})
+            data = PanneSerializer(request.env, "list", fields=kw.get("fields")).serialize(pannes)
+            return Response(json_dumps(data), headers={"Content-Type": "application/json"})
+        except ValidationError as e:
+            return Response(json_dumps({"status": "error", "message": str(e)}), status=400, headers={"Content-Type": "application/json"})
         except Exception as e:
             _logger.error("Error listing pannes: %s", str(e))
-            return Response(json.dumps({"status": "error", "message": str(e)}), status=500, headers={"Content-Type": "application/json"})
+            return Response(json_dumps({"status": "error", "message": str(e)}), status=500, headers={"Content-Type": "application/json"})
 
     @http.route("/api/patrimoine/pannes/manager", auth="user", type="http", methods=["GET"])
     def list_pannes_for_manager(self, **kw):
         try:
             current_employee = request.env["hr.employee"].search([("user_id", "=", request.env.user.id)], limit=1)
             if not current_employee:
-                return Response(json.dumps([]), headers={"Content-Type": "application/json"})
+                return Response(json_dumps([]), headers={"Content-Type": "application/json"})
 
             employee_ids = request.env["hr.employee"].search([("parent_id", "=", current_employee.id)]).ids
             if not employee_ids and current_employee.department_id:
@@ -2603,22 +2508,15 @@ class PatrimoineAssetController(http.Controller):
             domain = [("declarer_par_id", "in", user_ids_of_team), ("state", "=", "to_approve")]
 
             pannes = request.env["patrimoine.panne"].search(domain, order="date_panne desc")
-            data = []
-            for panne in pannes:
-                data.append(
-                    {
-                        "id": panne.id,
-                        "name": panne.name,
-                        "asset_name": panne.asset_id.sudo().name,
-                        "declarer_par_name": panne.declarer_par_id.name,
-                        "date_panne": panne.date_panne.strftime("%Y-%m-%d") if panne.date_panne else None,
-                        "state": panne.state,
-                    }
-                )
-            return Response(json.dumps(data), headers={"Content-Type": "application/json"})
+            data = PanneSerializer(
+                request.env, "manager", fields=kw.get("fields"), sudo_relations=("asset_id",)
+            ).serialize(pannes)
+            return Response(json_dumps(data), headers={"Content-Type": "application/json"})
+        except ValidationError as e:
+            return Response(json_dumps({"error": str(e)}), status=400, headers={"Content-Type": "application/json"})
         except Exception as e:
             _logger.error(f"Error listing pannes for manager {request.env.user.name}: {e}")
-            return Response(json.dumps({"error": str(e)}), status=500, headers={"Content-Type": "application/json"})
+            return Response(json_dumps({"error": str(e)}), status=500, headers={"Content-Type": "application/json"})
 
     @http.route("/api/patrimoine/pannes/manager_process/<int:panne_id>", auth="user", type="json", methods=["POST"])
     def manager_process_panne(self, panne_id, action, **kw):
@@ -2675,9 +2573,9 @@ class PatrimoineAssetController(http.Controller):
     def add_panne_view(self, panne_id, **kw):
         panne = request.env['patrimoine.panne'].sudo().browse(panne_id)
         if not panne.exists():
-            return Response(json.dumps({'status': 'error', 'message': 'Panne not found'}), status=404, headers=CORS_HEADERS)
+            return Response(json_dumps({'status': 'error', 'message': 'Panne not found'}), status=404, headers=CORS_HEADERS)
         panne.write({'viewer_ids': [(4, request.env.user.id)]})
-        return Response(json.dumps({'status': 'success'}), headers=CORS_HEADERS)
+        return Response(json_dumps({'status': 'success'}), headers=CORS_HEADERS)
 
     @http.route('/api/patrimoine/pannes/unread_count', auth='user', type='http', methods=['GET'], csrf=False)
     def pannes_unread_count(self, **kw):
@@ -2686,4 +2584,4 @@ class PatrimoineAssetController(http.Controller):
             ('manager_id.user_id', '=', request.env.user.id),
             ('state', '=', 'to_approve'),
         ])
-        return Response(json.dumps({'status': 'success', 'data': {'count': count}}), headers=CORS_HEADERS)
+        return Response(json_dumps({'status': 'success', 'data': {'count': count}}), headers=CORS_HEADERS)
@@ -1,11 +1,23 @@
+import hashlib
 import json
 import logging
 import os
+import zlib
 from functools import wraps
 from odoo.exceptions import AccessError, ValidationError
-from odoo.http import Response as OdooResponse
+from odoo.http import Response as OdooResponse, request
 from odoo import http
 
+try:
+    import orjson
+except ImportError:  # optional fast backend
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is used otherwise
+    brotli = None
+
 # Allow overriding the CORS origin via an environment variable so deployments
 # can specify their frontend URL.  Using a specific origin is required when the
 # client sends credentials (cookies or auth headers).
@@ -16,16 +28,219 @@ CORS_HEADERS = {
 }
 
 
-def Response(*args, **kwargs):
-    """Return an Odoo HTTP Response with default CORS headers."""
+# JSON encoding backend: "orjson" when installed, else the stdlib encoder.
+# Set PATRIMOINE_JSON_BACKEND=json to force the stdlib encoder.
+JSON_BACKEND = os.environ.get("PATRIMOINE_JSON_BACKEND") or ("orjson" if orjson else "json")
+
+
+def _json_default(value):
+    """Fallback for values JSON cannot encode natively.
+
+    Dates, datetimes and Decimals keep the ``str()`` rendering the API has
+    always returned (``2024-05-01 10:00:00``), as do lazy translations.
+    """
+    return str(value)
+
+
+# Compact separators and no ASCII escaping: smaller payloads, and the encoder
+# instance is built once instead of on every call.
+_stdlib_encoder = json.JSONEncoder(
+    default=_json_default, ensure_ascii=False, check_circular=False, separators=(",", ":")
+)
+
+if JSON_BACKEND == "orjson" and orjson:
+    # PASSTHROUGH_DATETIME routes dates through _json_default so their format
+    # matches the stdlib backend (orjson would otherwise emit ISO "T" strings).
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def json_dumps(data):
+        """Serialize ``data`` to a JSON string."""
+        return orjson.dumps(data, default=_json_default, option=_ORJSON_OPTIONS).decode("utf-8")
+else:
+    def json_dumps(data):
+        """Serialize ``data`` to a JSON string."""
+        return _stdlib_encoder.encode(data)
+
+
+# Conditional GET: the browser keeps the body but must revalidate it with
+# If-None-Match on every use.
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+# Response compression. Bodies under COMPRESSION_MIN_SIZE bytes are sent as is:
+# the gain would not pay for the compression headers and CPU time.
+COMPRESSION_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+# Brotli's default quality (11) is meant for static assets; 5 compresses
+# better than gzip at a comparable speed.
+BROTLI_QUALITY = 5
+
+
+def _accepted_encoding():
+    """Return the best encoding accepted by the client: "br", "gzip" or None."""
+    if not request:
+        return None
+    header = request.httprequest.headers.get("Accept-Encoding") or ""
+    qualities = {}
+    for item in header.split(","):
+        name, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            key, _sep, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip():
+            qualities[name.strip().lower()] = quality
+    # RFC 9110: a coding listed explicitly overrides "*".
+    wildcard = qualities.get("*", 0.0)
+    candidates = ("br", "gzip") if brotli else ("gzip",)
+    best = max(candidates, key=lambda coding: qualities.get(coding, wildcard))
+    return best if qualities.get(best, wildcard) > 0 else None
+
+
+def _compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+    return compressor.compress(data) + compressor.flush()
+
+
+def _compress_stream(chunks, encoding):
+    """Compress an iterable body chunk by chunk (streamed responses)."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        compress, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        compress, finish = compressor.compress, compressor.flush
+    try:
+        for chunk in chunks:
+            data = compress(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+            if data:
+                yield data
+        yield finish()
+    finally:
+        # Propagate an early close (client gone) to the wrapped generator.
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
+
+
+def _compress_body(body, headers):
+    """Return ``body`` compressed for the client, updating ``headers``."""
+    if body is None or "Content-Encoding" in headers:
+        return body
+    streamed = not isinstance(body, (str, bytes))
+    if not streamed:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if len(body) < COMPRESSION_MIN_SIZE:
+            return body
+    headers["Vary"] = "Accept-Encoding"
+    encoding = _accepted_encoding()
+    if not encoding:
+        return body
+    headers["Content-Encoding"] = encoding
+    return _compress_stream(body, encoding) if streamed else _compress(body, encoding)
+
+
+def Response(*args, etag=None, **kwargs):
+    """Return an Odoo HTTP Response with default CORS headers.
+
+    When ``etag`` is given, the ETag and revalidation headers are added.
+    Bodies are compressed (brotli or gzip) when the client accepts it.
+    """
     headers = kwargs.pop("headers", {})
     headers = {**CORS_HEADERS, **headers}
+    if etag:
+        headers.update({"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL})
+    if args:
+        args = (_compress_body(args[0], headers),) + args[1:]
+    elif "response" in kwargs:
+        kwargs["response"] = _compress_body(kwargs["response"], headers)
     return OdooResponse(*args, headers=headers, **kwargs)
 
 
-def json_response(data, status=200):
+def json_response(data, status=200, etag=None):
     """Return a JSON Response with CORS headers."""
-    return Response(json.dumps(data, default=str), status=status, headers=CORS_HEADERS)
+    return Response(json_dumps(data), status=status, headers=CORS_HEADERS, etag=etag)
+
+
+def model_watermark(model, domain=()):
+    """Return ``(count, max write_date)`` for ``model``, in a single query.
+
+    Record rules apply, so the watermark only covers what the user can see.
+    Any create, write, archive or unlink changes one of the two values.
+    """
+    rows = model._read_group(list(domain), aggregates=["__count", "write_date:max"])
+    count, last_write = rows[0]
+    return count, str(last_write or "")
+
+
+def make_etag(*parts):
+    """Build a weak ETag from arbitrary (repr-able) parts."""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def _strip_weak(tag):
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def not_modified(etag):
+    """Return a 304 Response if the client's If-None-Match matches ``etag``."""
+    header = request.httprequest.headers.get("If-None-Match") or ""
+    tags = {_strip_weak(tag) for tag in header.split(",") if tag.strip()}
+    if "*" in tags or _strip_weak(etag) in tags:
+        return Response(status=304, etag=etag)
+    return None
+
+
+def conditional_get(*model_names, vary=None):
+    """Decorator answering ``304 Not Modified`` for unchanged read-only routes.
+
+    The ETag combines the watermarks of ``model_names``, the user, the
+    language, the route arguments and ``vary()`` when given (for data that
+    changes without any write, e.g. ages computed from today's date). The
+    route itself only runs when the ETag differs from the client's copy.
+
+    If the ETag cannot be computed (access rights, database error), the
+    route runs without one, so its own error handling answers the client.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            env = request.env
+            try:
+                etag = make_etag(
+                    env.uid,
+                    env.context.get("lang"),
+                    sorted((key, str(value)) for key, value in kwargs.items()),
+                    [model_watermark(env[name]) for name in model_names],
+                    vary() if vary else None,
+                )
+            except Exception as e:
+                logging.getLogger(func.__module__).warning(
+                    "ETag unavailable for %s: %s", func.__name__, e
+                )
+                return func(*args, **kwargs)
+            cached = not_modified(etag)
+            if cached is not None:
+                return cached
+            response = func(*args, **kwargs)
+            if getattr(response, "status_code", 200) == 200:
+                response.headers["ETag"] = etag
+                response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+            return response
+
+        return wrapper
+
+    return decorator
 
 
 def handle_api_errors(func):
@@ -39,21 +254,21 @@ def handle_api_errors(func):
         except AccessError as e:
             logger.error("AccessError in API: %s", str(e))
             return Response(
-                json.dumps({"status": "error", "code": 403, "message": str(e)}),
+                json_dumps({"status": "error", "code": 403, "message": str(e)}),
                 status=403,
                 headers=CORS_HEADERS,
             )
         except ValidationError as e:
             logger.error("ValidationError in API: %s", str(e))
             return Response(
-                json.dumps({"status": "error", "code": 400, "message": str(e)}),
+                json_dumps({"status": "error", "code": 400, "message": str(e)}),
                 status=400,
                 headers=CORS_HEADERS,
             )
         except Exception as e:
             logger.error("Unexpected error in API: %s", str(e))
             return Response(
-                json.dumps({"status": "error", "code": 500, "message": "Internal server error"}),
+                json_dumps({"status": "error", "code": 500, "message": "Internal server error"}),
                 status=500,
                 headers=CORS_HEADERS,
             )
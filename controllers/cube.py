@@ -0,0 +1,134 @@
+"""Statistiques croisées génériques (``/api/patrimoine/stats/cube``).
+
+Le client choisit des dimensions et des mesures dans une liste blanche. Une
+seule requête groupée sur ``patrimoine.asset`` calcule le résultat, qui est
+gardé en mémoire par worker. La clé de cache comprend les dimensions, les
+mesures, les filtres, le périmètre d'accès et le filigrane du modèle
+(nombre, dernier ``write_date``) des biens et des modèles liés aux
+dimensions demandées : toute création, modification ou suppression produit
+une nouvelle clé, les anciennes sortent du cache par ancienneté.
+"""
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from odoo.exceptions import ValidationError
+
+from .common import model_watermark
+from .dashboard import ADMIN_GROUP
+
+MAX_DIMENSIONS = 3
+CACHE_SIZE = 256
+
+# Nom public -> groupement ``_read_group``.
+DIMENSIONS = {
+    "type": "type",
+    "subcategory": "subcategory_id",
+    "category": "category_id",
+    "department": "department_id",
+    "location": "location_id",
+    "etat": "etat",
+    "year": "date_acquisition:year",
+}
+# Dimensions relationnelles -> modèle dont le nom affiché est renvoyé.
+RELATION_DIMENSIONS = {
+    "subcategory": "asset.subcategory",
+    "category": "asset.category",
+    "department": "hr.department",
+    "location": "stock.location",
+}
+# Nom public -> agrégat ``_read_group``.
+MEASURES = {
+    "count": "__count",
+    "sum": "valeur_acquisition:sum",
+    "avg": "valeur_acquisition:avg",
+}
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _names(param, allowed, label):
+    names = [name.strip() for name in (param or "").split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValidationError(f"{label} inconnu(e)s : {', '.join(unknown)}")
+    return names
+
+
+def parse_filters(params):
+    """Domaine construit à partir des filtres de la requête (noms de dimensions)."""
+    domain = []
+    for name in DIMENSIONS:
+        value = params.get(name)
+        if not value:
+            continue
+        try:
+            if name == "year":
+                year = int(value)
+                domain += [
+                    ("date_acquisition", ">=", date(year, 1, 1)),
+                    ("date_acquisition", "<=", date(year, 12, 31)),
+                ]
+            elif name in RELATION_DIMENSIONS:
+                domain.append((DIMENSIONS[name], "=", int(value)))
+            else:
+                domain.append((DIMENSIONS[name], "=", value))
+        except ValueError:
+            raise ValidationError(f"Filtre invalide : {name}={value}")
+    return domain
+
+
+def _format(name, value):
+    if name in RELATION_DIMENSIONS:
+        return {"id": value.id, "name": value.display_name} if value else None
+    if name == "year":
+        return value.year if value else None
+    return value or None
+
+
+def cube(env, params):
+    """Calcule (ou relit en cache) le cube décrit par ``params``."""
+    dimensions = _names(params.get("dimensions"), DIMENSIONS, "Dimensions")
+    if len(dimensions) > MAX_DIMENSIONS:
+        raise ValidationError(f"{MAX_DIMENSIONS} dimensions au plus.")
+    measures = _names(params.get("measures") or "count", MEASURES, "Mesures")
+    domain = parse_filters(params)
+
+    assets = env["patrimoine.asset"]
+    scope = "admin" if env.user.has_group(ADMIN_GROUP) else env.uid
+    key = (
+        env.cr.dbname,
+        scope,
+        env.context.get("lang"),
+        tuple(dimensions),
+        tuple(measures),
+        repr(domain),
+        model_watermark(assets),
+        tuple(
+            model_watermark(env[RELATION_DIMENSIONS[name]])
+            for name in dimensions if name in RELATION_DIMENSIONS
+        ),
+    )
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    groups = assets._read_group(
+        domain,
+        [DIMENSIONS[name] for name in dimensions],
+        [MEASURES[name] for name in measures],
+    )
+    rows = []
+    for group in groups:
+        row = {name: _format(name, value) for name, value in zip(dimensions, group)}
+        row.update(zip(measures, group[len(dimensions):]))
+        rows.append(row)
+    result = {"dimensions": dimensions, "measures": measures, "rows": rows}
+
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
@@ -0,0 +1,146 @@
+"""Statistiques des biens pour les routes ``/api/patrimoine/stats*``.
+
+:func:`grouped_counts` lit les agrégats dans ``patrimoine.stats`` pour les
+administrateurs (quelques centaines de lignes pré-agrégées) et agrège
+``patrimoine.asset`` pour les autres profils, dont les règles d'accès
+restreignent les biens visibles.
+
+:func:`dashboard_stats` fournit toutes les ventilations du tableau de bord à
+partir d'un seul groupement par (département, type, sous-catégorie, état),
+replié en Python ; seule la répartition par âge demande une seconde requête.
+
+:func:`net_book_value` présente la valeur nette comptable par département
+calculée par ``patrimoine.asset._net_book_value_by_department``.
+
+:func:`monthly_series` lit l'historique ``patrimoine.stats.monthly`` (une
+ligne par mois, type et département) en une requête groupée.
+"""
+
+ADMIN_GROUP = "gestion_patrimoine.group_patrimoine_admin"
+OUT_OF_SERVICE_STATES = ("hs", "reforme")
+# Ventilations possibles des séries mensuelles : paramètre -> champ.
+SERIES_GROUPBY = {"type": "type", "department": "department_id"}
+
+
+def grouped_counts(env, groupby, domain=()):
+    """Renvoie ``[(*valeurs de groupby, nombre, valeur totale)]`` des biens.
+
+    ``groupby`` et ``domain`` ne portent que sur ``department_id``,
+    ``subcategory_id``, ``type`` et ``etat``, communs aux deux modèles.
+    """
+    if env.user.has_group(ADMIN_GROUP):
+        return env["patrimoine.stats"].sudo()._read_group(
+            list(domain), list(groupby), ["asset_count:sum", "value_total:sum"]
+        )
+    return env["patrimoine.asset"]._read_group(
+        list(domain), list(groupby), ["__count", "valeur_acquisition:sum"]
+    )
+
+
+def etat_summary(groups):
+    """Résumé au format de ``/api/patrimoine/stats`` à partir de couples
+    ``(état, nombre)``."""
+    counts_by_etat = {}
+    for etat, count in groups:
+        counts_by_etat[etat] = counts_by_etat.get(etat, 0) + count
+    return {
+        "total": sum(counts_by_etat.values()),
+        "inService": counts_by_etat.get("service", 0),
+        "inStock": counts_by_etat.get("stock", 0),
+        "outOfService": sum(counts_by_etat.get(etat, 0) for etat in OUT_OF_SERVICE_STATES),
+    }
+
+
+def dashboard_stats(env, domain=()):
+    """Renvoie toutes les statistiques du tableau de bord pour ``domain``."""
+    assets = env["patrimoine.asset"]
+    groups = grouped_counts(env, ["department_id", "type", "subcategory_id", "etat"], domain)
+
+    by_etat, by_type = [], {}
+    by_department, by_subcategory = {}, {}
+    for department, asset_type, subcategory, etat, count, value in groups:
+        by_etat.append((etat, count))
+        by_type[asset_type] = by_type.get(asset_type, 0) + count
+        entry = by_department.setdefault(department, [0, 0.0])
+        entry[0] += count
+        entry[1] += value or 0.0
+        by_subcategory[subcategory] = by_subcategory.get(subcategory, 0) + count
+
+    type_labels = dict(assets._fields["type"].get_description(env)["selection"])
+    return {
+        "stats": etat_summary(by_etat),
+        "by_age": [
+            {"name": label, "count": count} for label, count in assets._count_by_age(domain)
+        ],
+        "by_department": [
+            {
+                "id": department.id or 0,
+                "name": department.display_name if department else "Non affecté",
+                "count": count,
+            }
+            for department, (count, _value) in by_department.items()
+        ],
+        "by_department_value": [
+            {"id": department.id, "name": department.display_name, "value": value}
+            for department, (_count, value) in by_department.items()
+            if department
+        ],
+        "by_type": [
+            {"code": asset_type, "name": type_labels.get(asset_type, asset_type), "count": count}
+            for asset_type, count in by_type.items()
+        ],
+        "by_detailed_category": [
+            {
+                "id": subcategory.id or 0,
+                "name": subcategory.display_name if subcategory else "Non classifié",
+                "count": count,
+            }
+            for subcategory, count in by_subcategory.items()
+        ],
+    }
+
+
+def monthly_series(env, groupby=None, domain=()):
+    """Renvoie les séries ``{key, name, points: [{month, count, value}]}``
+    de l'historique mensuel, une par valeur de ``groupby`` (ou une seule)."""
+    fields_groupby = ["month:month"] + ([SERIES_GROUPBY[groupby]] if groupby else [])
+    groups = env["patrimoine.stats.monthly"]._read_group(
+        list(domain), fields_groupby, ["asset_count:sum", "value_total:sum"], order="month:month"
+    )
+    type_labels = dict(
+        env["patrimoine.asset"]._fields["type"].get_description(env)["selection"]
+    )
+    series = {}
+    for month, *key, count, value in groups:
+        key = key[0] if key else None
+        if key not in series:
+            if groupby == "department":
+                code, name = key.id or 0, key.display_name if key else "Non affecté"
+            elif groupby == "type":
+                code, name = key, type_labels.get(key, key)
+            else:
+                code, name = "total", "Total"
+            series[key] = {"key": code, "name": name, "points": []}
+        entry = series[key]
+        entry["points"].append({"month": month.strftime("%Y-%m"), "count": count, "value": value})
+    return list(series.values())
+
+
+def net_book_value(env, year, domain=()):
+    """Valeur nette comptable des biens amortissables, par département."""
+    rows = env["patrimoine.asset"]._net_book_value_by_department(domain, year)
+    departments = env["hr.department"].browse(
+        [department_id for department_id, *_values in rows if department_id]
+    )
+    names = {department.id: department.display_name for department in departments}
+    return [
+        {
+            "id": department_id or 0,
+            "name": names.get(department_id, "Non affecté"),
+            "count": count,
+            "gross": gross,
+            "depreciation": depreciation,
+            "net": net,
+        }
+        for department_id, count, gross, depreciation, net in rows
+    ]
@@ -0,0 +1,38 @@
+"""Export en flux (NDJSON) du registre des biens.
+
+La réponse HTTP est alimentée par un générateur : les biens sont parcourus par
+lots ordonnés sur ``id`` et chaque bien est émis sur une ligne JSON dès qu'il
+est sérialisé. La mémoire du worker reste ainsi constante quelle que soit la
+taille du registre.
+
+Le curseur de la requête est fermé avant que le serveur ne consomme le corps
+de la réponse ; le générateur ouvre donc son propre curseur, avec
+l'utilisateur et le contexte de l'appelant pour conserver les règles d'accès.
+"""
+from odoo import api
+
+from .common import json_dumps
+from .serializers import AssetSerializer
+
+EXPORT_BATCH_SIZE = 1000
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+def iter_ndjson(registry, uid, context, domain, fields=None, batch_size=EXPORT_BATCH_SIZE):
+    """Génère une ligne JSON par bien correspondant à ``domain``."""
+    with registry.cursor() as cr:
+        env = api.Environment(cr, uid, context)
+        assets = env["patrimoine.asset"]
+        serializer = AssetSerializer(env, "list", fields=fields)
+        last_id = 0
+        while True:
+            batch = assets.search(
+                list(domain) + [("id", ">", last_id)], order="id asc", limit=batch_size
+            )
+            if not batch:
+                break
+            for row in serializer.serialize(batch):
+                yield json_dumps(row) + "\n"
+            last_id = batch.ids[-1]
+            # Le cache ORM ne doit pas grossir au fil des lots.
+            env.invalidate_all()
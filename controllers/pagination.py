@@ -0,0 +1,133 @@
+"""Pagination par curseur (keyset) partagée par les routes de liste.
+
+Le curseur est un jeton opaque (JSON encodé en base64 url-safe) qui contient
+l'ordre utilisé et les valeurs de tri du dernier enregistrement renvoyé. La
+page suivante est obtenue avec un domaine « strictement après » ces valeurs,
+ce qui garde un coût constant par requête quelle que soit la profondeur.
+"""
+import base64
+import json
+
+from odoo.exceptions import ValidationError
+
+DEFAULT_LIMIT = 80
+MAX_LIMIT = 500
+
+# Ordres stables disponibles : la dernière colonne est toujours ``id`` pour
+# départager les égalités.
+ORDERINGS = {
+    "id": ("id",),
+    "date_acquisition": ("date_acquisition", "id"),
+}
+
+
+def wants_pagination(kw):
+    """Indique si l'appelant a demandé le mode paginé (``limit`` ou ``cursor``)."""
+    return bool(kw.get("limit") or kw.get("cursor"))
+
+
+def encode_cursor(order, values):
+    """Construit le jeton opaque pour l'ordre ``order`` et les valeurs de tri."""
+    payload = json.dumps({"o": order, "k": values}, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, orderings=ORDERINGS):
+    """Décode un jeton produit par :func:`encode_cursor`.
+
+    Lève une ``ValidationError`` si le jeton est illisible ou ne correspond à
+    aucun ordre connu.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        order, values = payload["o"], payload["k"]
+    except Exception:
+        raise ValidationError("Curseur de pagination invalide.")
+    if order not in orderings or len(values) != len(orderings[order]):
+        raise ValidationError("Curseur de pagination invalide.")
+    return order, values
+
+
+def parse_limit(value):
+    """Convertit le paramètre ``limit`` en entier borné à ``MAX_LIMIT``."""
+    if not value:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError("Le paramètre 'limit' doit être un entier.")
+    if limit <= 0:
+        raise ValidationError("Le paramètre 'limit' doit être positif.")
+    return min(limit, MAX_LIMIT)
+
+
+def keyset_domain(columns, values):
+    """Domaine sélectionnant les lignes situées strictement après ``values``.
+
+    Les colonnes sont triées en ordre croissant ; PostgreSQL place alors les
+    valeurs NULL en dernier, ce dont le domaine tient compte pour la colonne
+    de tri principale.
+    """
+    if len(columns) == 1:
+        return [(columns[0], ">", values[0])]
+    column, value = columns[0], values[0]
+    tail = keyset_domain(columns[1:], values[1:])
+    if value in (None, False):
+        return ["&", (column, "=", False)] + tail
+    return [
+        "|", "|",
+        (column, ">", value),
+        (column, "=", False),
+        "&", (column, "=", value),
+    ] + tail
+
+
+def paginate(model, domain, kw, orderings=ORDERINGS, default_order="id"):
+    """Renvoie ``(records, next_cursor)`` pour la page demandée dans ``kw``.
+
+    ``kw`` contient les paramètres de la requête : ``limit``, ``cursor`` et
+    éventuellement ``order`` (clé de ``orderings``). ``next_cursor`` vaut
+    ``None`` lorsque la dernière page est atteinte.
+    """
+    limit = parse_limit(kw.get("limit"))
+    order = kw.get("order") or default_order
+    values = None
+    if kw.get("cursor"):
+        order, values = decode_cursor(kw["cursor"], orderings)
+    if order not in orderings:
+        raise ValidationError(f"Ordre de pagination inconnu : {order}")
+
+    columns = orderings[order]
+    search_domain = list(domain)
+    if values is not None:
+        search_domain += keyset_domain(columns, values)
+
+    records = model.search(
+        search_domain,
+        order=", ".join(f"{column} asc" for column in columns),
+        limit=limit + 1,
+    )
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        last = records[-1]
+        next_cursor = encode_cursor(order, [last[column] or None for column in columns])
+    return records, next_cursor
+
+
+def page_envelope(data, next_cursor, **extra):
+    """Enveloppe JSON commune des réponses paginées."""
+    return {"status": "success", "data": data, "next_cursor": next_cursor, **extra}
+
+
+def search_page(model, domain, kw, **options):
+    """Recherche paginée si l'appelant l'a demandée, sinon recherche complète.
+
+    Renvoie ``(records, next_cursor)`` ; ``next_cursor`` vaut toujours
+    ``None`` en mode non paginé afin de garder la compatibilité des routes
+    qui renvoient historiquement une liste brute.
+    """
+    if wants_pagination(kw):
+        return paginate(model, domain, kw, **options)
+    return model.search(domain), None
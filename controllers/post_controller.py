@@ -5,7 +5,8 @@ from odoo import http
 from odoo.http import request
 from odoo.exceptions import ValidationError
 
-from .common import Response, handle_api_errors, CORS_HEADERS, json_response
+from .common import Response, handle_api_errors, CORS_HEADERS, json_dumps, json_response
+from .serializers import versioned_image_url
 
 _logger = logging.getLogger(__name__)
 
@@ -40,7 +41,11 @@ class IntranetPostController(http.Controller):
                 'author_id': post.user_id.id,
                 'create_date': post.create_date,
                 'type': post.post_type,
-                'image': f"/web/image/intranet.post/{post.id}/image" if post.image else None,
+                'image': (
+                    versioned_image_url("intranet.post", post.id, post.image_checksum)
+                    if post.has_image
+                    else None
+                ),
                 'attachments': [
                     {'id': att.id, 'name': att.name, 'url': f"/web/content/{att.id}?download=1"}
                     for att in post.attachment_ids
@@ -51,7 +56,7 @@ class IntranetPostController(http.Controller):
                 'liked': liked,
             })
         return Response(
-            json.dumps({'status': 'success', 'data': result}, default=str),
+            json_dumps({'status': 'success', 'data': result}),
             headers=CORS_HEADERS,
         )
 
@@ -75,7 +80,7 @@ class IntranetPostController(http.Controller):
                 "ÉCHEC : Le titre ('name') est manquant dans les données reçues."
             )
             return Response(
-                json.dumps({"error": "Le titre du post est obligatoire."}),
+                json_dumps({"error": "Le titre du post est obligatoire."}),
                 status=400,
                 content_type="application/json",
             )
@@ -110,7 +115,11 @@ class IntranetPostController(http.Controller):
             'author_id': record.user_id.id,
             'create_date': record.create_date,
             'type': record.post_type,
-            'image': f"/web/image/intranet.post/{record.id}/image" if record.image else None,
+            'image': (
+                versioned_image_url("intranet.post", record.id, record.image_checksum)
+                if record.has_image
+                else None
+            ),
             'attachments': [
                 {
                     'id': att.id,
@@ -124,7 +133,7 @@ class IntranetPostController(http.Controller):
         }
 
         return Response(
-            json.dumps({"status": "success", "data": {"id": record.id}}, default=str),
+            json_dumps({"status": "success", "data": {"id": record.id}}),
             content_type="application/json",
             headers=CORS_HEADERS,)
 
@@ -191,7 +200,7 @@ class IntranetPostController(http.Controller):
     def get_comments(self, post_id, **kw):
         post = request.env['intranet.post'].sudo().browse(post_id)
         if not post.exists():
-            return Response(json.dumps({'status': 'error', 'message': 'Post not found'}), status=404, headers=CORS_HEADERS)
+            return Response(json_dumps({'status': 'error', 'message': 'Post not found'}), status=404, headers=CORS_HEADERS)
 
         comment_model = request.env['intranet.post.comment'].sudo()
         comments = comment_model.search([('post_id', '=', post.id), ('parent_id', '=', False)], order='create_date asc')
@@ -208,14 +217,14 @@ class IntranetPostController(http.Controller):
             }
 
         data = [serialize(c) for c in comments]
-        return Response(json.dumps({'status': 'success', 'data': data}, default=str), headers=CORS_HEADERS)
+        return Response(json_dumps({'status': 'success', 'data': data}), headers=CORS_HEADERS)
 
     @http.route('/api/intranet/posts/<int:post_id>/likes', auth='user', type='http', methods=['POST'], csrf=False)
     @handle_api_errors
     def toggle_like(self, post_id, **kw):
         post = request.env['intranet.post'].sudo().browse(post_id)
         if not post.exists():
-            return Response(json.dumps({'status': 'error', 'message': 'Post not found'}), status=404, headers=CORS_HEADERS)
+            return Response(json_dumps({'status': 'error', 'message': 'Post not found'}), status=404, headers=CORS_HEADERS)
 
         like_model = request.env['intranet.post.like'].sudo()
         existing = like_model.search([('post_id', '=', post.id), ('user_id', '=', request.env.user.id)], limit=1)
@@ -227,15 +236,14 @@ class IntranetPostController(http.Controller):
             like_model.create({'post_id': post.id, 'user_id': request.env.user.id})
             liked = True
         return Response(
-            json.dumps(
+            json_dumps(
                 {
                     "status": "success",
                     "data": {
                         "liked": liked,
                         "like_count": len(post.like_ids),
                     },
-                },
-                default=str,
+                }
             ),
             headers=CORS_HEADERS,
         )
@@ -245,11 +253,11 @@ class IntranetPostController(http.Controller):
     def add_view(self, post_id, **kw):
         post = request.env['intranet.post'].sudo().browse(post_id)
         if not post.exists():
-            return Response(json.dumps({'status': 'error', 'message': 'Post not found'}), status=404, headers=CORS_HEADERS)
+            return Response(json_dumps({'status': 'error', 'message': 'Post not found'}), status=404, headers=CORS_HEADERS)
 
         post.write({'viewer_ids': [(4, request.env.user.id)]})
         return Response(
-            json.dumps({'status': 'success', 'data': {'view_count': post.view_count}}, default=str),
+            json_dumps({'status': 'success', 'data': {'view_count': post.view_count}}),
             headers=CORS_HEADERS,
         )
 
@@ -260,7 +268,7 @@ class IntranetPostController(http.Controller):
             ('viewer_ids', 'not in', request.env.user.id)
         ])
         return Response(
-            json.dumps({'status': 'success', 'data': {'count': count}}, default=str),
+            json_dumps({'status': 'success', 'data': {'count': count}}),
             headers=CORS_HEADERS,
         )
 
@@ -370,4 +378,4 @@ class IntranetPostController(http.Controller):
             'replies': replies_data
         }
 
-        return Response(json.dumps({'status': 'success', 'data': response_data}, default=str), headers=CORS_HEADERS)
+        return Response(json_dumps({'status': 'success', 'data': response_data}), headers=CORS_HEADERS)
@@ -0,0 +1,495 @@
+"""Sérialisation groupée des enregistrements renvoyés par les routes API.
+
+Un sérialiseur lit toutes les colonnes nécessaires en un seul ``read`` puis
+résout les noms des relations avec une lecture groupée par modèle lié. Le
+nombre de requêtes SQL reste donc fixe quelle que soit la taille de la page,
+au lieu d'un accès ``record.relation.name`` par enregistrement.
+
+Le paramètre ``fields`` (``?fields=id,name,code``) restreint les clés
+produites ; seules les colonnes et relations utiles à ces clés sont lues.
+"""
+from odoo.exceptions import ValidationError
+
+# Longueur du préfixe de l'empreinte SHA-1 utilisé comme jeton de version.
+IMAGE_TOKEN_LENGTH = 12
+
+
+class _Context:
+    """Données préchargées partagées par les extracteurs d'une sérialisation."""
+
+    def __init__(self, related, extra):
+        self.related = related
+        self.extra = extra
+
+    def related_value(self, column, row, attr):
+        record = self.related.get(column, {}).get(row[column])
+        return record[attr] if record else None
+
+
+class Field:
+    """Clé de sortie : colonnes lues et fonction ``getter(row, ctx)``.
+
+    ``related`` liste les couples ``(colonne many2one, attribut)`` à lire sur
+    le modèle lié ; ``prefetch`` nomme les données supplémentaires chargées
+    par :meth:`RecordSerializer._prefetch`.
+    """
+
+    __slots__ = ("columns", "getter", "related", "prefetch")
+
+    def __init__(self, columns, getter, related=(), prefetch=None):
+        self.columns = tuple(columns)
+        self.getter = getter
+        self.related = tuple(related)
+        self.prefetch = prefetch
+
+
+def column(name, default=None):
+    """Valeur brute de la colonne ; une valeur vide est remplacée par
+    ``default()`` (une fabrique, par exemple ``dict``, pour ne jamais partager
+    le même objet mutable entre deux lignes)."""
+    if default is None:
+        return Field((name,), lambda row, ctx: row[name])
+    return Field((name,), lambda row, ctx: row[name] or default())
+
+
+def relation_id(name):
+    return Field((name,), lambda row, ctx: row[name] or None)
+
+
+def relation_name(name, attr="name"):
+    return Field(
+        (name,),
+        lambda row, ctx: ctx.related_value(name, row, attr),
+        related=((name, attr),),
+    )
+
+
+def date(name, fmt="%Y-%m-%d"):
+    return Field((name,), lambda row, ctx: row[name].strftime(fmt) if row[name] else None)
+
+
+def datetime(name):
+    return date(name, "%Y-%m-%d %H:%M:%S")
+
+
+def constant(factory):
+    return Field((), lambda row, ctx: factory())
+
+
+def versioned_image_url(model, record_id, checksum, name="image"):
+    """URL ``/web/image`` portant l'empreinte de l'image comme jeton ``unique``.
+
+    Odoo sert les URL munies de ``unique`` avec ``Cache-Control: immutable``
+    et une durée d'un an ; l'URL change dès que l'image est remplacée.
+    """
+    url = f"/web/image/{model}/{record_id}/{name}"
+    return f"{url}?unique={checksum[:IMAGE_TOKEN_LENGTH]}" if checksum else url
+
+
+def image_url(model, name="image"):
+    """URL versionnée de l'image (ou d'une miniature ``image_128``/``image_256``)."""
+    return Field(
+        ("id", "has_image", "image_checksum"),
+        lambda row, ctx: (
+            versioned_image_url(model, row["id"], row["image_checksum"], name)
+            if row["has_image"]
+            else None
+        ),
+    )
+
+
+def prefetched(name, columns=("id",), key="id"):
+    """Valeur préchargée par :meth:`RecordSerializer._prefetch` sous ``name``."""
+    return Field(
+        columns,
+        lambda row, ctx: ctx.extra[name].get(row[key]),
+        prefetch=name,
+    )
+
+
+class RecordSerializer:
+    """Base des sérialiseurs : voir :class:`AssetSerializer` pour un exemple."""
+
+    _model = None
+    # Colonne many2one -> modèle lié.
+    _relations = {}
+    # Clé de sortie -> Field.
+    _fields = {}
+    # Nom de profil -> clés de sortie, dans l'ordre du JSON.
+    profiles = {}
+
+    def __init__(self, env, profile, fields=None, sudo_relations=()):
+        self.env = env
+        self.keys = self._select_keys(self.profiles[profile], fields)
+        self.sudo_relations = set(sudo_relations)
+
+    def _select_keys(self, profile_keys, fields):
+        if not fields:
+            return profile_keys
+        if isinstance(fields, str):
+            fields = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in fields if name not in self._fields]
+        if unknown:
+            raise ValidationError(f"Champs inconnus : {', '.join(unknown)}")
+        # L'identifiant est toujours renvoyé ; les clés du profil gardent leur ordre.
+        requested = set(fields) | {"id"}
+        keys = [key for key in profile_keys if key in requested]
+        keys += [key for key in fields if key not in keys]
+        return tuple(keys)
+
+    def _selected_fields(self):
+        return [self._fields[key] for key in self.keys]
+
+    def _columns(self):
+        columns = []
+        for field in self._selected_fields():
+            for name in field.columns:
+                if name not in columns:
+                    columns.append(name)
+        return columns
+
+    def _read_related(self, rows):
+        attrs_by_column = {}
+        for field in self._selected_fields():
+            for name, attr in field.related:
+                attrs_by_column.setdefault(name, set()).add(attr)
+        related = {}
+        for name, attrs in attrs_by_column.items():
+            ids = list({row[name] for row in rows if row[name]})
+            comodel = self.env[self._relations[name]]
+            if name in self.sudo_relations:
+                comodel = comodel.sudo()
+            related[name] = {
+                rec["id"]: rec
+                for rec in (comodel.browse(ids).read(sorted(attrs)) if ids else [])
+            }
+        return related
+
+    def _prefetch(self, name, rows):
+        """Charge en une requête les données ``name`` pour toutes les lignes.
+
+        Les sous-classes traitent leurs propres préchargements et délèguent
+        les autres ; arrivé ici, ``name`` n'est déclaré par aucune.
+        """
+        raise ValidationError(
+            f"Préchargement non déclaré pour {type(self).__name__} : {name}"
+        )
+
+    def serialize(self, records):
+        """Renvoie la liste de dictionnaires pour ``records``."""
+        if not records:
+            return []
+        columns = self._columns()
+        to_read = [name for name in columns if name != "id"]
+        if to_read:
+            rows = records.read(to_read, load=None)
+        else:
+            rows = [{"id": record_id} for record_id in records.ids]
+        extra = {}
+        for field in self._selected_fields():
+            if field.prefetch and field.prefetch not in extra:
+                extra[field.prefetch] = self._prefetch(field.prefetch, rows)
+        ctx = _Context(self._read_related(rows), extra)
+        return [
+            {key: self._fields[key].getter(row, ctx) for key in self.keys}
+            for row in rows
+        ]
+
+    def serialize_one(self, record):
+        data = self.serialize(record)
+        return data[0] if data else None
+
+
+class AssetSerializer(RecordSerializer):
+    """Sérialiseur unique des biens (``patrimoine.asset``)."""
+
+    _model = "patrimoine.asset"
+    _relations = {
+        "location_id": "stock.location",
+        "employee_id": "hr.employee",
+        "department_id": "hr.department",
+        "subcategory_id": "asset.subcategory",
+        "category_id": "asset.category",
+        "fournisseur": "res.partner",
+    }
+    _fields = {
+        "id": column("id"),
+        "name": column("name"),
+        "code": column("code"),
+        "type": column("type"),
+        "status": column("etat"),
+        # Les listes affichent des vignettes : ``image`` pointe sur la miniature
+        # 256 px, l'original 1024 px reste disponible via ``image_full``.
+        "image": image_url("patrimoine.asset", "image_256"),
+        "image_128": image_url("patrimoine.asset", "image_128"),
+        "image_256": image_url("patrimoine.asset", "image_256"),
+        "image_full": image_url("patrimoine.asset"),
+        "value": column("valeur_acquisition"),
+        "acquisition_value": column("valeur_acquisition"),
+        "acquisitionDate": date("date_acquisition"),
+        "acquisition_date": date("date_acquisition"),
+        "location": relation_name("location_id"),
+        "location_id": relation_id("location_id"),
+        "department": relation_name("department_id"),
+        "department_id": relation_id("department_id"),
+        "assignedTo": relation_name("employee_id"),
+        "assigned_to": relation_name("employee_id"),
+        "assigned_to_id": relation_id("employee_id"),
+        "category": relation_name("category_id"),
+        "category_general_name": relation_name("category_id"),
+        "category_name": relation_name("category_id"),
+        "category_id": relation_id("category_id"),
+        "category_detailed_name": relation_name("subcategory_id"),
+        "subcategory_name": relation_name("subcategory_id"),
+        "subcategory_id": relation_id("subcategory_id"),
+        "fournisseur_id": relation_id("fournisseur"),
+        "details": constant(dict),
+        "customValues": column("custom_values", default=dict),
+        "custom_values": column("custom_values"),
+    }
+    profiles = {
+        # Listes du registre (React et application mobile).
+        "list": (
+            "id", "name", "image", "code", "type", "location",
+            "category_general_name", "category_detailed_name",
+            "acquisitionDate", "value", "status", "assignedTo", "assigned_to_id",
+            "department", "department_id", "details", "customValues",
+        ),
+        # Liste des items d'une sous-catégorie.
+        "item": (
+            "id", "name", "code", "subcategory_id", "subcategory_name",
+            "category_id", "category_name", "image", "custom_values", "status",
+            "assigned_to", "assigned_to_id", "department", "department_id",
+            "location", "location_id", "acquisition_date", "acquisition_value",
+        ),
+        # Matériels de l'utilisateur connecté.
+        "user": ("id", "name", "code", "status", "category", "image"),
+    }
+
+
+class AssetDetailSerializer(AssetSerializer):
+    """Fiche détaillée d'un bien : ``image`` désigne l'image originale."""
+
+    _fields = dict(AssetSerializer._fields, image=image_url("patrimoine.asset"))
+    profiles = {
+        # Les détails spécifiques sont ajoutés par la route.
+        "detail": (
+            "id", "name", "image", "code", "type", "category", "subcategory_id",
+            "location", "location_id", "department", "department_id",
+            "acquisitionDate", "value", "status", "assignedTo", "assigned_to_id",
+            "fournisseur_id", "customValues",
+        ),
+    }
+
+
+class PanneSerializer(RecordSerializer):
+    """Signalements de panne (``patrimoine.panne``)."""
+
+    _model = "patrimoine.panne"
+    _relations = {
+        "asset_id": "patrimoine.asset",
+        "declarer_par_id": "res.users",
+    }
+    _fields = {
+        "id": column("id"),
+        "name": column("name"),
+        "asset_id": relation_id("asset_id"),
+        "asset_name": relation_name("asset_id"),
+        "date_panne": date("date_panne"),
+        "description": column("description"),
+        "declarer_par_id": relation_id("declarer_par_id"),
+        "declarer_par_name": relation_name("declarer_par_id"),
+        "state": column("state"),
+    }
+    profiles = {
+        "list": (
+            "id", "name", "asset_id", "asset_name", "date_panne", "description",
+            "declarer_par_id", "declarer_par_name", "state",
+        ),
+        "manager": ("id", "name", "asset_name", "declarer_par_name", "date_panne", "state"),
+    }
+
+
+class PerteSerializer(RecordSerializer):
+    """Déclarations de perte (``patrimoine.perte``)."""
+
+    _model = "patrimoine.perte"
+    _relations = {
+        "asset_id": "patrimoine.asset",
+        "declarer_par_id": "res.users",
+    }
+    _fields = {
+        "id": column("id"),
+        "name": column("name"),
+        "asset_id": relation_id("asset_id"),
+        "asset_name": relation_name("asset_id"),
+        "asset_code": relation_name("asset_id", "code"),
+        "date_perte": datetime("date_perte"),
+        "motif": column("motif"),
+        "declarer_par_id": relation_id("declarer_par_id"),
+        "declarer_par_name": relation_name("declarer_par_id"),
+        "state": column("state"),
+        "lieu_perte": column("lieu_perte"),
+        "circonstances": column("circonstances"),
+        "actions_entreprises": column("actions_entreprises"),
+        "rapport_police": column("rapport_police"),
+        "document_url": prefetched("document_url"),
+    }
+    profiles = {
+        "list": (
+            "id", "name", "asset_id", "asset_name", "asset_code", "date_perte",
+            "motif", "declarer_par_id", "declarer_par_name", "state", "lieu_perte",
+            "circonstances", "actions_entreprises", "rapport_police", "document_url",
+        ),
+    }
+
+    def _prefetch(self, name, rows):
+        if name == "document_url":
+            # Dernière pièce jointe (procès-verbal) de chaque déclaration.
+            attachments = self.env["ir.attachment"].search_read(
+                [
+                    ("res_model", "=", self._model),
+                    ("res_id", "in", [row["id"] for row in rows]),
+                ],
+                ["res_id", "name"],
+                order="id desc",
+            )
+            urls = {}
+            for att in attachments:
+                urls.setdefault(att["res_id"], f"/web/content/{att['id']}/{att['name']}")
+            return urls
+        return super()._prefetch(name, rows)
+
+
+class PerteManagerSerializer(PerteSerializer):
+    """Déclarations de perte à valider par le manager (date sans heure)."""
+
+    _fields = dict(PerteSerializer._fields, date_perte=date("date_perte"))
+    profiles = {
+        "manager": (
+            "id", "name", "asset_name", "declarer_par_name", "date_perte",
+            "state", "lieu_perte", "circonstances", "actions_entreprises",
+            "rapport_police", "document_url",
+        ),
+    }
+
+
+class DemandeLigneSerializer(RecordSerializer):
+    """Lignes de demande de matériel (``patrimoine.demande.materiel.ligne``)."""
+
+    _model = "patrimoine.demande.materiel.ligne"
+    _relations = {
+        "demande_subcategory_id": "asset.subcategory",
+        "destinataire_department_id": "hr.department",
+        "destinataire_location_id": "stock.location",
+        "destinataire_employee_id": "hr.employee",
+    }
+    _fields = {
+        "id": column("id"),
+        "demande_id": relation_id("demande_id"),
+        "demande_subcategory_id": relation_id("demande_subcategory_id"),
+        "demande_subcategory_name": relation_name("demande_subcategory_id"),
+        "quantite": column("quantite"),
+        "destinataire_department_id": relation_id("destinataire_department_id"),
+        "destinataire_department_name": relation_name("destinataire_department_id"),
+        "destinataire_location_id": relation_id("destinataire_location_id"),
+        "destinataire_location_name": relation_name("destinataire_location_id"),
+        "destinataire_employee_id": relation_id("destinataire_employee_id"),
+        "destinataire_employee_name": relation_name("destinataire_employee_id"),
+        "description": column("description"),
+    }
+    profiles = {
+        "list": (
+            "id", "demande_subcategory_id", "demande_subcategory_name", "quantite",
+            "destinataire_department_id", "destinataire_department_name",
+            "destinataire_location_id", "destinataire_location_name",
+            "destinataire_employee_id", "destinataire_employee_name", "description",
+        ),
+    }
+
+
+class DemandeSerializer(RecordSerializer):
+    """Demandes de matériel (``patrimoine.demande.materiel``) et leurs lignes."""
+
+    _model = "patrimoine.demande.materiel"
+    _relations = {"demandeur_id": "res.users"}
+    _fields = {
+        "id": column("id"),
+        "name": column("name"),
+        "demandeur_id": relation_id("demandeur_id"),
+        "demandeur_name": relation_name("demandeur_id"),
+        "departement_demandeur": prefetched(
+            "departement_demandeur", columns=("demandeur_id",), key="demandeur_id"
+        ),
+        "motif_demande": column("motif_demande"),
+        "state": column("state"),
+        "date_demande": datetime("date_demande"),
+        "date_traitement": datetime("date_traitement"),
+        "lignes": prefetched("lignes"),
+    }
+    profiles = {
+        "list": (
+            "id", "name", "demandeur_id", "demandeur_name", "departement_demandeur",
+            "motif_demande", "state", "date_demande", "date_traitement", "lignes",
+        ),
+    }
+
+    def _prefetch(self, name, rows):
+        if name == "departement_demandeur":
+            # Département de l'employé lié à chaque demandeur : une recherche
+            # des employés, puis une lecture du nom (``name`` et non le nom
+            # complet « Parent / Enfant ») de tous leurs départements.
+            user_ids = list({row["demandeur_id"] for row in rows if row["demandeur_id"]})
+            employees = self.env["hr.employee"].search_read(
+                [("user_id", "in", user_ids)], ["user_id", "department_id"], load=None
+            )
+            department_ids = list({
+                employee["department_id"] for employee in employees if employee["department_id"]
+            })
+            names = {
+                department["id"]: department["name"]
+                for department in (
+                    self.env["hr.department"].browse(department_ids).read(["name"])
+                    if department_ids else []
+                )
+            }
+            departments = {}
+            for employee in employees:
+                departments.setdefault(
+                    employee["user_id"], names.get(employee["department_id"], "N/A")
+                )
+            return {user_id: departments.get(user_id, "N/A") for user_id in user_ids}
+        if name == "lignes":
+            lignes = self.env["patrimoine.demande.materiel.ligne"].search(
+                [("demande_id", "in", [row["id"] for row in rows])]
+            )
+            serializer = DemandeLigneSerializer(self.env, "list")
+            serializer.keys += ("demande_id",)
+            by_demande = {row["id"]: [] for row in rows}
+            for ligne in serializer.serialize(lignes):
+                by_demande[ligne.pop("demande_id")].append(ligne)
+            return by_demande
+        return super()._prefetch(name, rows)
+
+
+class AssetImportSerializer(RecordSerializer):
+    """Suivi des imports de biens en masse (``patrimoine.asset.import``)."""
+
+    _model = "patrimoine.asset.import"
+    _fields = {
+        "id": column("id"),
+        "name": column("name"),
+        "state": column("state"),
+        "total_rows": column("total_rows"),
+        "processed_rows": column("processed_rows"),
+        "created_count": column("created_count"),
+        "error_count": column("error_count"),
+        "progress": column("progress"),
+        "errors": column("error_log", default=list),
+    }
+    profiles = {
+        "status": (
+            "id", "name", "state", "total_rows", "processed_rows", "created_count",
+            "error_count", "progress", "errors",
+        ),
+    }
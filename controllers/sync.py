@@ -0,0 +1,119 @@
+"""Synchronisation différentielle des biens pour le client mobile.
+
+Le filigrane est la colonne ``sync_txid`` (identifiant de la dernière
+transaction qui a écrit la ligne, posé par trigger, voir
+``models/asset_tombstone.py``) des biens et des traces de suppression. Au
+début d'un tour de synchronisation, on relève le ``xmin`` de l'instantané
+courant : aucune transaction encore ouverte n'a d'identifiant inférieur. Le
+tour suivant relit toutes les lignes de ``sync_txid`` supérieur ou égal à ce
+``xmin`` ; une transaction validée après l'émission d'un jeton est donc
+toujours renvoyée, au prix de quelques doublons que le client absorbe (il
+remplace les biens par identifiant).
+
+Le jeton ``since`` est un curseur opaque (voir :mod:`.pagination`) qui
+contient les bornes basses des biens et des traces, le ``xmin`` du tour en
+cours, la position atteinte dans chacune des deux listes ``(sync_txid, id)``
+et la date d'émission.
+"""
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tools import SQL
+
+from .pagination import MAX_LIMIT, decode_cursor, encode_cursor, parse_limit
+from .serializers import AssetSerializer
+
+SYNC_ORDER = "sync"
+SYNC_TOKEN = {SYNC_ORDER: (
+    "asset_low", "tombstone_low", "round_low",
+    "asset_txid", "asset_id", "tombstone_txid", "tombstone_id", "issued_at",
+)}
+
+
+def snapshot_xmin(cr):
+    """Plus petit identifiant de transaction encore ouverte."""
+    cr.execute("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+    return cr.fetchone()[0]
+
+
+def changed_since(model, low, after, limit):
+    """Lignes ``(id, sync_txid)`` de ``model`` lisibles par l'utilisateur,
+    écrites par une transaction ``>= low`` et situées après la position
+    ``after`` (``(sync_txid, id)`` ou ``None``), au plus ``limit``."""
+    query = model._search([])
+    txid = SQL.identifier(model._table, "sync_txid")
+    record_id = SQL.identifier(model._table, "id")
+    query.add_where(SQL("%s >= %s", txid, low))
+    if after:
+        query.add_where(SQL("(%s, %s) > (%s, %s)", txid, record_id, *after))
+    query.order = SQL("%s, %s", txid, record_id)
+    query.limit = limit
+    model.env.cr.execute(query.select(record_id, txid))
+    return model.env.cr.fetchall()
+
+
+def asset_changes(env, since=None, limit=None, fields_param=None):
+    """Renvoie la réponse de ``/api/patrimoine/assets/changes``.
+
+    Sans ``since`` (ou si le jeton est plus ancien que la rétention des
+    traces de suppression), la synchronisation repart de zéro et ``reset``
+    vaut ``True`` : le client doit alors vider son stockage local.
+
+    Les traces de suppression suivent les règles d'accès des biens (département
+    et employé au moment de la suppression). Un bien qui sort du périmètre de
+    l'utilisateur sans être supprimé (changement de département ou
+    d'affectation) n'apparaît ni dans ``data`` ni dans ``deleted`` : le client
+    le garde jusqu'à sa prochaine synchronisation complète.
+    """
+    assets_model = env["patrimoine.asset"]
+    tombstones_model = env["patrimoine.asset.tombstone"]
+    limit = parse_limit(limit or MAX_LIMIT)
+    now = fields.Datetime.now()
+
+    reset = True
+    if since:
+        _order, values = decode_cursor(since, SYNC_TOKEN)
+        (asset_low, tombstone_low, round_low,
+         asset_txid, asset_id, tombstone_txid, tombstone_id, issued_at) = values
+        retention = timedelta(days=tombstones_model.RETENTION_DAYS)
+        reset = fields.Datetime.to_datetime(issued_at) < now - retention
+    if reset:
+        # Les suppressions validées avant le début de la synchronisation sont
+        # déjà absentes de la liste complète.
+        round_low = snapshot_xmin(env.cr)
+        asset_low, tombstone_low = 0, round_low
+        asset_txid = asset_id = tombstone_txid = tombstone_id = None
+    elif round_low is None:
+        round_low = snapshot_xmin(env.cr)
+
+    asset_rows = changed_since(
+        assets_model, asset_low, asset_id and (asset_txid, asset_id), limit + 1
+    )
+    tombstone_rows = changed_since(
+        tombstones_model, tombstone_low, tombstone_id and (tombstone_txid, tombstone_id), limit + 1
+    )
+    has_more = len(asset_rows) > limit or len(tombstone_rows) > limit
+    asset_rows, tombstone_rows = asset_rows[:limit], tombstone_rows[:limit]
+
+    if has_more:
+        if asset_rows:
+            asset_id, asset_txid = asset_rows[-1]
+        if tombstone_rows:
+            tombstone_id, tombstone_txid = tombstone_rows[-1]
+        values = [asset_low, tombstone_low, round_low,
+                  asset_txid, asset_id, tombstone_txid, tombstone_id, now]
+    else:
+        # Tour terminé : le suivant reprend tout ce qui a été écrit par une
+        # transaction encore ouverte au début de celui-ci.
+        values = [round_low, round_low, None, None, None, None, None, now]
+
+    assets = assets_model.browse([row[0] for row in asset_rows])
+    tombstones = tombstones_model.browse([row[0] for row in tombstone_rows])
+    return {
+        "status": "success",
+        "data": AssetSerializer(env, "list", fields=fields_param).serialize(assets),
+        "deleted": tombstones.mapped("asset_ref"),
+        "next_since": encode_cursor(SYNC_ORDER, values),
+        "has_more": has_more,
+        "reset": reset,
+    }
@@ -36,6 +36,9 @@ def pre_init_hook(cr):
 
 
 def post_init_hook(env):
-    """Ensure XML ID exists when upgrading the module."""
+    """Ensure XML ID exists when upgrading the module, then seed the
+    statistics table (``patrimoine_asset`` does not exist yet when
+    ``patrimoine.stats`` is initialized on a fresh install)."""
     _link_admin_group(env)
+    env['patrimoine.stats']._cron_reconcile()
 
@@ -5,10 +5,17 @@ The unit tests insert stub implementations of the ``odoo`` package in
 even outside an actual Odoo environment.
 """
 
+from . import image_mixin
+from . import ir_sequence
+from . import stats
+from . import hr_department
+from . import amortissement
 from . import asset
+from . import asset_tombstone
 from . import asset_informatique
 from . import asset_mobilier
 from . import asset_vehicule
+from . import asset_import
 from . import entretien
 from . import mouvement
 from . import fiche_vie
@@ -0,0 +1,250 @@
+import io
+import logging
+from datetime import date
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+from .depreciation import DEGRESSIVE, LINEAR, compute_schedules, to_copy_buffer
+
+_logger = logging.getLogger(__name__)
+
+# Champs du bien dont dépend son plan d'amortissement.
+DEPRECIATION_ASSET_FIELDS = ('valeur_acquisition', 'date_acquisition', 'subcategory_id')
+# Champs de la sous-catégorie qui définissent la politique d'amortissement.
+DEPRECIATION_POLICY_FIELDS = ('depreciation_method', 'depreciation_years')
+# Nombre maximal de biens (lignes de débit) par pièce comptable.
+MAX_LINES_PER_MOVE = 2000
+# Nombre de pièces créées par appel à ``create``.
+MOVE_BATCH_SIZE = 20
+# Paramètre système : premier exercice passé en comptabilité par le cron.
+FIRST_POSTING_YEAR_PARAM = 'gestion_patrimoine.depreciation_first_year'
+
+
+class PatrimoineAmortissement(models.Model):
+    """Plan d'amortissement : une ligne par bien amortissable et par exercice.
+
+    Les lignes sont recalculées en bloc par :meth:`_recompute` (module
+    ``depreciation``) et écrites avec ``COPY`` ; elles ne passent jamais par
+    ``create``. Un bien absent de la table pour un exercice postérieur à son
+    acquisition est totalement amorti.
+    """
+    _name = 'patrimoine.amortissement'
+    _description = "Plan d'amortissement des biens"
+    _log_access = False
+    _order = 'asset_id, year'
+
+    asset_id = fields.Many2one(
+        'patrimoine.asset', string="Bien", required=True, readonly=True, ondelete='cascade', index=True
+    )
+    year = fields.Integer(string="Exercice", required=True, readonly=True, index=True)
+    dotation = fields.Float(string="Dotation", readonly=True)
+    valeur_nette = fields.Float(string="Valeur nette comptable", readonly=True)
+    move_id = fields.Many2one(
+        'account.move', string="Pièce comptable", readonly=True, ondelete='set null', index=True
+    )
+
+    _sql_constraints = [
+        ('asset_year_unique', 'unique(asset_id, year)', "Une seule ligne d'amortissement par bien et par exercice."),
+    ]
+
+    @api.model
+    def _recompute(self, assets=None):
+        """Recalcule les plans de ``assets`` (de tout le registre si ``None``)
+        en trois requêtes : suppression, lecture des biens, ``COPY``.
+
+        Les exercices déjà passés en comptabilité (``move_id``) sont conservés
+        tels quels : le nouveau plan repart de la valeur nette du dernier
+        d'entre eux, sur la durée d'utilisation restante, pour que les
+        dotations comptabilisées et à venir totalisent la valeur du bien.
+        """
+        if assets is not None and not assets:
+            return
+        self.env['patrimoine.asset'].flush_model(DEPRECIATION_ASSET_FIELDS)
+        self.env['asset.subcategory'].flush_model(DEPRECIATION_POLICY_FIELDS)
+        self.flush_model(['move_id'])
+        if assets is None:
+            rows_scope, scope = SQL("TRUE"), SQL("TRUE")
+        else:
+            rows_scope = SQL("plan.asset_id = ANY(%s)", list(assets.ids))
+            scope = SQL("a.id = ANY(%s)", list(assets.ids))
+        self.env.cr.execute(SQL("""
+            DELETE FROM patrimoine_amortissement plan
+             WHERE plan.move_id IS NULL AND %s
+               AND plan.year > COALESCE((
+                   SELECT MAX(posted.year) FROM patrimoine_amortissement posted
+                    WHERE posted.asset_id = plan.asset_id AND posted.move_id IS NOT NULL
+               ), 0)
+        """, rows_scope))
+        self.env.cr.execute(SQL("""
+            SELECT a.id, a.valeur_acquisition, a.date_acquisition,
+                   s.depreciation_method, s.depreciation_years,
+                   posted.year, posted.valeur_nette
+              FROM patrimoine_asset a
+              JOIN asset_subcategory s ON s.id = a.subcategory_id
+         LEFT JOIN LATERAL (
+                   SELECT year, valeur_nette FROM patrimoine_amortissement
+                    WHERE asset_id = a.id AND move_id IS NOT NULL
+                 ORDER BY year DESC LIMIT 1
+              ) posted ON TRUE
+             WHERE s.depreciation_method IN %s AND s.depreciation_years > 0
+               AND a.valeur_acquisition > 0 AND a.date_acquisition IS NOT NULL
+               AND %s
+        """, (LINEAR, DEGRESSIVE), scope))
+        buffer = to_copy_buffer(compute_schedules(self.env.cr.fetchall()))
+        if buffer:
+            self.env.cr.copy_expert(
+                "COPY patrimoine_amortissement (asset_id, year, dotation, valeur_nette) FROM STDIN",
+                io.StringIO(buffer),
+            )
+        self.invalidate_model()
+
+    @api.model
+    def _generate_moves(self, year, auto_commit=False):
+        """Passe en comptabilité les dotations non comptabilisées de ``year``.
+
+        Une pièce par journal et par département, datée du 31 décembre, avec
+        une ligne de débit par bien (compte de dotation) et une ligne de crédit
+        par compte d'amortissement ; au-delà de ``MAX_LINES_PER_MOVE`` biens,
+        la pièce est scindée. Les journaux dont la société a verrouillé
+        l'exercice sont ignorés. Les pièces sont créées et validées par lots
+        de ``MOVE_BATCH_SIZE``, chacun dans un savepoint : un lot en échec est
+        journalisé et laissé en attente sans interrompre les suivants ;
+        ``auto_commit`` valide la transaction après chaque lot. Renvoie les
+        pièces créées.
+        """
+        self.flush_model()
+        self.env.cr.execute(SQL("""
+            SELECT plan.id, plan.dotation, a.code, a.name, a.department_id,
+                   s.depreciation_journal_id, s.depreciation_expense_account_id,
+                   s.depreciation_account_id
+              FROM patrimoine_amortissement plan
+              JOIN patrimoine_asset a ON a.id = plan.asset_id
+              JOIN asset_subcategory s ON s.id = a.subcategory_id
+             WHERE plan.year = %s AND plan.move_id IS NULL AND plan.dotation > 0
+               AND s.depreciation_journal_id IS NOT NULL
+               AND s.depreciation_expense_account_id IS NOT NULL
+               AND s.depreciation_account_id IS NOT NULL
+          ORDER BY s.depreciation_journal_id, a.department_id NULLS FIRST, plan.id
+        """, year))
+        groups = {}
+        for row in self.env.cr.fetchall():
+            groups.setdefault((row[5], row[4]), []).append(row)
+
+        move_date = date(year, 12, 31)
+        journals = self.env['account.journal'].browse(
+            sorted({journal_id for journal_id, _department_id in groups})
+        )
+        locked = {
+            journal.id for journal in journals
+            if move_date <= (journal.company_id._get_user_fiscal_lock_date() or date.min)
+        }
+        if locked:
+            _logger.info(
+                "Amortissements %s non comptabilisés : exercice verrouillé pour les journaux %s",
+                year, sorted(locked),
+            )
+            groups = {key: rows for key, rows in groups.items() if key[0] not in locked}
+
+        department_names = {
+            department.id: department.display_name
+            for department in self.env['hr.department'].browse(
+                [department_id for _journal_id, department_id in groups if department_id]
+            )
+        }
+        pending = []
+        for (journal_id, department_id), rows in groups.items():
+            label = f"Amortissements {year} - {department_names.get(department_id, 'Non affecté')}"
+            for start in range(0, len(rows), MAX_LINES_PER_MOVE):
+                chunk = rows[start:start + MAX_LINES_PER_MOVE]
+                pending.append(([row[0] for row in chunk], self._move_vals(year, journal_id, label, chunk)))
+
+        moves = self.env['account.move']
+        for start in range(0, len(pending), MOVE_BATCH_SIZE):
+            batch = pending[start:start + MOVE_BATCH_SIZE]
+            try:
+                with self.env.cr.savepoint():
+                    batch_moves = self._post_batch(batch)
+            except Exception:
+                _logger.exception("Échec de la comptabilisation d'un lot d'amortissements %s", year)
+                self.env.invalidate_all(flush=False)
+            else:
+                moves |= batch_moves
+            if auto_commit:
+                self.env.cr.commit()
+        self.invalidate_model(['move_id'])
+        return moves
+
+    @api.model
+    def _post_batch(self, batch):
+        """Crée et valide les pièces de ``batch`` (couples ``(lignes de plan,
+        valeurs de la pièce)``) puis les rattache aux lignes de plan."""
+        batch_moves = self.env['account.move'].create([vals for _ids, vals in batch])
+        batch_moves.action_post()
+        plan_ids, move_ids = [], []
+        for (ids, _vals), move in zip(batch, batch_moves):
+            plan_ids += ids
+            move_ids += [move.id] * len(ids)
+        self.env.cr.execute(SQL("""
+            UPDATE patrimoine_amortissement plan SET move_id = posted.move_id
+              FROM (SELECT UNNEST(%s::int[]) AS id, UNNEST(%s::int[]) AS move_id) AS posted
+             WHERE plan.id = posted.id
+        """, plan_ids, move_ids))
+        return batch_moves
+
+    @api.model
+    def _move_vals(self, year, journal_id, label, rows):
+        credits = {}
+        lines = []
+        for _plan_id, dotation, code, name, _department_id, _journal_id, expense_account_id, account_id in rows:
+            lines.append(fields.Command.create({
+                'name': f"{code or ''} {name}".strip(),
+                'account_id': expense_account_id,
+                'debit': dotation,
+                'credit': 0.0,
+            }))
+            credits[account_id] = credits.get(account_id, 0.0) + dotation
+        lines += [
+            fields.Command.create({
+                'name': label, 'account_id': account_id, 'debit': 0.0, 'credit': round(amount, 2),
+            })
+            for account_id, amount in credits.items()
+        ]
+        return {
+            'move_type': 'entry',
+            'journal_id': journal_id,
+            'date': date(year, 12, 31),
+            'ref': label,
+            'line_ids': lines,
+        }
+
+    @api.model
+    def _first_posting_year(self):
+        """Premier exercice à comptabiliser : paramètre système
+        ``FIRST_POSTING_YEAR_PARAM``, à défaut l'exercice précédent. Les plans
+        remontent à l'acquisition des biens ; les exercices antérieurs sont
+        réputés déjà traités en comptabilité."""
+        current_year = fields.Date.context_today(self).year
+        value = self.env['ir.config_parameter'].sudo().get_param(FIRST_POSTING_YEAR_PARAM)
+        try:
+            return int(value) if value else current_year - 1
+        except ValueError:
+            _logger.warning("Paramètre %s invalide : %r", FIRST_POSTING_YEAR_PARAM, value)
+            return current_year - 1
+
+    @api.model
+    def _cron_post_depreciation(self):
+        """Comptabilise les exercices clos, à partir de :meth:`_first_posting_year`,
+        qui ont encore des dotations en attente. Un exercice en échec est
+        journalisé sans empêcher le traitement des suivants."""
+        self.env.cr.execute("""
+            SELECT DISTINCT year FROM patrimoine_amortissement
+             WHERE move_id IS NULL AND dotation > 0 AND year >= %s AND year < %s
+          ORDER BY year
+        """, [self._first_posting_year(), fields.Date.context_today(self).year])
+        for (year,) in self.env.cr.fetchall():
+            try:
+                self._generate_moves(year, auto_commit=True)
+            except Exception:
+                self.env.cr.rollback()
+                _logger.exception("Échec de la comptabilisation des amortissements %s", year)
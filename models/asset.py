@@ -1,9 +1,49 @@
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+
 from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+from odoo.osv import expression
+from odoo.tools import SQL
+
+from .amortissement import DEPRECIATION_ASSET_FIELDS, DEPRECIATION_POLICY_FIELDS
+from .asset_tombstone import install_sync_stamp
+from .bulk import bulk_mode, is_bulk
+from .stats import STATS_GROUPBY
+
+# Modèle d'extension (_inherits) associé à chaque type de catégorie.
+EXTENSION_MODELS = {
+    'informatique': 'patrimoine.asset.informatique',
+    'vehicule': 'patrimoine.asset.vehicule',
+    'mobilier': 'patrimoine.asset.mobilier',
+}
+# Nombre maximal de biens créés par un clonage.
+MAX_CLONE_QUANTITY = 5000
+# Documents propres au bien d'origine, non repris par un clonage : les
+# recopier écrirait autant de pièces jointes que de clones.
+CLONE_EXCLUDED_FIELDS = (
+    'image', 'facture_file', 'facture_filename', 'bon_livraison_file', 'bon_livraison_filename',
+)
+# Champs suivis dans le chatter ; en mode masse, leurs modifications sont
+# résumées dans la fiche de vie.
+BULK_TRACKED_FIELDS = ('name', 'etat')
+# Champs dont la modification déplace un bien dans ``patrimoine.stats``.
+STATS_FIELDS = ('department_id', 'subcategory_id', 'etat', 'valeur_acquisition')
+# Tranches d'âge des statistiques : (libellé, âge maximal en années exclu).
+AGE_BRACKETS = (
+    ("Moins de 1 an", 1),
+    ("1 à 2 ans", 2),
+    ("2 à 3 ans", 3),
+    ("3 à 5 ans", 5),
+    ("Plus de 5 ans", None),
+)
 
 # tables pour les catégories
 class AssetCategory(models.Model):
     _name = 'asset.category'
     _description = 'Catégorie principale de matériel'
+    _inherit = ['patrimoine.image.mixin']
     
     name = fields.Char('Nom', required=True)
     code = fields.Char('Code', required=True)
@@ -38,6 +78,7 @@ class AssetCategory(models.Model):
 class AssetSubCategory(models.Model):
     _name = 'asset.subcategory'
     _description = 'Sous-catégorie spécifique de matériel'
+    _inherit = ['patrimoine.image.mixin']
 
     name = fields.Char('Nom', required=True)
     code = fields.Char('Code', required=True)
@@ -46,6 +87,17 @@ class AssetSubCategory(models.Model):
     custom_field_ids = fields.One2many('asset.custom.field', 'subcategory_id', string='Champs personnalisés')
     item_ids = fields.One2many('patrimoine.asset', 'subcategory_id', string='Matériels')
     image = fields.Image(string="Image")
+    depreciation_method = fields.Selection([
+        ('none', 'Non amortissable'),
+        ('lineaire', 'Linéaire'),
+        ('degressif', 'Dégressif'),
+    ], string="Méthode d'amortissement", default='none', required=True)
+    depreciation_years = fields.Integer(string="Durée d'amortissement (années)")
+    depreciation_journal_id = fields.Many2one(
+        'account.journal', string="Journal des amortissements", domain=[('type', '=', 'general')]
+    )
+    depreciation_expense_account_id = fields.Many2one('account.account', string="Compte de dotation")
+    depreciation_account_id = fields.Many2one('account.account', string="Compte d'amortissement")
     # AJOUT : Champ calculé pour le nombre de matériels directement liés à cette sous-catégorie
     item_count = fields.Integer(
         string="Nb Matériels",
@@ -58,6 +110,17 @@ class AssetSubCategory(models.Model):
         for subcategory in self:
             subcategory.item_count = len(subcategory.item_ids)
 
+    def write(self, vals):
+        res = super().write(vals)
+        if any(name in vals for name in DEPRECIATION_POLICY_FIELDS):
+            # Nouvelle politique : tous les plans de la sous-catégorie sont
+            # recalculés en bloc.
+            assets = self.env['patrimoine.asset'].with_context(active_test=False).search(
+                [('subcategory_id', 'in', self.ids)]
+            )
+            self.env['patrimoine.amortissement']._recompute(assets)
+        return res
+
     _sql_constraints = [
         ('code_unique', 'unique(code)', 'Le code de la sous-catégorie doit être unique !'),
         ('name_category_unique', 'unique(name, category_id)', 'Le nom de la sous-catégorie doit être unique par catégorie principale !'),
@@ -93,7 +156,7 @@ import json
 class PatrimoineAsset(models.Model):
     _name = 'patrimoine.asset'
     _description = 'Bien patrimonial'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'patrimoine.image.mixin']
 
     name = fields.Char(string="Nom du bien", required=True, tracking=True)
     subcategory_id = fields.Many2one('asset.subcategory', string='Sous-catégorie', required=True)
@@ -109,8 +172,8 @@ class PatrimoineAsset(models.Model):
         ('hs', 'Hors service'),
         ('reforme', 'Réformé'),
     ], string="État", default="stock", tracking=True)
-    department_id = fields.Many2one('hr.department', string="Département")
-    employee_id = fields.Many2one('hr.employee', string="Employé affecté")
+    department_id = fields.Many2one('hr.department', string="Département", index=True)
+    employee_id = fields.Many2one('hr.employee', string="Employé affecté", index=True)
     location_id = fields.Many2one('stock.location', string="Localisation")
     # Facture
     facture_file = fields.Binary(string="Fichier Facture")
@@ -167,23 +230,195 @@ class PatrimoineAsset(models.Model):
                 record.code = f"{record.initial_code}-{dept_code}/{loc_code}/{emp_code}"
 
 
+    def init(self):
+        # Filigrane de la synchronisation différentielle (voir controllers/sync.py).
+        install_sync_stamp(self.env.cr, self._table)
+
     # Méthode create pour générer le code initial et créer une entrée dans la fiche de vie
     @api.model_create_multi
     def create(self, vals_list):
+        # Les codes initiaux sont réservés en une fois et posés avant l'INSERT :
+        # pas de second UPDATE ni de recalcul de ``code`` par bien.
+        vals_list = [dict(vals) for vals in vals_list]
+        pending = [vals for vals in vals_list if vals.get('initial_code', '/') == '/']
+        if pending:
+            # Format de date actuel (d/m/a)
+            current_date_str = fields.Date.today().strftime("%d/%m/%Y")
+            sequence_nums = self.env['ir.sequence'].next_by_code_batch(
+                'patrimoine.asset.initial_code', len(pending)
+            )
+            for vals, sequence_num in zip(pending, sequence_nums):
+                vals['initial_code'] = f"{current_date_str}-MTND-{sequence_num or '0000'}"
+
         assets = super().create(vals_list) # Appelle la méthode create de la superclasse
-        for asset in assets:
-            if asset.initial_code == '/': # Si le code initial n'a pas été généré (cas improbable avec default='/')
-                # Format de date actuel (d/m/a)
-                current_date_str = fields.Date.today().strftime("%d/%m/%Y")
-                # Générer le numéro de séquence unique
-                sequence_num = self.env['ir.sequence'].next_by_code('patrimoine.asset.initial_code') or '0000'
-                asset.initial_code = f"{current_date_str}-MTND-{sequence_num}" # Assigner le code généré
-
-            # Créer une entrée dans la fiche de vie pour la création du bien
-            self.env['patrimoine.fiche.vie'].create({
+        self.env['patrimoine.stats']._apply_changes(added=assets._stats_rows())
+        self.env['patrimoine.amortissement']._recompute(assets)
+        # Une entrée de fiche de vie par bien, écrites en un seul INSERT
+        self.env['patrimoine.fiche.vie'].record_events([
+            {
                 'asset_id': asset.id,
                 'action': 'creation',
                 'description': f"Création initiale du bien {asset.name}.",
-                'utilisateur_id': self.env.uid, # L'utilisateur courant
-            })
+            }
+            for asset in assets
+        ])
         return assets
+
+    @api.model
+    def create_copies(self, vals, quantity, extension_vals=None):
+        """Crée ``quantity`` biens identiques à partir des valeurs ``vals``.
+
+        Les biens sont créés en un seul ``create`` (codes initiaux réservés en
+        une fois, fiche de vie groupée), puis leurs lignes d'extension en un
+        second ``create`` sur le modèle du type.
+        """
+        if not 0 < quantity <= MAX_CLONE_QUANTITY:
+            raise ValidationError(
+                f"La quantité doit être comprise entre 1 et {MAX_CLONE_QUANTITY}."
+            )
+        vals = dict(vals, initial_code='/')
+        assets = bulk_mode(self).create([dict(vals) for _i in range(quantity)])
+        extension_model = EXTENSION_MODELS.get(assets[:1].type)
+        if extension_model:
+            bulk_mode(self.env[extension_model]).create([
+                dict(extension_vals or {}, asset_id=asset.id) for asset in assets
+            ])
+        return assets
+
+    def action_clone(self, quantity):
+        """Crée ``quantity`` copies de ce bien, extension et valeurs
+        personnalisées comprises, sans ses documents (image, facture, bon de
+        livraison)."""
+        self.ensure_one()
+        vals = {
+            name: value for name, value in self.copy_data()[0].items()
+            if name not in CLONE_EXCLUDED_FIELDS
+        }
+        extension_vals = {}
+        extension_model = EXTENSION_MODELS.get(self.type)
+        if extension_model:
+            extension = self.env[extension_model].search([('asset_id', '=', self.id)], limit=1)
+            if extension:
+                allowed = self._clone_extension_fields(self.type)
+                extension_vals = {
+                    name: value
+                    for name, value in extension.copy_data()[0].items()
+                    if name in allowed
+                }
+        return self.create_copies(vals, quantity, extension_vals)
+
+    @api.model
+    def _clone_extension_fields(self, asset_type):
+        """Champs propres au modèle d'extension de ``asset_type`` qu'un
+        clonage peut renseigner (ni le lien vers le bien, ni les champs hérités
+        du bien, ni les documents)."""
+        extension_model = EXTENSION_MODELS.get(asset_type)
+        if not extension_model:
+            return set()
+        return {
+            name
+            for name, field in self.env[extension_model]._fields.items()
+            if field.copy and not field.inherited and not field.automatic
+            and name != 'asset_id' and name not in CLONE_EXCLUDED_FIELDS
+        }
+
+    @api.model
+    def _count_by_age(self, domain=(), today=None):
+        """Nombre de biens par tranche d'âge (``AGE_BRACKETS``), en une requête.
+
+        L'âge est comparé aux dates seuils (aujourd'hui moins N ans) dans un
+        ``CASE`` groupé côté base ; les règles d'accès s'appliquent via
+        ``_search``. Renvoie ``[(libellé, nombre), ...]`` dans l'ordre des
+        tranches.
+        """
+        today = today or fields.Date.context_today(self)
+        query = self._search(
+            expression.AND([list(domain), [('date_acquisition', '!=', False)]])
+        )
+        date_column = SQL.identifier(self._table, 'date_acquisition')
+        cases = SQL(" ").join(
+            SQL("WHEN %s > %s THEN %s", date_column, today - relativedelta(years=years), index)
+            for index, (_label, years) in enumerate(AGE_BRACKETS)
+            if years
+        )
+        bracket = SQL("CASE %s ELSE %s END AS bracket", cases, len(AGE_BRACKETS) - 1)
+        self.env.cr.execute(SQL(
+            "SELECT bracket, COUNT(*) FROM (%s) AS ages GROUP BY bracket",
+            query.select(bracket),
+        ))
+        counts = dict(self.env.cr.fetchall())
+        return [(label, counts.get(index, 0)) for index, (label, _years) in enumerate(AGE_BRACKETS)]
+
+    def _net_book_value_by_department(self, domain=(), year=None):
+        """Valeur brute, dotation et valeur nette des biens amortissables par
+        département pour l'exercice ``year``, en une requête sur
+        ``patrimoine.amortissement`` ; les règles d'accès s'appliquent via
+        ``_search``. Renvoie ``[(department_id, nombre, brut, dotation, net)]``.
+        """
+        year = year or fields.Date.context_today(self).year
+        query = self._search(expression.AND([list(domain), [
+            ('subcategory_id.depreciation_method', '!=', 'none'),
+            ('subcategory_id.depreciation_years', '>', 0),
+            ('valeur_acquisition', '>', 0),
+            ('date_acquisition', '<=', date(year, 12, 31)),
+        ]]))
+        columns = SQL(", ").join(
+            SQL("%s AS %s", SQL.identifier(self._table, name), SQL.identifier(name))
+            for name in ('id', 'department_id', 'valeur_acquisition')
+        )
+        self.env.cr.execute(SQL("""
+            SELECT assets.department_id, COUNT(*), SUM(assets.valeur_acquisition),
+                   COALESCE(SUM(plan.dotation), 0), COALESCE(SUM(plan.valeur_nette), 0)
+              FROM (%s) AS assets
+         LEFT JOIN patrimoine_amortissement plan
+                ON plan.asset_id = assets.id AND plan.year = %s
+          GROUP BY assets.department_id
+        """, query.select(columns), year))
+        return self.env.cr.fetchall()
+
+    def _stats_rows(self):
+        """Agrégats ``patrimoine.stats`` de ces biens, en une requête groupée."""
+        if not self:
+            return []
+        groups = self.sudo()._read_group(
+            [('id', 'in', self.ids)], list(STATS_GROUPBY), ['__count', 'valeur_acquisition:sum'],
+        )
+        return [
+            (department.id or None, subcategory.id or None, asset_type or None, etat or None,
+             count, value)
+            for department, subcategory, asset_type, etat, count, value in groups
+        ]
+
+    def write(self, vals):
+        moves_stats = any(name in vals for name in STATS_FIELDS)
+        stats_before = self._stats_rows() if moves_stats else []
+        res = super().write(vals)
+        if moves_stats:
+            self.env['patrimoine.stats']._apply_changes(
+                removed=stats_before, added=self._stats_rows()
+            )
+        if any(name in vals for name in DEPRECIATION_ASSET_FIELDS):
+            self.env['patrimoine.amortissement']._recompute(self)
+        tracked = [name for name in BULK_TRACKED_FIELDS if name in vals]
+        if tracked and is_bulk(self.env) and not self.env.context.get('fiche_vie_skip'):
+            # Le chatter est coupé : une ligne de fiche de vie par bien résume
+            # la modification.
+            changes = []
+            for name in tracked:
+                field = self._fields[name]
+                value = vals[name]
+                if field.type == 'selection':
+                    value = dict(field.selection).get(value, value)
+                changes.append(f"{field.string} : {value}")
+            description = f"Modification groupée ({', '.join(changes)})."
+            self.env['patrimoine.fiche.vie'].record_events([
+                {'asset_id': asset.id, 'action': 'autre', 'description': description}
+                for asset in self
+            ])
+        return res
+
+    def unlink(self):
+        # Les clients en synchronisation différentielle doivent voir la suppression.
+        self.env['patrimoine.asset.tombstone'].record_deletion(self)
+        self.env['patrimoine.stats']._apply_changes(removed=self._stats_rows())
+        return super().unlink()
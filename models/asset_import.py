@@ -0,0 +1,352 @@
+import base64
+import csv
+import io
+import logging
+from datetime import date, datetime
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError, ValidationError
+
+from .bulk import bulk_mode
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    openpyxl = None
+
+# Colonnes de la feuille lues sur ``patrimoine.asset`` : nom de colonne -> type.
+ASSET_COLUMNS = {
+    'name': 'char',
+    'date_acquisition': 'date',
+    'valeur_acquisition': 'float',
+    'etat': 'selection',
+    'department_id': 'many2one',
+    'employee_id': 'many2one',
+    'location_id': 'many2one',
+    'fournisseur': 'many2one',
+}
+
+# Modèle d'extension et colonnes reconnues par type de catégorie.
+EXTENSION_COLUMNS = {
+    'informatique': ('patrimoine.asset.informatique', (
+        'categorie_materiel', 'marque', 'modele', 'numero_serie', 'date_garantie_fin',
+    )),
+    'vehicule': ('patrimoine.asset.vehicule', (
+        'immatriculation', 'marque', 'modele', 'kilometrage', 'date_achat',
+        'date_premiere_circulation', 'date_assurance', 'date_controle_technique',
+    )),
+    'mobilier': ('patrimoine.asset.mobilier', (
+        'categorie_mobilier', 'etat_conservation',
+    )),
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y')
+TRUE_VALUES = ('1', 'true', 'vrai', 'oui', 'yes', 'x')
+FALSE_VALUES = ('0', 'false', 'faux', 'non', 'no')
+
+
+def _is_empty(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def convert_value(value, field_type, label, selection=()):
+    """Convertit une cellule de la feuille vers la valeur attendue par l'ORM.
+
+    Lève ``ValidationError`` avec le libellé de la colonne si la cellule ne
+    correspond pas au type ``field_type``.
+    """
+    if _is_empty(value):
+        return False
+    try:
+        if field_type == 'char':
+            return str(value).strip()
+        if field_type in ('integer', 'many2one'):
+            return int(float(value))
+        if field_type == 'float':
+            return float(str(value).replace(',', '.')) if isinstance(value, str) else float(value)
+        if field_type == 'boolean':
+            if isinstance(value, bool):
+                return value
+            text = str(value).strip().lower()
+            if text in TRUE_VALUES:
+                return True
+            if text in FALSE_VALUES:
+                return False
+            raise ValueError(value)
+        if field_type == 'date':
+            if isinstance(value, datetime):
+                return value.date()
+            if isinstance(value, date):
+                return value
+            for fmt in DATE_FORMATS:
+                try:
+                    return datetime.strptime(str(value).strip(), fmt).date()
+                except ValueError:
+                    continue
+            raise ValueError(value)
+        if field_type == 'selection':
+            text = str(value).strip()
+            if selection and text not in selection:
+                raise ValueError(value)
+            return text
+    except (TypeError, ValueError):
+        raise ValidationError(f"Valeur invalide pour « {label} » : {value}")
+    return value
+
+
+class PatrimoineAssetImport(models.Model):
+    """Import en masse de biens depuis un fichier CSV ou XLSX.
+
+    Chaque ligne est rattachée à une sous-catégorie par la colonne
+    ``subcategory_code`` ; les autres colonnes sont les champs de
+    ``patrimoine.asset``, ceux du modèle d'extension du type (informatique,
+    véhicule, mobilier) et les champs personnalisés de la sous-catégorie,
+    désignés par leur nom technique.
+
+    Le traitement est fait par le cron par lots de ``chunk_size`` lignes :
+    chaque lot est créé en un ``create`` groupé sous un savepoint et validé
+    (commit) avant le suivant. Un lot en échec est rejoué ligne par ligne
+    pour isoler les lignes fautives ; l'import reprend au dernier lot validé
+    si le worker est interrompu.
+    """
+    _name = 'patrimoine.asset.import'
+    _description = "Import de biens en masse"
+    _order = 'id desc'
+
+    name = fields.Char(string="Fichier", required=True)
+    file = fields.Binary(string="Contenu", required=True, attachment=True)
+    state = fields.Selection([
+        ('draft', 'Brouillon'),
+        ('queued', 'En attente'),
+        ('running', 'En cours'),
+        ('done', 'Terminé'),
+        ('failed', 'Échec'),
+    ], string="État", default='draft', required=True)
+    chunk_size = fields.Integer(string="Taille des lots", default=200)
+    total_rows = fields.Integer(string="Lignes")
+    processed_rows = fields.Integer(string="Lignes traitées")
+    created_count = fields.Integer(string="Biens créés")
+    error_count = fields.Integer(string="Lignes en erreur")
+    error_log = fields.Json(string="Erreurs")
+    progress = fields.Float(string="Progression (%)", compute='_compute_progress')
+
+    @api.depends('total_rows', 'processed_rows')
+    def _compute_progress(self):
+        for record in self:
+            record.progress = (
+                100.0 * record.processed_rows / record.total_rows if record.total_rows else 0.0
+            )
+
+    # ------------------------------------------------------------------
+    # Lecture du fichier
+    # ------------------------------------------------------------------
+    def _read_rows(self):
+        """Renvoie les lignes non vides du fichier sous forme de couples
+        ``(numéro de ligne dans la feuille, dictionnaire)``, l'en-tête étant
+        la ligne 1."""
+        self.ensure_one()
+        content = base64.b64decode(self.file)
+        if self.name.lower().endswith('.xlsx'):
+            rows = self._read_xlsx(content)
+        else:
+            rows = self._read_csv(content)
+        return [
+            (line_no, row) for line_no, row in rows
+            if any(not _is_empty(v) for v in row.values())
+        ]
+
+    @staticmethod
+    def _read_csv(content):
+        text = content.decode('utf-8-sig')
+        try:
+            dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+        reader.fieldnames = [(name or '').strip() for name in reader.fieldnames or []]
+        # ``line_num`` compte les lignes physiques, lignes vides comprises.
+        return [(reader.line_num, row) for row in reader]
+
+    @staticmethod
+    def _read_xlsx(content):
+        if openpyxl is None:
+            raise UserError("La lecture des fichiers XLSX nécessite la bibliothèque openpyxl.")
+        workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+        lines = workbook.active.iter_rows(values_only=True)
+        header = [str(cell or '').strip() for cell in next(lines, ())]
+        return [(line_no, dict(zip(header, line))) for line_no, line in enumerate(lines, 2)]
+
+    # ------------------------------------------------------------------
+    # Validation d'une ligne
+    # ------------------------------------------------------------------
+    def _load_subcategories(self, rows):
+        codes = {str(row.get('subcategory_code') or '').strip() for _line_no, row in rows}
+        subcategories = self.env['asset.subcategory'].search([('code', 'in', list(codes))])
+        # Charge les schémas de champs personnalisés en une lecture.
+        subcategories.mapped('custom_field_ids')
+        return {subcategory.code: subcategory for subcategory in subcategories}
+
+    def _prepare_row(self, row, subcategories):
+        """Renvoie ``(valeurs du bien, modèle d'extension, valeurs d'extension)``."""
+        code = str(row.get('subcategory_code') or '').strip()
+        subcategory = subcategories.get(code)
+        if not subcategory:
+            raise ValidationError(f"Sous-catégorie inconnue : {code or '(vide)'}")
+
+        asset_model = self.env['patrimoine.asset']
+        asset_vals = {'subcategory_id': subcategory.id}
+        for column_name, field_type in ASSET_COLUMNS.items():
+            if column_name not in row:
+                continue
+            selection = ()
+            if field_type == 'selection':
+                selection = dict(asset_model._fields[column_name].selection)
+            value = convert_value(row[column_name], field_type, column_name, selection)
+            if value is not False:
+                asset_vals[column_name] = value
+        if not asset_vals.get('name'):
+            raise ValidationError("La colonne « name » est obligatoire.")
+
+        custom_values = {}
+        for custom_field in subcategory.custom_field_ids:
+            selection = ()
+            if custom_field.field_type == 'selection':
+                selection = [
+                    line.strip() for line in (custom_field.selection_values or '').splitlines()
+                    if line.strip()
+                ]
+            value = convert_value(
+                row.get(custom_field.technical_name),
+                custom_field.field_type,
+                custom_field.name,
+                selection,
+            )
+            if value is False and custom_field.field_type != 'boolean':
+                if custom_field.required:
+                    raise ValidationError(f"Le champ « {custom_field.name} » est requis.")
+                continue
+            # Même clé que /api/patrimoine/items : l'identifiant du champ.
+            custom_values[str(custom_field.id)] = (
+                fields.Date.to_string(value) if isinstance(value, date) else value
+            )
+        if custom_values:
+            asset_vals['custom_values'] = custom_values
+
+        extension_model, extension_vals = False, {}
+        extension = EXTENSION_COLUMNS.get(subcategory.category_id.type)
+        if extension:
+            extension_model, columns = extension
+            model_fields = self.env[extension_model]._fields
+            for column_name in columns:
+                if column_name not in row:
+                    continue
+                field = model_fields[column_name]
+                selection = dict(field.selection) if field.type == 'selection' else ()
+                value = convert_value(row[column_name], field.type, column_name, selection)
+                if value is not False:
+                    extension_vals[column_name] = value
+        return asset_vals, extension_model, extension_vals
+
+    # ------------------------------------------------------------------
+    # Création par lots
+    # ------------------------------------------------------------------
+    def _create_assets(self, prepared):
+        """Crée les biens et leurs extensions : un ``create`` par modèle."""
+        assets = bulk_mode(self.env['patrimoine.asset']).create(
+            [vals for vals, _m, _e in prepared]
+        )
+        extensions = {}
+        for asset, (_vals, extension_model, extension_vals) in zip(assets, prepared):
+            if extension_model:
+                extensions.setdefault(extension_model, []).append(
+                    dict(extension_vals, asset_id=asset.id)
+                )
+        for extension_model, vals_list in extensions.items():
+            bulk_mode(self.env[extension_model]).create(vals_list)
+        return assets
+
+    def _process_chunk(self, rows, subcategories):
+        """Traite un lot de couples ``(numéro de ligne, ligne)`` ; renvoie
+        ``(nombre de biens créés, erreurs)``."""
+        prepared, errors = [], []
+        for row_number, row in rows:
+            try:
+                prepared.append((row_number, self._prepare_row(row, subcategories)))
+            except ValidationError as e:
+                errors.append({'row': row_number, 'message': str(e)})
+        if not prepared:
+            return 0, errors
+        try:
+            with self.env.cr.savepoint():
+                self._create_assets([values for _n, values in prepared])
+            return len(prepared), errors
+        except Exception:
+            _logger.info("Lot en échec à partir de la ligne %s, reprise ligne par ligne", rows[0][0])
+            # Le cache peut encore contenir les biens annulés par le savepoint.
+            self.env.invalidate_all(flush=False)
+
+        created = 0
+        for row_number, values in prepared:
+            try:
+                with self.env.cr.savepoint():
+                    self._create_assets([values])
+                created += 1
+            except Exception as e:
+                self.env.invalidate_all(flush=False)
+                errors.append({'row': row_number, 'message': str(e)})
+        errors.sort(key=lambda error: error['row'])
+        return created, errors
+
+    def _run(self, auto_commit=False):
+        """Traite les lignes restantes ; valide la transaction après chaque lot
+        si ``auto_commit`` (exécution par le cron)."""
+        self.ensure_one()
+        rows = self._read_rows()
+        subcategories = self._load_subcategories(rows)
+        chunk_size = max(self.chunk_size, 1)
+        self.write({'state': 'running', 'total_rows': len(rows)})
+        for start in range(self.processed_rows, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            created, errors = self._process_chunk(chunk, subcategories)
+            self.write({
+                'processed_rows': start + len(chunk),
+                'created_count': self.created_count + created,
+                'error_count': self.error_count + len(errors),
+                'error_log': (self.error_log or []) + errors,
+            })
+            if auto_commit:
+                self.env.cr.commit()
+        self.write({'state': 'done'})
+
+    def action_queue(self):
+        """Vérifie le fichier et le confie au cron d'import."""
+        for record in self:
+            rows = record._read_rows()
+            if rows and 'subcategory_code' not in rows[0][1]:
+                raise ValidationError("La colonne « subcategory_code » est obligatoire.")
+            record.write({
+                'state': 'queued',
+                'total_rows': len(rows),
+                'processed_rows': 0,
+                'created_count': 0,
+                'error_count': 0,
+                'error_log': [],
+            })
+        self.env.ref('gestion_patrimoine.ir_cron_asset_import')._trigger()
+        return True
+
+    @api.model
+    def _cron_process_imports(self):
+        for record in self.search([('state', 'in', ('queued', 'running'))], order='id'):
+            try:
+                record._run(auto_commit=True)
+            except Exception as e:
+                self.env.cr.rollback()
+                _logger.exception("Import de biens %s en échec", record.id)
+                record.write({
+                    'state': 'failed',
+                    'error_log': (record.error_log or []) + [{'row': 0, 'message': str(e)}],
+                })
+                self.env.cr.commit()
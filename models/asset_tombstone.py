@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+
+def install_sync_stamp(cr, table):
+    """Ajoute à ``table`` la colonne ``sync_txid`` tenue à jour par trigger.
+
+    Chaque insertion ou modification y inscrit l'identifiant de la
+    transaction (``txid_current()``). Contrairement à ``write_date`` (heure de
+    début de la transaction) ou à ``id`` (attribué avant le commit), cette
+    valeur permet de retrouver les lignes validées après l'émission d'un jeton
+    de synchronisation : toute transaction encore ouverte à ce moment a un
+    identifiant supérieur ou égal au ``xmin`` de l'instantané courant.
+    """
+    cr.execute("""
+        CREATE OR REPLACE FUNCTION patrimoine_sync_stamp() RETURNS trigger AS $$
+        BEGIN
+            NEW.sync_txid := txid_current();
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    cr.execute(SQL(
+        "ALTER TABLE %s ADD COLUMN IF NOT EXISTS sync_txid BIGINT NOT NULL DEFAULT 0",
+        SQL.identifier(table),
+    ))
+    cr.execute(SQL(
+        "DROP TRIGGER IF EXISTS %s ON %s",
+        SQL.identifier(f"{table}_sync_stamp"), SQL.identifier(table),
+    ))
+    cr.execute(SQL(
+        "CREATE TRIGGER %s BEFORE INSERT OR UPDATE ON %s"
+        " FOR EACH ROW EXECUTE FUNCTION patrimoine_sync_stamp()",
+        SQL.identifier(f"{table}_sync_stamp"), SQL.identifier(table),
+    ))
+    cr.execute(SQL(
+        "CREATE INDEX IF NOT EXISTS %s ON %s (sync_txid, id)",
+        SQL.identifier(f"{table}_sync_txid_index"), SQL.identifier(table),
+    ))
+
+
+class PatrimoineAssetTombstone(models.Model):
+    """Trace d'un bien supprimé, pour la synchronisation différentielle.
+
+    Un client mobile qui synchronise par ``/api/patrimoine/assets/changes`` ne
+    peut pas voir une suppression autrement : la ligne ``patrimoine.asset`` et
+    sa fiche de vie disparaissent. Les traces sont conservées
+    ``RETENTION_DAYS`` jours ; au-delà, le client doit resynchroniser tout le
+    registre.
+
+    Le département et l'employé du bien au moment de la suppression sont
+    conservés : les règles d'accès des traces reprennent celles des biens, un
+    utilisateur ne reçoit donc que les suppressions de biens qu'il voyait.
+    """
+    _name = 'patrimoine.asset.tombstone'
+    _description = "Bien supprimé (synchronisation)"
+    _order = 'id'
+
+    RETENTION_DAYS = 90
+
+    asset_ref = fields.Integer(string="ID du bien supprimé", required=True, index=True)
+    code = fields.Char(string="Code du bien")
+    department_id = fields.Many2one('hr.department', string="Département", ondelete='set null')
+    employee_id = fields.Many2one('hr.employee', string="Employé", ondelete='set null')
+
+    def init(self):
+        install_sync_stamp(self.env.cr, self._table)
+
+    @api.model
+    def record_deletion(self, assets):
+        """Crée une trace par bien de ``assets`` (appelé avant la suppression)."""
+        return self.sudo().create([
+            {
+                'asset_ref': asset.id,
+                'code': asset.code,
+                'department_id': asset.department_id.id,
+                'employee_id': asset.employee_id.id,
+            }
+            for asset in assets
+        ])
+
+    @api.model
+    def _cron_purge_tombstones(self):
+        cutoff = fields.Datetime.now() - timedelta(days=self.RETENTION_DAYS)
+        self.sudo().search([('create_date', '<', cutoff)]).unlink()
@@ -0,0 +1,26 @@
+"""Contexte des opérations en masse : imports, clonages, mouvements groupés, crons.
+
+``patrimoine.asset`` et ``patrimoine.mouvement`` héritent de ``mail.thread`` :
+en mode normal, chaque création ou écriture d'un champ suivi produit un
+``mail.message``, des ``mail.tracking.value`` et des abonnements. En mode
+« masse », le suivi et l'abonnement automatique sont coupés ; l'historique
+reste tenu dans ``patrimoine.fiche.vie`` (création, mouvements, et résumé des
+modifications groupées écrit par ``PatrimoineAsset.write``).
+"""
+
+BULK_CONTEXT = {
+    'tracking_disable': True,
+    'mail_create_nolog': True,
+    'mail_create_nosubscribe': True,
+    'mail_notrack': True,
+    'patrimoine_bulk': True,
+}
+
+
+def bulk_mode(records):
+    """Renvoie ``records`` dans le contexte des opérations en masse."""
+    return records.with_context(**BULK_CONTEXT)
+
+
+def is_bulk(env):
+    return bool(env.context.get('patrimoine_bulk'))
@@ -37,3 +37,17 @@ class PatrimoineFicheVie(models.Model):
 
     # Vous pouvez également ajouter un champ pour le statut final de l'asset après cette action
     # final_asset_status = fields.Selection(related='asset_id.etat', string="Statut final du bien", store=True)
+
+    @api.model
+    def record_events(self, vals_list):
+        """Écrit un lot d'événements de cycle de vie en un seul ``create``.
+
+        Les appelants (création de biens, validation de mouvements, imports)
+        accumulent leurs événements puis les passent ici en une fois, plutôt
+        que d'appeler ``create`` pour chaque bien.
+        """
+        if not vals_list:
+            return self.browse()
+        return self.create([
+            {'utilisateur_id': self.env.uid, **vals} for vals in vals_list
+        ])
@@ -0,0 +1,21 @@
+from odoo import models
+
+
+class HrDepartment(models.Model):
+    _inherit = 'hr.department'
+
+    def unlink(self):
+        """Reporte les biens des départements supprimés sur la ligne « sans
+        département » de ``patrimoine.stats``.
+
+        La clé étrangère vide ``department_id`` des biens en SQL, sans passer
+        par leur ``write`` : les agrégats sont donc déplacés ici, avant la
+        suppression.
+        """
+        assets = self.env['patrimoine.asset'].sudo().search([('department_id', 'in', self.ids)])
+        rows = assets._stats_rows()
+        if rows:
+            self.env['patrimoine.stats']._apply_changes(
+                removed=rows, added=[(None, *row[1:]) for row in rows]
+            )
+        return super().unlink()
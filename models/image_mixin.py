@@ -0,0 +1,47 @@
+from odoo import models, fields, api
+
+
+class PatrimoineImageMixin(models.AbstractModel):
+    """Image avec indicateur de présence, empreinte et miniatures stockés.
+
+    Les listes de l'API testent ``has_image`` au lieu de ``record.image`` :
+    lire le champ image charge le binaire depuis le filestore pour chaque
+    enregistrement, alors que ``has_image`` est une simple colonne booléenne.
+    ``image_checksum`` sert de jeton de version dans les URL d'image, ce qui
+    permet au navigateur de les garder en cache sans revalidation.
+    """
+    _name = 'patrimoine.image.mixin'
+    _description = "Image avec indicateur de présence"
+
+    image = fields.Image(string="Image")
+    image_128 = fields.Image("Image 128", related='image', max_width=128, max_height=128, store=True)
+    image_256 = fields.Image("Image 256", related='image', max_width=256, max_height=256, store=True)
+    has_image = fields.Boolean(
+        string="A une image",
+        compute='_compute_image_state',
+        store=True,
+        index=True,
+    )
+    image_checksum = fields.Char(
+        string="Empreinte de l'image",
+        compute='_compute_image_state',
+        store=True,
+    )
+
+    @api.depends('image')
+    def _compute_image_state(self):
+        # L'empreinte SHA-1 est déjà calculée par ir.attachment : on la lit
+        # en une requête plutôt que de hacher le contenu de chaque image.
+        attachments = self.env['ir.attachment'].sudo().search_read(
+            [
+                ('res_model', '=', self._name),
+                ('res_field', '=', 'image'),
+                ('res_id', 'in', self.ids),
+            ],
+            ['res_id', 'checksum'],
+        )
+        checksums = {att['res_id']: att['checksum'] for att in attachments}
+        # bin_size : Odoo renvoie la taille du fichier plutôt que son contenu.
+        for record in self.with_context(bin_size=True):
+            record.has_image = bool(record.image)
+            record.image_checksum = checksums.get(record.id, False) if record.has_image else False
@@ -0,0 +1,56 @@
+from odoo import models, api
+
+
+class IrSequence(models.Model):
+    _inherit = 'ir.sequence'
+
+    def _reserve_numbers(self, count):
+        """Réserve ``count`` numéros consécutifs de la séquence en une requête.
+
+        - implémentation ``standard`` : ``nextval`` sur la séquence PostgreSQL,
+          appelé ``count`` fois dans un seul SELECT ;
+        - implémentation ``no_gap`` : ``number_next`` est verrouillé puis avancé
+          de ``count`` incréments en une seule mise à jour.
+        """
+        self.ensure_one()
+        if self.implementation == 'standard':
+            self._cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                (f"ir_sequence_{self.id:03d}", count),
+            )
+            return [row[0] for row in self._cr.fetchall()]
+        self._cr.execute(
+            "SELECT number_next FROM ir_sequence WHERE id = %s FOR UPDATE NOWAIT",
+            (self.id,),
+        )
+        first = self._cr.fetchone()[0]
+        self._cr.execute(
+            "UPDATE ir_sequence SET number_next = number_next + %s WHERE id = %s",
+            (self.number_increment * count, self.id),
+        )
+        self.invalidate_recordset(['number_next'])
+        return [first + i * self.number_increment for i in range(count)]
+
+    @api.model
+    def next_by_code_batch(self, sequence_code, count):
+        """Équivalent groupé de ``next_by_code`` : renvoie ``count`` valeurs.
+
+        Comme ``next_by_code``, renvoie des ``False`` si aucune séquence ne
+        porte ce code. Les séquences à plages de dates gardent le chemin
+        standard d'Odoo (un appel par numéro).
+        """
+        if count <= 0:
+            return []
+        self.check_access_rights('read')
+        company_id = self.env.company.id
+        sequence = self.search(
+            [('code', '=', sequence_code), ('company_id', 'in', [company_id, False])],
+            order='company_id',
+            limit=1,
+        )
+        if not sequence:
+            return [self.next_by_code(sequence_code)] * count
+        sequence = sequence.sudo()
+        if sequence.use_date_range:
+            return [sequence._next() for _i in range(count)]
+        return [sequence.get_next_char(number) for number in sequence._reserve_numbers(count)]
@@ -2,8 +2,38 @@ from odoo import models, fields, api
 from odoo.exceptions import ValidationError
 import logging
 
+from .bulk import bulk_mode
+
 _logger = logging.getLogger(__name__)
 
+# Nombre maximal de biens par mouvement groupé.
+MAX_BULK_MOUVEMENTS = 5000
+
+# Valeurs fixes écrites sur le bien à la validation, par type de mouvement.
+ASSET_VALUES_BY_TYPE = {
+    "affectation": {"etat": "service"},
+    "transfert": {"etat": "service"},
+    "sortie": {"department_id": False, "employee_id": False, "location_id": False, "etat": "hs"},
+    "reforme": {"etat": "reforme", "location_id": False, "employee_id": False},
+    "retour_stock": {"department_id": False, "employee_id": False, "etat": "stock"},
+    # Assurez-vous que la valeur 'maintenance' existe dans votre champ 'etat'
+    "reparation": {"etat": "maintenance"},
+}
+# Champs du bien repris de la destination du mouvement : (bien, mouvement).
+DESTINATION_FIELDS = {
+    "affectation": (
+        ("department_id", "to_department_id"),
+        ("employee_id", "to_employee_id"),
+        ("location_id", "to_location_id"),
+    ),
+    "transfert": (
+        ("department_id", "to_department_id"),
+        ("employee_id", "to_employee_id"),
+        ("location_id", "to_location_id"),
+    ),
+    "retour_stock": (("location_id", "to_location_id"),),
+}
+
 class PatrimoineMouvement(models.Model):
     _name = "patrimoine.mouvement"
     _description = "Mouvement de Bien"
@@ -33,6 +63,7 @@ class PatrimoineMouvement(models.Model):
             ("reparation", "Réparation / Maintenance"),
             ("amortissement", "Amortissement"),
             ("sortie", "Sortie définitive"),
+            ("retour_stock", "Retour en stock"),
         ],
         string="Type de mouvement",
         required=True,
@@ -63,6 +94,9 @@ class PatrimoineMouvement(models.Model):
     motif = fields.Text(
         string="Motif du mouvement", tracking=True
     )  # Champ 'motif' du modèle
+    # Réorganisations : le bien change de département sans changer d'état
+    # (un bien en stock, hors service ou réformé le reste).
+    conserver_etat = fields.Boolean(string="Conserver l'état du bien", default=False)
 
     state = fields.Selection(
         [
@@ -77,88 +111,170 @@ class PatrimoineMouvement(models.Model):
         tracking=True,
     )
 
-    @api.model
-    def create(self, vals):
-        if vals.get("name", "/") == "/":
-            vals["name"] = (
-                self.env["ir.sequence"].next_by_code("patrimoine.mouvement.code")
-                or "Nouvelle Référence"
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Références réservées en une fois pour tout le lot.
+        vals_list = [dict(vals) for vals in vals_list]
+        pending = [vals for vals in vals_list if vals.get("name", "/") == "/"]
+        if pending:
+            names = self.env["ir.sequence"].next_by_code_batch(
+                "patrimoine.mouvement.code", len(pending)
             )
-        record = super(PatrimoineMouvement, self).create(vals)
+            for vals, name in zip(pending, names):
+                vals["name"] = name or "Nouvelle Référence"
+        records = super(PatrimoineMouvement, self).create(vals_list)
         # La validation/mise à jour de l'asset peut être appelée ici si le mouvement est validé automatiquement
-        # record.action_valider() # Si vous voulez validation auto
-        return record
+        # records.action_valider() # Si vous voulez validation auto
+        return records
 
-    # Dans votre fichier models/mouvement.py
+    @api.model
+    def bulk_move(self, assets, type_mouvement, to_department_id=False,
+                  to_employee_id=False, to_location_id=False, motif=False, date=False):
+        """Crée et valide un mouvement identique pour chaque bien de ``assets``.
 
+        Les mouvements sont créés en un seul ``create`` en mode masse (sans
+        chatter), puis validés ensemble par :meth:`action_valider`.
+        """
+        if len(assets) > MAX_BULK_MOUVEMENTS:
+            raise ValidationError(
+                f"Un mouvement groupé porte sur {MAX_BULK_MOUVEMENTS} biens au plus."
+            )
+        common_vals = {
+            "type_mouvement": type_mouvement,
+            "to_department_id": to_department_id,
+            "to_employee_id": to_employee_id,
+            "to_location_id": to_location_id,
+            "motif": motif,
+        }
+        if date:
+            common_vals["date"] = date
+        return self._create_and_validate([
+            dict(common_vals, asset_id=asset.id, from_employee_id=asset.employee_id.id)
+            for asset in assets
+        ])
 
-    def action_valider(self):
-        for mouvement in self:
-            if mouvement.state == "valide":
-                continue
-
-            asset = mouvement.asset_id
-            if not asset:
-                continue
-
-            vals_a_mettre_a_jour = {}
-
-            if mouvement.type_mouvement in ("affectation", "transfert"):
-                vals_a_mettre_a_jour.update(
-                    {
-                        "department_id": mouvement.to_department_id.id,
-                        "employee_id": mouvement.to_employee_id.id,
-                        "location_id": mouvement.to_location_id.id,
-                        "etat": "service",
-                    }
-                )
-            elif mouvement.type_mouvement == "sortie":
-                vals_a_mettre_a_jour.update(
-                    {
-                        "department_id": False,
-                        "employee_id": False,
-                        "location_id": False,
-                        "etat": "hs",
-                    }
-                )
-            elif mouvement.type_mouvement == "reforme":
-                vals_a_mettre_a_jour.update(
-                    {"etat": "reforme", "location_id": False, "employee_id": False}
-                )
-            elif mouvement.type_mouvement == "retour_stock":
-                vals_a_mettre_a_jour.update(
-                    {
-                        "location_id": (
-                            mouvement.to_location_id.id
-                            if mouvement.to_location_id
-                            else False
-                        ),
-                        "employee_id": False,
-                        "etat": "stock",
-                    }
-                )
-            # --- AJOUT DE LA LOGIQUE MANQUANTE ---
-            elif mouvement.type_mouvement == "reparation":
-                vals_a_mettre_a_jour.update(
-                    {
-                        "etat": "maintenance",  # Assurez-vous que la valeur 'maintenance' existe dans votre champ 'etat'
-                    }
-                )
-
-            if vals_a_mettre_a_jour:
-                asset.write(vals_a_mettre_a_jour)
-
-            mouvement.write({"state": "valide"})
-
-            self.env["patrimoine.fiche.vie"].create(
+    @api.model
+    def _create_and_validate(self, vals_list):
+        """Crée les mouvements en un ``create`` (mode masse) et les valide."""
+        mouvements = bulk_mode(self).create(vals_list)
+        mouvements.action_valider()
+        return mouvements
+
+    @api.model
+    def offboard_employee(self, employee, to_location_id=False, motif=False):
+        """Départ d'un employé : retour en stock de tous les biens qui lui sont
+        affectés (vers ``to_location_id`` si fourni)."""
+        assets = self.env["patrimoine.asset"].search([("employee_id", "=", employee.id)])
+        return self._return_to_stock(assets, to_location_id, motif or f"Départ de {employee.name}")
+
+    @api.model
+    def _return_to_stock(self, assets, to_location_id, motif):
+        """Retour en stock de ``assets``, par lots de ``MAX_BULK_MOUVEMENTS``."""
+        mouvements = self.browse()
+        for start in range(0, len(assets), MAX_BULK_MOUVEMENTS):
+            mouvements |= self.bulk_move(
+                assets[start:start + MAX_BULK_MOUVEMENTS],
+                "retour_stock",
+                to_location_id=to_location_id,
+                motif=motif,
+            )
+        return mouvements
+
+    @api.model
+    def reassign_department(self, department, to_department=False, to_location_id=False,
+                            motif=False):
+        """Réorganisation : transfère les biens de ``department`` vers
+        ``to_department`` (fusion de services), chaque bien restant affecté à
+        son employé, dans son état et, sauf ``to_location_id``, à sa
+        localisation. Sans département cible, les biens retournent en stock.
+        """
+        assets = self.env["patrimoine.asset"].search([("department_id", "=", department.id)])
+        if not to_department:
+            return self._return_to_stock(
+                assets, to_location_id, motif or f"Fermeture du département {department.name}"
+            )
+
+        motif = motif or f"Réorganisation : {department.name} vers {to_department.name}"
+        mouvements = self.browse()
+        for start in range(0, len(assets), MAX_BULK_MOUVEMENTS):
+            mouvements |= self._create_and_validate([
                 {
-                    "asset_id": mouvement.asset_id.id,
-                    "action": mouvement.type_mouvement,
-                    "description": f"Mouvement de type '{dict(mouvement._fields['type_mouvement'].selection).get(mouvement.type_mouvement)}' validé. Motif: {mouvement.motif or 'N/A'}",
-                    "utilisateur_id": self.env.uid,
-                    "mouvement_id": mouvement.id,
+                    "asset_id": asset.id,
+                    "type_mouvement": "transfert",
+                    "from_employee_id": asset.employee_id.id,
+                    "to_department_id": to_department.id,
+                    "to_employee_id": asset.employee_id.id,
+                    "to_location_id": to_location_id or asset.location_id.id,
+                    "motif": motif,
+                    "conserver_etat": True,
                 }
-            )
+                for asset in assets[start:start + MAX_BULK_MOUVEMENTS]
+            ])
+        return mouvements
+
+    # Dans votre fichier models/mouvement.py
+
+
+    def _asset_values(self):
+        """Valeurs à écrire sur le bien quand ce mouvement est validé."""
+        self.ensure_one()
+        values = dict(ASSET_VALUES_BY_TYPE.get(self.type_mouvement, {}))
+        if self.conserver_etat:
+            values.pop("etat", None)
+        for asset_field, mouvement_field in DESTINATION_FIELDS.get(self.type_mouvement, ()):
+            values[asset_field] = self[mouvement_field].id
+        return values
+
+    def action_valider(self):
+        """Valide les mouvements en quelques requêtes, quel que soit leur nombre.
+
+        Les biens concernés sont verrouillés en une fois, dans l'ordre des
+        identifiants (deux validations concurrentes ne peuvent pas
+        s'interbloquer), puis mis à jour par groupes de valeurs identiques ;
+        l'état des mouvements et la fiche de vie sont écrits en une requête
+        chacun.
+        """
+        todo = self.filtered(lambda mouvement: mouvement.state != "valide" and mouvement.asset_id)
+        if not todo:
+            return True
+
+        asset_ids = sorted(set(todo.asset_id.ids))
+        self.env.cr.execute(
+            "SELECT id FROM patrimoine_asset WHERE id IN %s ORDER BY id FOR UPDATE",
+            [tuple(asset_ids)],
+        )
+
+        # Valeurs finales par bien : plusieurs mouvements d'un même bien dans le
+        # lot s'appliquent dans l'ordre, comme des écritures successives.
+        asset_updates = {}
+        for mouvement in todo:
+            values = mouvement._asset_values()
+            if values:
+                asset_updates.setdefault(mouvement.asset_id.id, {}).update(values)
+
+        # Une écriture par ensemble de valeurs identiques : un transfert de
+        # 200 biens vers la même destination est un seul UPDATE.
+        assets_by_vals = {}
+        for asset_id, vals in asset_updates.items():
+            assets_by_vals.setdefault(tuple(sorted(vals.items())), []).append(asset_id)
+        # L'entrée de fiche de vie du mouvement tient lieu d'historique.
+        assets_model = self.env["patrimoine.asset"].with_context(fiche_vie_skip=True)
+        for vals, ids in assets_by_vals.items():
+            assets_model.browse(ids).write(dict(vals))
+
+        todo.write({"state": "valide"})
+
+        # Historique de tous les mouvements validés, en un seul INSERT
+        type_labels = dict(self._fields["type_mouvement"].selection)
+        self.env["patrimoine.fiche.vie"].record_events([
+            {
+                "asset_id": mouvement.asset_id.id,
+                "action": mouvement.type_mouvement,
+                "description": f"Mouvement de type '{type_labels.get(mouvement.type_mouvement)}' validé. Motif: {mouvement.motif or 'N/A'}",
+                "mouvement_id": mouvement.id,
+            }
+            for mouvement in todo
+        ])
         return True
 
     def action_cancel(self):  # Si vous voulez une action d'annulation
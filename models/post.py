@@ -3,6 +3,7 @@ from odoo import models, fields, api
 class IntranetPost(models.Model):
     _name = "intranet.post"
     _description = "Post Intranet"
+    _inherit = ["patrimoine.image.mixin"]
     _order = "create_date desc"
 
     name = fields.Char(string="Titre", required=True)
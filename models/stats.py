@@ -0,0 +1,237 @@
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.tools.sql import table_exists
+
+# Clé d'agrégation, identique sur patrimoine.asset et patrimoine.stats.
+STATS_GROUPBY = ('department_id', 'subcategory_id', 'type', 'etat')
+
+# Mouvements qui changent le département d'un bien (les autres le retirent).
+HISTORY_MOUVEMENT_TYPES = ('affectation', 'transfert', 'sortie', 'retour_stock')
+
+# Parc en fin de mois, pour les mois de %s à %s, reconstitué depuis les
+# fiches de vie : chaque mouvement validé ouvre une période [valid_from,
+# valid_to[ pendant laquelle le bien reste dans le même département.
+BACKFILL_QUERY = """
+    WITH months AS (
+        SELECT month::date AS month,
+               (month + INTERVAL '1 month' - INTERVAL '1 day')::date AS month_end
+          FROM generate_series(%s::date, %s::date, INTERVAL '1 month') AS month
+    ), moves AS (
+        SELECT f.asset_id,
+               f.date::date AS valid_from,
+               LEAD(f.date::date) OVER (PARTITION BY f.asset_id ORDER BY f.date, f.id) AS valid_to,
+               CASE WHEN m.type_mouvement IN ('affectation', 'transfert')
+                    THEN m.to_department_id END AS department_id
+          FROM patrimoine_fiche_vie f
+          JOIN patrimoine_mouvement m ON m.id = f.mouvement_id
+         WHERE m.type_mouvement IN %s
+    ), first_moves AS (
+        SELECT asset_id, MIN(valid_from) AS first_date FROM moves GROUP BY asset_id
+    ), creations AS (
+        SELECT asset_id, MIN(date)::date AS created
+          FROM patrimoine_fiche_vie
+         WHERE action = 'creation'
+      GROUP BY asset_id
+    )
+    INSERT INTO patrimoine_stats_monthly
+        (month, type, department_id, asset_count, value_total)
+    SELECT months.month, a.type,
+           CASE WHEN first_moves.first_date IS NULL THEN a.department_id
+                ELSE moves.department_id END,
+           COUNT(*), COALESCE(SUM(a.valeur_acquisition), 0)
+      FROM patrimoine_asset a
+ LEFT JOIN creations ON creations.asset_id = a.id
+ LEFT JOIN first_moves ON first_moves.asset_id = a.id
+      JOIN months
+        ON COALESCE(a.date_acquisition, creations.created, a.create_date::date) <= months.month_end
+ LEFT JOIN moves
+        ON moves.asset_id = a.id
+       AND moves.valid_from <= months.month_end
+       AND (moves.valid_to IS NULL OR moves.valid_to > months.month_end)
+  GROUP BY 1, 2, 3
+"""
+
+
+class PatrimoineStats(models.Model):
+    """Agrégats du registre par (département, sous-catégorie, type, état).
+
+    Les tableaux de bord lisent ces quelques centaines de lignes au lieu de
+    parcourir ``patrimoine.asset``. Les lignes sont tenues à jour par
+    différences depuis ``create``, ``write`` et ``unlink`` des biens
+    (:meth:`_apply_changes`) et recalculées entièrement chaque nuit par
+    :meth:`_cron_reconcile`, qui rattrape les modifications faites hors ORM
+    (changement du type d'une catégorie, SQL direct).
+
+    La table ignore les règles d'accès : elle ne sert que pour les
+    administrateurs du patrimoine, qui voient tout le registre.
+    """
+    _name = 'patrimoine.stats'
+    _description = "Statistiques agrégées du patrimoine"
+    _log_access = False
+
+    # Suppression en cascade : un ``SET NULL`` pourrait heurter la ligne « sans
+    # département » de même clé sur l'index unique. Les biens d'un département
+    # supprimé sont reportés sur cette ligne par ``hr.department.unlink``.
+    department_id = fields.Many2one(
+        'hr.department', string="Département", readonly=True, ondelete='cascade'
+    )
+    subcategory_id = fields.Many2one(
+        'asset.subcategory', string="Sous-catégorie", readonly=True, ondelete='cascade'
+    )
+    type = fields.Char(string="Type de matériel", readonly=True)
+    etat = fields.Char(string="État", readonly=True)
+    asset_count = fields.Integer(string="Nombre de biens", readonly=True)
+    value_total = fields.Float(string="Valeur totale", readonly=True)
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS patrimoine_stats_key_uniq ON patrimoine_stats (
+                (COALESCE(department_id, 0)), (COALESCE(subcategory_id, 0)),
+                (COALESCE(type, '')), (COALESCE(etat, ''))
+            )
+        """)
+        # À l'installation, ``patrimoine_asset`` n'existe pas encore : la table
+        # est alors remplie par le ``post_init_hook``.
+        if table_exists(self.env.cr, 'patrimoine_asset'):
+            self._cron_reconcile()
+
+    @api.model
+    def _apply_changes(self, removed=(), added=()):
+        """Reporte des lignes ``(département, sous-catégorie, type, état,
+        nombre, valeur)`` retirées puis ajoutées, en un seul INSERT ... ON
+        CONFLICT suivi, dans la même requête, de la suppression des groupes
+        devenus vides (les administrateurs ne doivent pas voir de groupes à
+        zéro bien jusqu'au recalcul de la nuit)."""
+        deltas = {}
+        for sign, rows in ((-1, removed), (1, added)):
+            for *key, count, value in rows:
+                delta = deltas.setdefault(tuple(key), [0, 0.0])
+                delta[0] += sign * count
+                delta[1] += sign * (value or 0.0)
+        values = [
+            SQL("(%s, %s, %s, %s, %s, %s)", *key, count, value)
+            for key, (count, value) in deltas.items()
+            if count or value
+        ]
+        if not values:
+            return
+        self.env.cr.execute(SQL("""
+            INSERT INTO patrimoine_stats
+                (department_id, subcategory_id, type, etat, asset_count, value_total)
+            VALUES %s
+            ON CONFLICT (
+                (COALESCE(department_id, 0)), (COALESCE(subcategory_id, 0)),
+                (COALESCE(type, '')), (COALESCE(etat, ''))
+            ) DO UPDATE SET
+                asset_count = patrimoine_stats.asset_count + EXCLUDED.asset_count,
+                value_total = patrimoine_stats.value_total + EXCLUDED.value_total;
+            DELETE FROM patrimoine_stats WHERE asset_count = 0
+        """, SQL(", ").join(values)))
+        self.invalidate_model()
+
+    @api.model
+    def _cron_reconcile(self):
+        """Recalcule toute la table depuis ``patrimoine_asset``."""
+        self.env['patrimoine.asset'].flush_model(list(STATS_GROUPBY) + ['valeur_acquisition'])
+        self.env.cr.execute("LOCK TABLE patrimoine_stats IN EXCLUSIVE MODE")
+        self.env.cr.execute("DELETE FROM patrimoine_stats")
+        self.env.cr.execute("""
+            INSERT INTO patrimoine_stats
+                (department_id, subcategory_id, type, etat, asset_count, value_total)
+            SELECT department_id, subcategory_id, type, etat,
+                   COUNT(*), COALESCE(SUM(valeur_acquisition), 0)
+              FROM patrimoine_asset
+          GROUP BY department_id, subcategory_id, type, etat
+        """)
+        self.invalidate_model()
+
+
+class PatrimoineStatsMonthly(models.Model):
+    """Effectif et valeur du parc en fin de mois, par type et département.
+
+    Le cron :meth:`_cron_snapshot` réécrit chaque jour la ligne du mois en
+    cours depuis ``patrimoine_asset`` ; à la fin du mois, elle reste figée.
+    Les mois antérieurs à l'installation se reconstituent à partir des fiches
+    de vie avec :meth:`_backfill`, une requête par lot de mois.
+
+    Comme ``patrimoine.stats``, la table ignore les règles d'accès et n'est
+    lisible que par les administrateurs du patrimoine.
+    """
+    _name = 'patrimoine.stats.monthly'
+    _description = "Historique mensuel du patrimoine"
+    _log_access = False
+    _order = 'month, type, department_id'
+
+    month = fields.Date(string="Mois", required=True, readonly=True)
+    type = fields.Char(string="Type de matériel", readonly=True)
+    department_id = fields.Many2one('hr.department', string="Département", readonly=True)
+    asset_count = fields.Integer(string="Nombre de biens", readonly=True)
+    value_total = fields.Float(string="Valeur totale", readonly=True)
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS patrimoine_stats_monthly_key_uniq
+                ON patrimoine_stats_monthly (
+                    month, (COALESCE(type, '')), (COALESCE(department_id, 0))
+                )
+        """)
+
+    @api.model
+    def _cron_snapshot(self):
+        """Réécrit les lignes du mois en cours à partir du registre actuel."""
+        month = fields.Date.context_today(self).replace(day=1)
+        self.env['patrimoine.asset'].flush_model(['type', 'department_id', 'valeur_acquisition'])
+        self.env.cr.execute(SQL(
+            "DELETE FROM patrimoine_stats_monthly WHERE month = %s", month
+        ))
+        self.env.cr.execute(SQL("""
+            INSERT INTO patrimoine_stats_monthly
+                (month, type, department_id, asset_count, value_total)
+            SELECT %s, type, department_id, COUNT(*), COALESCE(SUM(valeur_acquisition), 0)
+              FROM patrimoine_asset
+          GROUP BY type, department_id
+        """, month))
+        self.invalidate_model()
+
+    @api.model
+    def _backfill(self, date_from=None, date_to=None, batch_months=12, auto_commit=False):
+        """Reconstitue les mois de ``date_from`` à ``date_to`` (par défaut :
+        du premier bien acquis au mois précédent) depuis les fiches de vie.
+
+        Un bien compte à partir de sa date d'acquisition (à défaut, de sa
+        fiche de création). Son département en fin de mois est celui du
+        dernier mouvement validé (affectation, transfert, sortie, retour en
+        stock) : avant son premier mouvement il est « non affecté », et sans
+        aucun mouvement il garde son département actuel. Chaque lot de
+        ``batch_months`` mois est écrit en une requête ; ``auto_commit``
+        valide la transaction après chaque lot.
+        """
+        today_month = fields.Date.context_today(self).replace(day=1)
+        date_to = fields.Date.to_date(date_to) or today_month - relativedelta(months=1)
+        date_from = fields.Date.to_date(date_from) or self._first_asset_date()
+        if not date_from:
+            return
+        month = date_from.replace(day=1)
+        last = min(date_to.replace(day=1), today_month - relativedelta(months=1))
+
+        self.env['patrimoine.asset'].flush_model()
+        self.env['patrimoine.fiche.vie'].flush_model()
+        self.env['patrimoine.mouvement'].flush_model()
+        while month <= last:
+            stop = min(month + relativedelta(months=batch_months - 1), last)
+            self.env.cr.execute(SQL(
+                "DELETE FROM patrimoine_stats_monthly WHERE month BETWEEN %s AND %s", month, stop
+            ))
+            self.env.cr.execute(SQL(BACKFILL_QUERY, month, stop, HISTORY_MOUVEMENT_TYPES))
+            if auto_commit:
+                self.env.cr.commit()
+            month = stop + relativedelta(months=1)
+        self.invalidate_model()
+
+    def _first_asset_date(self):
+        self.env.cr.execute("""
+            SELECT MIN(COALESCE(date_acquisition, create_date::date)) FROM patrimoine_asset
+        """)
+        return self.env.cr.fetchone()[0]
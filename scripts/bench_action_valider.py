@@ -0,0 +1,197 @@
+"""Mesure de ``PatrimoineMouvement.action_valider``.
+
+Deux modes :
+
+* sur une base réelle, dans le shell Odoo (rien n'est conservé : tout est
+  annulé à la fin) ::
+
+      odoo-bin shell -d <base> --no-http < scripts/bench_action_valider.py
+
+  Compare, pour 1000 transferts vers la même destination, la validation
+  mouvement par mouvement (un appel par enregistrement, comme depuis
+  l'interface) et la validation groupée du recordset complet ;
+
+* sans Odoo ::
+
+      python scripts/bench_action_valider.py
+
+  Charge ``models/mouvement.py`` avec un ORM factice en mémoire et compare,
+  pour 1000 transferts, l'ancienne boucle (une écriture du bien, une
+  écriture de l'état et une fiche de vie par mouvement) à la version
+  groupée : nombre d'appels ORM/SQL et temps Python hors base.
+"""
+import time
+
+COUNT = 1000
+
+
+def _draft_mouvements(env, count):
+    subcategory = env['asset.subcategory'].search([], limit=1)
+    location = env['stock.location'].search([('usage', '=', 'internal')], limit=1)
+    assets = env['patrimoine.asset'].with_context(tracking_disable=True).create([
+        {'name': f"Bench {index}", 'subcategory_id': subcategory.id}
+        for index in range(count)
+    ])
+    return env['patrimoine.mouvement'].with_context(tracking_disable=True).create([
+        {'asset_id': asset.id, 'type_mouvement': 'transfert', 'to_location_id': location.id}
+        for asset in assets
+    ])
+
+
+def _measure(env, label, validate):
+    with env.cr.savepoint(flush=False) as savepoint:
+        mouvements = _draft_mouvements(env, COUNT)
+        env.flush_all()
+        start = time.perf_counter()
+        validate(mouvements)
+        env.flush_all()
+        elapsed = time.perf_counter() - start
+        savepoint.rollback()
+    env.invalidate_all(flush=False)
+    print(f"{label:<28} {elapsed:8.3f} s / {COUNT} mouvements")
+    return elapsed
+
+
+def run(env):
+    one_by_one = _measure(
+        env, "Un mouvement à la fois", lambda mouvements: [m.action_valider() for m in mouvements]
+    )
+    grouped = _measure(env, "Recordset complet", lambda mouvements: mouvements.action_valider())
+    print(f"Gain : x{one_by_one / grouped:.1f}")
+
+
+def run_without_odoo():
+    """Mode sans Odoo : appels ORM/SQL et temps Python, avant et après."""
+    import importlib.util
+    import os
+    import sys
+    import types
+    from collections import Counter
+    from unittest.mock import MagicMock, patch
+
+    odoo = types.ModuleType("odoo")
+    odoo.models = types.SimpleNamespace(Model=object)
+    odoo.fields = MagicMock()
+    odoo.api = types.SimpleNamespace(
+        model=lambda f: f, model_create_multi=lambda f: f, constrains=lambda *a: (lambda f: f)
+    )
+    odoo_exceptions = types.ModuleType("odoo.exceptions")
+    odoo_exceptions.ValidationError = type("ValidationError", (Exception,), {})
+    models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models')
+    models_pkg = types.ModuleType('patrimoine_models')
+    models_pkg.__path__ = [models_dir]
+    spec = importlib.util.spec_from_file_location(
+        'patrimoine_models.mouvement', os.path.join(models_dir, 'mouvement.py')
+    )
+    mouvement_module = importlib.util.module_from_spec(spec)
+    with patch.dict(sys.modules, {
+        "odoo": odoo, "odoo.exceptions": odoo_exceptions, "patrimoine_models": models_pkg,
+    }):
+        spec.loader.exec_module(mouvement_module)
+
+    calls = Counter()
+
+    class Env:
+        def __init__(self):
+            self.cr = types.SimpleNamespace(execute=lambda *a: calls.update(['SQL']))
+            self.uid = 1
+
+        def __getitem__(self, model):
+            return Model(model)
+
+    class Model:
+        def __init__(self, name, ids=()):
+            self.name, self.ids = name, list(ids)
+
+        def with_context(self, **_values):
+            return self
+
+        def browse(self, ids):
+            return Model(self.name, ids)
+
+        def write(self, vals):
+            calls[f"{self.name}.write"] += 1
+
+        def create(self, vals):
+            calls[f"{self.name}.create"] += 1
+
+        def record_events(self, events):
+            calls[f"{self.name}.record_events"] += 1
+
+    selection = [('transfert', 'Transfert')]
+
+    class Base(mouvement_module.PatrimoineMouvement):
+        _fields = {'type_mouvement': types.SimpleNamespace(selection=selection)}
+
+    class Mouvement(Base):
+        def __init__(self, env, index):
+            self.env, self.id, self.state, self.motif = env, index, 'draft', None
+            self.type_mouvement, self.conserver_etat = 'transfert', False
+            self.asset_id = Model('patrimoine.asset', [index])
+            self.asset_id.id = index
+            self.to_department_id = self.to_employee_id = types.SimpleNamespace(id=False)
+            self.to_location_id = types.SimpleNamespace(id=9)
+
+        def ensure_one(self):
+            pass
+
+        def __getitem__(self, name):
+            return getattr(self, name)
+
+        def write(self, vals):
+            calls['patrimoine.mouvement.write'] += 1
+
+    class Mouvements(Base):
+        def __init__(self, env, records):
+            self.env, self.records = env, records
+
+        def __iter__(self):
+            return iter(self.records)
+
+        def __bool__(self):
+            return bool(self.records)
+
+        def filtered(self, func):
+            return Mouvements(self.env, [record for record in self.records if func(record)])
+
+        @property
+        def asset_id(self):
+            return types.SimpleNamespace(ids=[record.asset_id.id for record in self.records])
+
+        def write(self, vals):
+            calls['patrimoine.mouvement.write'] += 1
+
+    def before(mouvements):
+        # Boucle d'origine : trois écritures par mouvement.
+        for mouvement in mouvements:
+            if mouvement.state == "valide" or not mouvement.asset_id:
+                continue
+            mouvement.asset_id.write(mouvement._asset_values())
+            mouvement.write({"state": "valide"})
+            mouvement.env["patrimoine.fiche.vie"].create({
+                "asset_id": mouvement.asset_id.id,
+                "action": mouvement.type_mouvement,
+                "description": f"Mouvement de type '{dict(mouvement._fields['type_mouvement'].selection).get(mouvement.type_mouvement)}' validé. Motif: {mouvement.motif or 'N/A'}",
+                "utilisateur_id": mouvement.env.uid,
+                "mouvement_id": mouvement.id,
+            })
+
+    def measure(label, validate):
+        env = Env()
+        mouvements = Mouvements(env, [Mouvement(env, index) for index in range(1, COUNT + 1)])
+        calls.clear()
+        start = time.perf_counter()
+        validate(mouvements)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<12} {sum(calls.values()):5d} appels ORM/SQL"
+              f"  {elapsed * 1000:7.2f} ms (Python) / {COUNT} mouvements  {dict(calls)}")
+
+    measure("Avant", before)
+    measure("Après", lambda mouvements: mouvements.action_valider())
+
+
+if 'env' in globals():
+    run(env)  # noqa: F821 - fourni par ``odoo-bin shell``
+    env.cr.rollback()  # noqa: F821
+elif __name__ == '__main__':
+    run_without_odoo()
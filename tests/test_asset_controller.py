@@ -1,5 +1,6 @@
 import unittest
 from unittest.mock import MagicMock, patch
+import datetime
 import os
 import sys
 import json
@@ -45,14 +46,40 @@ odoo.fields = types.SimpleNamespace(
     Boolean=MagicMock(),
 )
 odoo.models = types.SimpleNamespace(Model=object)
+odoo.api = types.SimpleNamespace(Environment=MagicMock())
 odoo.osv = types.SimpleNamespace(expression=MagicMock())
 odoo._ = lambda x: x
+
+
+class _SQL:
+    """Composition SQL minimale : garde le texte et les paramètres à plat."""
+
+    def __init__(self, code, *args):
+        self.code, self.params = code, []
+        parts = []
+        for arg in args:
+            if isinstance(arg, _SQL):
+                parts.append(arg.code)
+                self.params.extend(arg.params)
+            else:
+                parts.append('%s')
+                self.params.append(arg)
+        self.code = code % tuple(parts) if args else code
+
+    @staticmethod
+    def identifier(table, column):
+        return _SQL(f'"{table}"."{column}"')
+
+
+odoo.tools = types.SimpleNamespace(SQL=_SQL)
 sys.modules.setdefault("odoo", odoo)
 sys.modules.setdefault("odoo.http", odoo.http)
 sys.modules.setdefault("odoo.exceptions", odoo.exceptions)
 sys.modules.setdefault("odoo.fields", odoo.fields)
 sys.modules.setdefault("odoo.models", odoo.models)
+sys.modules.setdefault("odoo.api", odoo.api)
 sys.modules.setdefault("odoo.osv", odoo.osv)
+sys.modules.setdefault("odoo.tools", odoo.tools)
 
 
 # Simuler les dépendances externes
@@ -80,6 +107,22 @@ spec_common.loader.exec_module(common_module)
 sys.modules['controllers.common'] = common_module
 controllers_pkg.common = common_module
 
+def _load_controller_module(name):
+    path = os.path.join(os.path.dirname(__file__), '..', 'controllers', f'{name}.py')
+    spec_module = importlib.util.spec_from_file_location(f'controllers.{name}', path)
+    module = importlib.util.module_from_spec(spec_module)
+    spec_module.loader.exec_module(module)
+    sys.modules[f'controllers.{name}'] = module
+    setattr(controllers_pkg, name, module)
+    return module
+
+pagination_module = _load_controller_module('pagination')
+serializers_module = _load_controller_module('serializers')
+export_module = _load_controller_module('export')
+sync_module = _load_controller_module('sync')
+dashboard_module = _load_controller_module('dashboard')
+cube_module = _load_controller_module('cube')
+
 asset_path = os.path.join(os.path.dirname(__file__), '..', 'controllers', 'asset_controller.py')
 spec = importlib.util.spec_from_file_location('controllers.asset_controller', asset_path)
 asset_controller = importlib.util.module_from_spec(spec)
@@ -87,6 +130,36 @@ spec.loader.exec_module(asset_controller)
 sys.modules['controllers.asset_controller'] = asset_controller
 controllers_pkg.asset_controller = asset_controller
 
+class FakeRecordset(list):
+    """Recordset minimal : slicing, ``ids``, indexation par champ et ``read``."""
+
+    def __getitem__(self, key):
+        result = super().__getitem__(key)
+        return FakeRecordset(result) if isinstance(key, slice) else result
+
+    @property
+    def ids(self):
+        return [row['id'] for row in self]
+
+    def read(self, fields, load=None):
+        return [{'id': row['id'], **{f: row.get(f, False) for f in fields}} for row in self]
+
+    def mapped(self, name):
+        return [row[name] for row in self]
+
+
+def _fake_asset(asset_id, **values):
+    row = {
+        'id': asset_id, 'name': f'Asset {asset_id}', 'code': f'C{asset_id}',
+        'etat': 'stock', 'type': 'informatique', 'date_acquisition': False,
+        'valeur_acquisition': 0.0, 'custom_values': False, 'location_id': False,
+        'employee_id': False, 'department_id': False, 'subcategory_id': False,
+        'category_id': False, 'fournisseur': False,
+    }
+    row.update(values)
+    return row
+
+
 class AssetControllerTest(unittest.TestCase):
     def setUp(self):
         self.controller = asset_controller.PatrimoineAssetController()
@@ -208,5 +281,617 @@ class AssetControllerTest(unittest.TestCase):
         returned = json.loads(args[0])
         self.assertEqual(returned['demande_id'], demande_record.id)
 
+    @patch('controllers.asset_controller.request')
+    def test_list_all_assets_without_limit_returns_plain_list(self, mock_request):
+        asset_model = MagicMock()
+        asset_model.search.return_value = []
+        mock_request.env.__getitem__.return_value = asset_model
+
+        self.controller.list_all_assets()
+
+        asset_model.search.assert_called_with([])
+        args, kwargs = odoo.http.Response.call_args
+        self.assertEqual(json.loads(args[0]), [])
+
+    @patch('controllers.asset_controller.request')
+    def test_list_all_assets_paginated_returns_envelope(self, mock_request):
+        asset_model = MagicMock()
+        asset_model.search.return_value = FakeRecordset(_fake_asset(i) for i in (1, 2, 3))
+        mock_request.env.__getitem__.return_value = asset_model
+
+        self.controller.list_all_assets(limit='2')
+
+        args, kwargs = asset_model.search.call_args
+        self.assertEqual(kwargs['limit'], 3)
+        self.assertEqual(kwargs['order'], 'id asc')
+        args, kwargs = odoo.http.Response.call_args
+        returned = json.loads(args[0])
+        self.assertEqual([a['id'] for a in returned['data']], [1, 2])
+        self.assertEqual(
+            pagination_module.decode_cursor(returned['next_cursor']), ('id', [2])
+        )
+
+    @patch('controllers.asset_controller.request')
+    def test_list_all_assets_invalid_cursor_returns_400(self, mock_request):
+        mock_request.env.__getitem__.return_value = MagicMock()
+        res = self.controller.list_all_assets(cursor='not-a-cursor')
+        self.assertEqual(res.status_code, 400)
+
+    @patch('controllers.asset_controller.request')
+    def test_export_ndjson_returns_streamed_response(self, mock_request):
+        mock_request.env.context = {'lang': 'fr_FR'}
+        mock_request.env.uid = 4
+
+        self.controller.export_assets_ndjson(status='service')
+
+        args, kwargs = odoo.http.Response.call_args
+        self.assertTrue(kwargs['direct_passthrough'])
+        self.assertEqual(kwargs['headers']['Content-Type'], 'application/x-ndjson')
+        self.assertTrue(hasattr(args[0], '__next__'))
+
+    @patch('controllers.asset_controller.request')
+    def test_export_ndjson_unknown_field_returns_400(self, mock_request):
+        res = self.controller.export_assets_ndjson(fields='secret')
+        self.assertEqual(res.status_code, 400)
+
+    @patch('controllers.asset_controller.request')
+    def test_clone_from_existing_asset(self, mock_request):
+        template = MagicMock()
+        template.exists.return_value = template
+        template.action_clone.return_value = FakeRecordset(
+            [_fake_asset(21, code='A-0021'), _fake_asset(22, code='A-0022')]
+        )
+        mock_request.env = {'patrimoine.asset': MagicMock(browse=MagicMock(return_value=template))}
+        mock_request.httprequest.data = json.dumps({'template_id': 7, 'quantity': 2})
+
+        res = self.controller.clone_assets()
+
+        self.assertEqual(res.status_code, 201)
+        template.action_clone.assert_called_once_with(2)
+        body = json.loads(odoo.http.Response.call_args.args[0])
+        self.assertEqual(body['data'], [{'id': 21, 'code': 'A-0021'}, {'id': 22, 'code': 'A-0022'}])
+
+    @patch('controllers.asset_controller.request')
+    def test_clone_payload_rejects_unknown_fields(self, mock_request):
+        assets = MagicMock()
+        mock_request.env = {'patrimoine.asset': assets}
+        mock_request.httprequest.data = json.dumps(
+            {'template': {'name': 'Chaise', 'subcategory_id': 3, 'code': 'X'}, 'quantity': 300}
+        )
+
+        res = self.controller.clone_assets()
+
+        self.assertEqual(res.status_code, 400)
+        assets.create_copies.assert_not_called()
+
+    @patch('controllers.asset_controller.request')
+    def test_clone_payload_filters_specific_fields(self, mock_request):
+        assets = MagicMock()
+        assets._clone_extension_fields.return_value = {'categorie_mobilier', 'etat_conservation'}
+        assets.create_copies.return_value = FakeRecordset([_fake_asset(21, code='A-0021')])
+        subcategories = MagicMock()
+        subcategories.browse.return_value.category_id.type = 'mobilier'
+        mock_request.env = {'patrimoine.asset': assets, 'asset.subcategory': subcategories}
+        template = {'name': 'Chaise', 'subcategory_id': 3}
+
+        for specific in ({'asset_id': 99}, {'categorie_mobilier': 'chaise', 'code': 'X'}):
+            mock_request.httprequest.data = json.dumps(
+                {'template': template, 'specific': specific, 'quantity': 2}
+            )
+            res = self.controller.clone_assets()
+            self.assertEqual(res.status_code, 400)
+        assets.create_copies.assert_not_called()
+
+        mock_request.httprequest.data = json.dumps(
+            {'template': template, 'specific': {'categorie_mobilier': 'chaise'}, 'quantity': 1}
+        )
+        res = self.controller.clone_assets()
+
+        self.assertEqual(res.status_code, 201)
+        subcategories.browse.assert_called_with(3)
+        assets._clone_extension_fields.assert_called_with('mobilier')
+        assets.create_copies.assert_called_once_with(template, 1, {'categorie_mobilier': 'chaise'})
+
+    @patch('controllers.asset_controller.request')
+    def test_bulk_mouvements_reports_missing_assets(self, mock_request):
+        mock_request.env = MagicMock()
+        mock_request.env.user.has_group.return_value = True
+        mock_request.env.__getitem__.return_value.browse.return_value.exists.return_value.ids = [1]
+        mock_request.httprequest.data = json.dumps(
+            {'asset_ids': [1, 2], 'type_mouvement': 'transfert', 'to_location_id': 5}
+        )
+
+        res = self.controller.create_mouvements_bulk()
+
+        self.assertEqual(res.status_code, 400)
+        body = json.loads(odoo.http.Response.call_args.args[0])
+        self.assertIn('2', body['message'])
+
+    @patch('controllers.asset_controller.request')
+    def test_bulk_mouvements_creates_and_validates_in_one_call(self, mock_request):
+        assets = MagicMock(ids=[1, 2])
+        mouvements_model = MagicMock()
+        mouvements_model.bulk_move.return_value = FakeRecordset([{'id': 8}, {'id': 9}])
+        mock_request.env = MagicMock()
+        mock_request.env.user.has_group.return_value = True
+        mock_request.env.__getitem__.side_effect = {
+            'patrimoine.asset': MagicMock(browse=MagicMock(return_value=MagicMock(
+                exists=MagicMock(return_value=assets)
+            ))),
+            'patrimoine.mouvement': mouvements_model,
+        }.__getitem__
+        mock_request.httprequest.data = json.dumps(
+            {'asset_ids': [1, 2], 'type_mouvement': 'transfert', 'to_department_id': '4'}
+        )
+
+        res = self.controller.create_mouvements_bulk()
+
+        self.assertEqual(res.status_code, 200)
+        mouvements_model.bulk_move.assert_called_once_with(
+            assets, 'transfert', to_department_id=4, to_employee_id=False,
+            to_location_id=False, motif=False, date=False,
+        )
+        self.assertEqual(json.loads(odoo.http.Response.call_args.args[0])['mouvement_ids'], [8, 9])
+
+    def test_iter_ndjson_walks_id_batches(self):
+        asset_model = MagicMock()
+        asset_model.search.side_effect = [
+            FakeRecordset([_fake_asset(1), _fake_asset(2)]),
+            FakeRecordset([_fake_asset(5)]),
+            FakeRecordset([]),
+        ]
+        env = MagicMock()
+        env.__getitem__.return_value = asset_model
+        registry = MagicMock()
+
+        with patch.object(export_module.api, 'Environment', return_value=env):
+            lines = list(export_module.iter_ndjson(
+                registry, 4, {}, [('etat', '=', 'service')], fields='id,code', batch_size=2
+            ))
+
+        self.assertEqual([json.loads(line) for line in lines], [
+            {'id': 1, 'code': 'C1'}, {'id': 2, 'code': 'C2'}, {'id': 5, 'code': 'C5'},
+        ])
+        self.assertTrue(all(line.endswith('\n') for line in lines))
+        domains = [call.args[0] for call in asset_model.search.call_args_list]
+        self.assertEqual(domains[1], [('etat', '=', 'service'), ('id', '>', 2)])
+        self.assertEqual(domains[2], [('etat', '=', 'service'), ('id', '>', 5)])
+        registry.cursor.return_value.__exit__.assert_called_once()
+
+    def _conditional_request(self, if_none_match):
+        conditional_request = MagicMock()
+        conditional_request.env.uid = 2
+        conditional_request.env.context = {'lang': 'fr_FR'}
+        conditional_request.env.__getitem__.return_value._read_group.return_value = [
+            (3, '2024-05-01 10:00:00')
+        ]
+        conditional_request.httprequest.headers = {'If-None-Match': if_none_match}
+        return conditional_request
+
+    @patch('controllers.asset_controller.request')
+    def test_departments_matching_etag_returns_304(self, mock_request):
+        with patch('controllers.common.request', self._conditional_request('W/"abc"')), \
+                patch('controllers.common.make_etag', return_value='W/"abc"'):
+            res = self.controller.get_departments()
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.headers['ETag'], 'W/"abc"')
+        mock_request.env.__getitem__.assert_not_called()
+
+    @patch('controllers.asset_controller.request')
+    def test_departments_stale_etag_runs_route(self, mock_request):
+        mock_request.env.__getitem__.return_value.search.return_value = []
+        with patch('controllers.common.request', self._conditional_request('"old"')), \
+                patch('controllers.common.make_etag', return_value='W/"abc"'):
+            self.controller.get_departments()
+        args, kwargs = odoo.http.Response.call_args
+        self.assertEqual(json.loads(args[0]), [])
+
+    @patch('controllers.asset_controller.request')
+    def test_watermark_error_runs_route_without_etag(self, mock_request):
+        conditional_request = self._conditional_request('"old"')
+        conditional_request.env.__getitem__.return_value._read_group.side_effect = _AccessError('interdit')
+        mock_request.env.__getitem__.return_value.search.side_effect = _AccessError('interdit')
+        with patch('controllers.common.request', conditional_request):
+            res = self.controller.list_categories()
+        self.assertEqual(res.status_code, 500)
+        self.assertNotIn('ETag', res.headers)
+
+    @patch('controllers.asset_controller.request')
+    def test_stats_by_age_filters_and_formats(self, mock_request):
+        assets = mock_request.env.__getitem__.return_value
+        assets._count_by_age.return_value = [("Moins de 1 an", 3), ("Plus de 5 ans", 1)]
+        with patch('controllers.common.request', self._conditional_request('"old"')), \
+                patch('controllers.common.make_etag', return_value='W/"abc"'):
+            self.controller.get_stats_by_age(type='vehicule', departmentId='2')
+        assets._count_by_age.assert_called_once_with(
+            [('type', '=', 'vehicule'), ('department_id', '=', 2)]
+        )
+        args, kwargs = odoo.http.Response.call_args
+        self.assertEqual(
+            json.loads(args[0]),
+            [{'name': 'Moins de 1 an', 'count': 3}, {'name': 'Plus de 5 ans', 'count': 1}],
+        )
+
+    def test_dashboard_folds_one_grouped_read(self):
+        class _Record:
+            def __init__(self, record_id, name):
+                self.id, self.display_name = record_id, name
+
+            def __bool__(self):
+                return bool(self.id)
+
+        dsi, daf, none = _Record(1, 'DSI'), _Record(2, 'DAF'), _Record(False, '')
+        pc, chaise = _Record(5, 'PC'), _Record(6, 'Chaise')
+        assets = MagicMock()
+        assets._read_group.return_value = [
+            (dsi, 'informatique', pc, 'service', 3, 3000.0),
+            (dsi, 'informatique', pc, 'stock', 1, 900.0),
+            (daf, 'mobilier', chaise, 'hs', 2, 100.0),
+            (none, 'mobilier', chaise, 'stock', 4, False),
+        ]
+        assets._count_by_age.return_value = [('Moins de 1 an', 10)]
+        assets._fields['type'].get_description.return_value = {
+            'selection': [('informatique', 'Informatique'), ('mobilier', 'Mobilier')]
+        }
+        env = MagicMock()
+        env.user.has_group.return_value = False
+        env.__getitem__.side_effect = {'patrimoine.asset': assets}.__getitem__
+
+        data = dashboard_module.dashboard_stats(env, [('type', '!=', False)])
+
+        assets._read_group.assert_called_once()
+        self.assertEqual(data['stats'], {'total': 10, 'inService': 3, 'inStock': 5, 'outOfService': 2})
+        self.assertEqual(data['by_department'], [
+            {'id': 1, 'name': 'DSI', 'count': 4},
+            {'id': 2, 'name': 'DAF', 'count': 2},
+            {'id': 0, 'name': 'Non affecté', 'count': 4},
+        ])
+        self.assertEqual(data['by_department_value'], [
+            {'id': 1, 'name': 'DSI', 'value': 3900.0},
+            {'id': 2, 'name': 'DAF', 'value': 100.0},
+        ])
+        self.assertEqual(data['by_type'], [
+            {'code': 'informatique', 'name': 'Informatique', 'count': 4},
+            {'code': 'mobilier', 'name': 'Mobilier', 'count': 6},
+        ])
+        self.assertEqual(data['by_detailed_category'], [
+            {'id': 5, 'name': 'PC', 'count': 4}, {'id': 6, 'name': 'Chaise', 'count': 6},
+        ])
+        self.assertEqual(data['by_age'], [{'name': 'Moins de 1 an', 'count': 10}])
+        assets._count_by_age.assert_called_once_with([('type', '!=', False)])
+
+    def test_monthly_series_by_type(self):
+        history, assets = MagicMock(), MagicMock()
+        history._read_group.return_value = [
+            (datetime.date(2024, 1, 1), 'informatique', 10, 5000.0),
+            (datetime.date(2024, 1, 1), 'mobilier', 4, 200.0),
+            (datetime.date(2024, 2, 1), 'informatique', 12, 6100.0),
+        ]
+        assets._fields['type'].get_description.return_value = {
+            'selection': [('informatique', 'Informatique'), ('mobilier', 'Mobilier')]
+        }
+        env = MagicMock()
+        env.__getitem__.side_effect = {
+            'patrimoine.stats.monthly': history, 'patrimoine.asset': assets,
+        }.__getitem__
+
+        series = dashboard_module.monthly_series(env, 'type', [('department_id', '=', 2)])
+
+        history._read_group.assert_called_once_with(
+            [('department_id', '=', 2)], ['month:month', 'type'],
+            ['asset_count:sum', 'value_total:sum'], order='month:month',
+        )
+        self.assertEqual(series, [
+            {'key': 'informatique', 'name': 'Informatique', 'points': [
+                {'month': '2024-01', 'count': 10, 'value': 5000.0},
+                {'month': '2024-02', 'count': 12, 'value': 6100.0},
+            ]},
+            {'key': 'mobilier', 'name': 'Mobilier', 'points': [
+                {'month': '2024-01', 'count': 4, 'value': 200.0},
+            ]},
+        ])
+
+    @patch('controllers.asset_controller.monthly_series', return_value=[])
+    @patch('controllers.asset_controller.request')
+    def test_stats_series_parses_months(self, mock_request, mock_series):
+        self.controller.get_stats_series(**{'from': '2015-01', 'to': '2024-12', 'groupby': 'department'})
+        mock_series.assert_called_once_with(mock_request.env, 'department', [
+            ('month', '>=', datetime.date(2015, 1, 1)),
+            ('month', '<=', datetime.date(2024, 12, 1)),
+        ])
+
+        odoo.http.Response.reset_mock()
+        self.controller.get_stats_series(**{'from': '2015-13'})
+        self.assertEqual(odoo.http.Response.call_args.kwargs['status'], 400)
+
+    def test_grouped_counts_reads_snapshot_for_admins(self):
+        snapshot, assets = MagicMock(), MagicMock()
+        snapshot.sudo.return_value = snapshot
+        env = MagicMock()
+        env.__getitem__.side_effect = {'patrimoine.stats': snapshot, 'patrimoine.asset': assets}.__getitem__
+
+        env.user.has_group.return_value = True
+        dashboard_module.grouped_counts(env, ['etat'], [('type', '=', 'mobilier')])
+        snapshot._read_group.assert_called_once_with(
+            [('type', '=', 'mobilier')], ['etat'], ['asset_count:sum', 'value_total:sum']
+        )
+
+        env.user.has_group.return_value = False
+        dashboard_module.grouped_counts(env, ['etat'])
+        assets._read_group.assert_called_once_with([], ['etat'], ['__count', 'valeur_acquisition:sum'])
+
+    def _cube_env(self, assets, departments):
+        env = MagicMock()
+        env.cr.dbname = 'test'
+        env.uid = 7
+        env.context = {}
+        env.user.has_group.return_value = False
+        env.__getitem__.side_effect = {
+            'patrimoine.asset': assets, 'hr.department': departments,
+        }.__getitem__
+        return env
+
+    def test_cube_groups_once_and_caches_until_assets_change(self):
+        cube_module._cache.clear()
+        dsi = MagicMock(id=1, display_name='DSI')
+        assets, departments = MagicMock(), MagicMock()
+        departments._read_group.return_value = [(4, '2024-01-01 00:00:00')]
+        watermark = [(10, '2024-05-01 10:00:00')]
+        groups = [(dsi, datetime.date(2021, 1, 1), 3, 1500.0)]
+
+        def read_group(domain, groupby=(), aggregates=()):
+            return groups if groupby else watermark
+
+        assets._read_group.side_effect = read_group
+        env = self._cube_env(assets, departments)
+        params = {'dimensions': 'department,year', 'measures': 'count,sum', 'etat': 'service'}
+
+        data = cube_module.cube(env, params)
+        self.assertEqual(data['rows'], [
+            {'department': {'id': 1, 'name': 'DSI'}, 'year': 2021, 'count': 3, 'sum': 1500.0},
+        ])
+        assets._read_group.assert_any_call(
+            [('etat', '=', 'service')],
+            ['department_id', 'date_acquisition:year'],
+            ['__count', 'valeur_acquisition:sum'],
+        )
+        grouped_calls = lambda: [c for c in assets._read_group.call_args_list if len(c.args) > 1]
+        self.assertEqual(len(grouped_calls()), 1)
+
+        cube_module.cube(env, params)
+        self.assertEqual(len(grouped_calls()), 1)
+
+        watermark[:] = [(11, '2024-05-02 09:00:00')]
+        cube_module.cube(env, params)
+        self.assertEqual(len(grouped_calls()), 2)
+
+    def test_cube_rejects_unknown_dimensions(self):
+        env = self._cube_env(MagicMock(), MagicMock())
+        with self.assertRaises(_ValidationError):
+            cube_module.cube(env, {'dimensions': 'employee'})
+        with self.assertRaises(_ValidationError):
+            cube_module.cube(env, {'dimensions': 'type', 'measures': 'max'})
+        with self.assertRaises(_ValidationError):
+            cube_module.cube(env, {'dimensions': 'type', 'year': 'abc'})
+
+    def test_watermark_changes_etag(self):
+        model = MagicMock()
+        model._read_group.return_value = [(3, '2024-05-01 10:00:00')]
+        first = common_module.make_etag(common_module.model_watermark(model))
+        model._read_group.return_value = [(2, '2024-05-01 10:00:00')]
+        second = common_module.make_etag(common_module.model_watermark(model))
+        self.assertNotEqual(first, second)
+        self.assertTrue(first.startswith('W/"'))
+
+    def _sync_env(self, assets, tombstones):
+        """``assets`` et ``tombstones`` : lignes ``(enregistrement, sync_txid)``."""
+        asset_model = MagicMock()
+        asset_model.browse.side_effect = lambda ids: FakeRecordset(
+            [row for row, _txid in assets if row['id'] in ids]
+        )
+        tombstone_model = MagicMock(RETENTION_DAYS=90)
+        tombstone_model.browse.side_effect = lambda ids: FakeRecordset(
+            [row for row, _txid in tombstones if row['id'] in ids]
+        )
+        env = MagicMock()
+        env.__getitem__.side_effect = lambda model: (
+            tombstone_model if model == 'patrimoine.asset.tombstone' else asset_model
+        )
+
+        def changed_since(model, low, after, limit):
+            rows = assets if model is asset_model else tombstones
+            return [(row['id'], txid) for row, txid in rows][:limit]
+
+        changed = patch.object(sync_module, 'changed_since', MagicMock(side_effect=changed_since))
+        return env, asset_model, tombstone_model, changed
+
+    def _sync_fields(self):
+        import datetime as dt
+        fake_fields = MagicMock()
+        fake_fields.Datetime.now.return_value = dt.datetime(2024, 6, 1, 12, 0, 0)
+        fake_fields.Datetime.to_datetime.side_effect = (
+            lambda value: dt.datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+        )
+        return patch.object(sync_module, 'fields', fake_fields)
+
+    def _sync_token(self, payload):
+        return pagination_module.decode_cursor(payload['next_since'], sync_module.SYNC_TOKEN)[1]
+
+    def test_asset_changes_initial_sync_skips_old_tombstones(self):
+        env, asset_model, tombstone_model, changed = self._sync_env(
+            [(_fake_asset(1), 480)], []
+        )
+        with self._sync_fields(), changed as changed_since, \
+                patch.object(sync_module, 'snapshot_xmin', return_value=500):
+            payload = sync_module.asset_changes(env, None, None, 'id')
+
+        self.assertTrue(payload['reset'])
+        self.assertFalse(payload['has_more'])
+        self.assertEqual(payload['data'], [{'id': 1}])
+        self.assertEqual(payload['deleted'], [])
+        # Tous les biens, mais seulement les suppressions de transactions encore
+        # ouvertes au début de la synchronisation.
+        changed_since.assert_any_call(asset_model, 0, None, 501)
+        changed_since.assert_any_call(tombstone_model, 500, None, 501)
+        self.assertEqual(
+            self._sync_token(payload), [500, 500, None, None, None, None, None, '2024-06-01 12:00:00']
+        )
+
+    def test_asset_changes_since_token_returns_delta_and_tombstones(self):
+        since = pagination_module.encode_cursor(
+            'sync', [400, 400, 450, 420, 1, None, None, '2024-05-30 08:00:00']
+        )
+        env, asset_model, tombstone_model, changed = self._sync_env(
+            [(_fake_asset(4), 430), (_fake_asset(2), 460)],
+            [({'id': 8, 'asset_ref': 3}, 440)],
+        )
+        with self._sync_fields(), changed as changed_since, \
+                patch.object(sync_module, 'snapshot_xmin') as snapshot_xmin:
+            payload = sync_module.asset_changes(env, since, '1', 'id')
+
+        self.assertFalse(payload['reset'])
+        self.assertTrue(payload['has_more'])
+        self.assertEqual(payload['data'], [{'id': 4}])
+        self.assertEqual(payload['deleted'], [3])
+        changed_since.assert_any_call(asset_model, 400, (420, 1), 2)
+        changed_since.assert_any_call(tombstone_model, 400, None, 2)
+        snapshot_xmin.assert_not_called()
+        # Le tour continue : bornes et xmin du tour inchangés, positions avancées.
+        self.assertEqual(
+            self._sync_token(payload), [400, 400, 450, 430, 4, 440, 8, '2024-06-01 12:00:00']
+        )
+
+    def test_asset_changes_new_round_rescans_open_transactions(self):
+        since = pagination_module.encode_cursor(
+            'sync', [450, 450, None, None, None, None, None, '2024-05-30 08:00:00']
+        )
+        env, asset_model, _, changed = self._sync_env([(_fake_asset(4), 455)], [])
+        with self._sync_fields(), changed as changed_since, \
+                patch.object(sync_module, 'snapshot_xmin', return_value=470):
+            payload = sync_module.asset_changes(env, since, None, 'id')
+
+        self.assertEqual(payload['data'], [{'id': 4}])
+        changed_since.assert_any_call(asset_model, 450, None, 501)
+        # Le tour suivant reprend au xmin relevé au début de celui-ci.
+        self.assertEqual(self._sync_token(payload)[:3], [470, 470, None])
+
+    def test_asset_changes_expired_token_resets(self):
+        since = pagination_module.encode_cursor(
+            'sync', [40, 40, None, None, None, None, None, '2024-01-01 10:00:00']
+        )
+        env, asset_model, _, changed = self._sync_env([], [])
+        with self._sync_fields(), changed as changed_since, \
+                patch.object(sync_module, 'snapshot_xmin', return_value=900):
+            payload = sync_module.asset_changes(env, since, None, 'id')
+        self.assertTrue(payload['reset'])
+        changed_since.assert_any_call(asset_model, 0, None, 501)
+
+    def test_changed_since_filters_on_transaction_watermark(self):
+        query = MagicMock()
+        query.select.side_effect = lambda *columns: _SQL(
+            'SELECT %s, %s FROM patrimoine_asset', *columns
+        )
+        model = MagicMock(_table='patrimoine_asset')
+        model._search.return_value = query
+        model.env.cr.fetchall.return_value = [(4, 430)]
+
+        rows = sync_module.changed_since(model, 400, (420, 1), 11)
+
+        self.assertEqual(rows, [(4, 430)])
+        # Requête construite par ``_search`` : les règles d'accès s'appliquent.
+        model._search.assert_called_once_with([])
+        conditions = [call.args[0] for call in query.add_where.call_args_list]
+        self.assertEqual(
+            [(condition.code, condition.params) for condition in conditions],
+            [
+                ('"patrimoine_asset"."sync_txid" >= %s', [400]),
+                ('("patrimoine_asset"."sync_txid", "patrimoine_asset"."id") > (%s, %s)', [420, 1]),
+            ],
+        )
+        self.assertEqual(query.order.code, '"patrimoine_asset"."sync_txid", "patrimoine_asset"."id"')
+        self.assertEqual(query.limit, 11)
+
+    def test_json_dumps_keeps_str_rendering_of_dates(self):
+        import datetime as dt
+        from decimal import Decimal
+        encoded = common_module.json_dumps({
+            'date': dt.date(2024, 5, 1),
+            'datetime': dt.datetime(2024, 5, 1, 10, 0, 0),
+            'amount': Decimal('1.50'),
+            3: 'Électricité',
+        })
+        self.assertEqual(json.loads(encoded), {
+            'date': '2024-05-01',
+            'datetime': '2024-05-01 10:00:00',
+            'amount': '1.50',
+            '3': 'Électricité',
+        })
+
+    def _encoding_request(self, accept_encoding):
+        encoding_request = MagicMock()
+        encoding_request.httprequest.headers = {'Accept-Encoding': accept_encoding}
+        return encoding_request
+
+    def test_large_response_is_gzipped_when_accepted(self):
+        import gzip
+        body = json.dumps([{'id': i, 'name': 'Ordinateur portable'} for i in range(100)])
+        with patch('controllers.common.request', self._encoding_request('gzip, deflate, br;q=0')), \
+                patch.object(common_module, 'OdooResponse') as odoo_response:
+            common_module.Response(body, status=200)
+        args, kwargs = odoo_response.call_args
+        self.assertEqual(kwargs['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(kwargs['headers']['Vary'], 'Accept-Encoding')
+        self.assertLess(len(args[0]), len(body))
+        self.assertEqual(gzip.decompress(args[0]).decode('utf-8'), body)
+
+    def test_small_or_refused_responses_are_not_compressed(self):
+        with patch('controllers.common.request', self._encoding_request('gzip')), \
+                patch.object(common_module, 'OdooResponse') as odoo_response:
+            common_module.Response('{"ok": true}')
+        self.assertNotIn('Content-Encoding', odoo_response.call_args.kwargs['headers'])
+
+        with patch('controllers.common.request', self._encoding_request('gzip;q=0, identity')), \
+                patch.object(common_module, 'OdooResponse') as odoo_response:
+            common_module.Response('x' * 5000)
+        self.assertNotIn('Content-Encoding', odoo_response.call_args.kwargs['headers'])
+
+    def test_explicit_codings_override_the_wildcard(self):
+        cases = [
+            ('gzip;q=0, *', True, 'br'),
+            ('gzip;q=0, *', False, None),
+            ('br;q=0, *', True, 'gzip'),
+            ('br;q=0', True, None),
+            ('br;q=0, gzip', True, 'gzip'),
+            ('*', False, 'gzip'),
+            ('gzip;q=0.5, br', True, 'br'),
+            ('gzip, br;q=0.2', True, 'gzip'),
+            ('', True, None),
+        ]
+        for header, with_brotli, expected in cases:
+            with self.subTest(header=header, brotli=with_brotli), \
+                    patch('controllers.common.request', self._encoding_request(header)), \
+                    patch.object(common_module, 'brotli', MagicMock() if with_brotli else None):
+                self.assertEqual(common_module._accepted_encoding(), expected)
+
+    def test_streamed_response_is_compressed_incrementally(self):
+        import gzip
+        lines = ['{"id": %d}\n' % i for i in range(500)]
+        closed = []
+
+        def body():
+            try:
+                yield from lines
+            finally:
+                closed.append(True)
+
+        with patch('controllers.common.request', self._encoding_request('gzip')), \
+                patch.object(common_module, 'OdooResponse') as odoo_response:
+            common_module.Response(body(), direct_passthrough=True)
+        args, kwargs = odoo_response.call_args
+        self.assertEqual(kwargs['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(args[0])).decode('utf-8'), ''.join(lines))
+        self.assertEqual(closed, [True])
+
+
 if __name__ == '__main__':
     unittest.main()
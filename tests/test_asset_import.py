@@ -0,0 +1,195 @@
+import base64
+import contextlib
+import unittest
+from datetime import date
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import types
+import importlib.util
+
+odoo = types.ModuleType("odoo")
+odoo.models = types.SimpleNamespace(Model=object)
+odoo.fields = MagicMock()
+odoo.fields.Date.to_string = lambda value: value.isoformat()
+odoo.api = types.SimpleNamespace(model=lambda f: f, depends=lambda *a: (lambda f: f))
+odoo_exceptions = types.ModuleType("odoo.exceptions")
+odoo_exceptions.ValidationError = type("ValidationError", (Exception,), {})
+odoo_exceptions.UserError = type("UserError", (Exception,), {})
+
+models_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
+models_pkg = types.ModuleType('patrimoine_models')
+models_pkg.__path__ = [models_dir]
+spec = importlib.util.spec_from_file_location(
+    'patrimoine_models.asset_import', os.path.join(models_dir, 'asset_import.py')
+)
+asset_import = importlib.util.module_from_spec(spec)
+with patch.dict(sys.modules, {
+    "odoo": odoo, "odoo.exceptions": odoo_exceptions, "patrimoine_models": models_pkg,
+}):
+    spec.loader.exec_module(asset_import)
+
+ValidationError = odoo_exceptions.ValidationError
+
+
+def _selection_field(*keys):
+    return types.SimpleNamespace(type='selection', selection=[(key, key) for key in keys])
+
+
+def _custom_field(field_id, technical_name, field_type, required=True, selection_values=''):
+    return types.SimpleNamespace(
+        id=field_id,
+        name=technical_name.title(),
+        technical_name=technical_name,
+        field_type=field_type,
+        required=required,
+        selection_values=selection_values,
+    )
+
+
+def _importer():
+    importer = asset_import.PatrimoineAssetImport()
+    models = {
+        'patrimoine.asset': types.SimpleNamespace(
+            _fields={'etat': _selection_field('stock', 'service', 'hs', 'reforme')}
+        ),
+        'patrimoine.asset.informatique': types.SimpleNamespace(_fields={
+            'marque': types.SimpleNamespace(type='char'),
+            'date_garantie_fin': types.SimpleNamespace(type='date'),
+        }),
+    }
+    importer.env = MagicMock()
+    importer.env.__getitem__.side_effect = models.__getitem__
+    importer.env.cr.savepoint.side_effect = contextlib.nullcontext
+    return importer
+
+
+SUBCATEGORIES = {
+    'PC': types.SimpleNamespace(
+        id=4,
+        category_id=types.SimpleNamespace(type='informatique'),
+        custom_field_ids=[
+            _custom_field(11, 'ram', 'integer'),
+            _custom_field(12, 'os', 'selection', required=False, selection_values='Linux\nWindows'),
+        ],
+    ),
+}
+
+
+class ConvertValueTest(unittest.TestCase):
+    def test_conversions(self):
+        self.assertEqual(asset_import.convert_value('12,5', 'float', 'v'), 12.5)
+        self.assertEqual(asset_import.convert_value('03/02/2021', 'date', 'd'), date(2021, 2, 3))
+        self.assertEqual(asset_import.convert_value('2021-02-03', 'date', 'd'), date(2021, 2, 3))
+        self.assertIs(asset_import.convert_value('oui', 'boolean', 'b'), True)
+        self.assertIs(asset_import.convert_value('  ', 'char', 'c'), False)
+
+    def test_invalid_value_names_the_column(self):
+        with self.assertRaises(ValidationError) as ctx:
+            asset_import.convert_value('demain', 'date', 'date_acquisition')
+        self.assertIn('date_acquisition', str(ctx.exception))
+        with self.assertRaises(ValidationError):
+            asset_import.convert_value('neuf', 'selection', 'etat', ('stock', 'hs'))
+
+
+class PrepareRowTest(unittest.TestCase):
+    def test_row_is_split_into_asset_and_extension(self):
+        row = {
+            'subcategory_code': 'PC', 'name': 'Portable', 'etat': 'stock',
+            'valeur_acquisition': '850', 'ram': '16', 'os': 'Linux',
+            'marque': 'Dell', 'date_garantie_fin': '2026-01-31',
+        }
+
+        asset_vals, extension_model, extension_vals = _importer()._prepare_row(row, SUBCATEGORIES)
+
+        self.assertEqual(asset_vals, {
+            'subcategory_id': 4, 'name': 'Portable', 'etat': 'stock',
+            'valeur_acquisition': 850.0, 'custom_values': {'11': 16, '12': 'Linux'},
+        })
+        self.assertEqual(extension_model, 'patrimoine.asset.informatique')
+        self.assertEqual(extension_vals, {'marque': 'Dell', 'date_garantie_fin': date(2026, 1, 31)})
+
+    def test_schema_errors(self):
+        importer = _importer()
+        with self.assertRaisesRegex(ValidationError, 'Sous-catégorie inconnue'):
+            importer._prepare_row({'subcategory_code': 'XX', 'name': 'a'}, SUBCATEGORIES)
+        with self.assertRaisesRegex(ValidationError, 'Ram'):
+            importer._prepare_row({'subcategory_code': 'PC', 'name': 'a'}, SUBCATEGORIES)
+        with self.assertRaisesRegex(ValidationError, 'Os'):
+            importer._prepare_row(
+                {'subcategory_code': 'PC', 'name': 'a', 'ram': '8', 'os': 'BeOS'}, SUBCATEGORIES
+            )
+
+
+class ProcessChunkTest(unittest.TestCase):
+    def test_chunk_is_created_in_one_batch(self):
+        importer = _importer()
+        importer._create_assets = MagicMock()
+        rows = [
+            (2, {'subcategory_code': 'PC', 'name': 'A', 'ram': '8'}),
+            (4, {'subcategory_code': 'PC', 'name': 'B', 'ram': 'huit'}),
+            (5, {'subcategory_code': 'PC', 'name': 'C', 'ram': '4'}),
+        ]
+
+        created, errors = importer._process_chunk(rows, SUBCATEGORIES)
+
+        self.assertEqual(created, 2)
+        self.assertEqual([error['row'] for error in errors], [4])
+        importer._create_assets.assert_called_once()
+        self.assertEqual(len(importer._create_assets.call_args.args[0]), 2)
+
+    def test_failed_chunk_is_replayed_row_by_row(self):
+        importer = _importer()
+
+        def create(prepared):
+            if len(prepared) > 1 or prepared[0][0]['name'] == 'B':
+                raise Exception('contrainte')
+
+        importer._create_assets = MagicMock(side_effect=create)
+        rows = [
+            (line_no, {'subcategory_code': 'PC', 'name': name, 'ram': '8'})
+            for line_no, name in zip((10, 11, 12), 'ABC')
+        ]
+
+        created, errors = importer._process_chunk(rows, SUBCATEGORIES)
+
+        self.assertEqual(created, 2)
+        self.assertEqual(errors, [{'row': 11, 'message': 'contrainte'}])
+        self.assertEqual(importer._create_assets.call_count, 4)
+
+
+class ReadRowsTest(unittest.TestCase):
+    def test_semicolon_csv_with_bom(self):
+        importer = _importer()
+        importer.ensure_one = MagicMock()
+        importer.name = 'biens.csv'
+        content = '\ufeffsubcategory_code;name\nPC;Portable\n;\n'.encode('utf-8')
+        importer.file = base64.b64encode(content)
+
+        self.assertEqual(importer._read_rows(), [(2, {'subcategory_code': 'PC', 'name': 'Portable'})])
+
+    def test_errors_keep_sheet_line_numbers_after_blank_lines(self):
+        importer = _importer()
+        importer.ensure_one = MagicMock()
+        importer.name = 'biens.csv'
+        content = (
+            'subcategory_code,name,ram\n'
+            'PC,A,8\n'
+            '\n'
+            ',,\n'
+            'PC,B,huit\n'
+            'XX,C,4\n'
+        ).encode('utf-8')
+        importer.file = base64.b64encode(content)
+        importer._create_assets = MagicMock()
+
+        rows = importer._read_rows()
+        created, errors = importer._process_chunk(rows, SUBCATEGORIES)
+
+        self.assertEqual([line_no for line_no, _row in rows], [2, 5, 6])
+        self.assertEqual(created, 1)
+        self.assertEqual([error['row'] for error in errors], [5, 6])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,247 @@
+import unittest
+from datetime import date
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import types
+import importlib.util
+
+import numpy  # noqa: F401 - chargé avant ``patch.dict(sys.modules)``
+
+
+class _Model:
+    """Base ORM minimale : enregistre les appels à ``create`` et ``write``."""
+
+    def __init__(self, records=(), context=None):
+        self.records = list(records)
+        self.context = dict(context or {})
+        self.env = MagicMock()
+        self.env.context = self.context
+        self.written = []
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __bool__(self):
+        return bool(self.records)
+
+    @property
+    def ids(self):
+        return [record.id for record in self.records]
+
+    def sudo(self):
+        return self
+
+    def _read_group(self, domain, groupby, aggregates):
+        self.read_groups = getattr(self, 'read_groups', 0) + 1
+        return []
+
+    def with_context(self, **values):
+        clone = type(self)(self.records, {**self.context, **values})
+        clone.env = self.env
+        clone.env.context = clone.context
+        return clone
+
+    def write(self, vals):
+        self.written.append(vals)
+        return True
+
+
+odoo = types.ModuleType("odoo")
+odoo.models = types.SimpleNamespace(Model=_Model, AbstractModel=_Model)
+odoo.fields = MagicMock()
+odoo.api = types.SimpleNamespace(
+    model=lambda f: f, model_create_multi=lambda f: f, depends=lambda *a: (lambda f: f)
+)
+odoo.http = MagicMock()
+odoo_exceptions = types.ModuleType("odoo.exceptions")
+odoo_exceptions.ValidationError = type("ValidationError", (Exception,), {})
+odoo_osv = types.ModuleType("odoo.osv")
+odoo_osv.expression = types.SimpleNamespace(AND=lambda domains: [leaf for d in domains for leaf in d])
+
+
+class _SQL:
+    """Composition SQL minimale : garde le texte et les paramètres à plat."""
+
+    def __init__(self, code, *args):
+        self.code, self.params = code, []
+        parts = []
+        for arg in args:
+            if isinstance(arg, _SQL):
+                parts.append(arg.code)
+                self.params.extend(arg.params)
+            else:
+                parts.append('%s')
+                self.params.append(arg)
+        self.code = code % tuple(parts) if args else code
+
+    def join(self, items):
+        items = list(items)
+        return _SQL(self.code.join(['%s'] * len(items)), *items)
+
+    @staticmethod
+    def identifier(table, column):
+        return _SQL(f'"{table}"."{column}"')
+
+
+odoo_tools = types.ModuleType("odoo.tools")
+odoo_tools.SQL = _SQL
+odoo_tools_sql = types.ModuleType("odoo.tools.sql")
+odoo_tools_sql.table_exists = MagicMock(return_value=True)
+
+
+class _relativedelta:
+    def __init__(self, years=0):
+        self.years = years
+
+    def __rsub__(self, day):
+        return day.replace(year=day.year - self.years)
+
+
+dateutil = types.ModuleType("dateutil")
+dateutil_relativedelta = types.ModuleType("dateutil.relativedelta")
+dateutil_relativedelta.relativedelta = _relativedelta
+
+models_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
+models_pkg = types.ModuleType('patrimoine_models')
+models_pkg.__path__ = [models_dir]
+spec = importlib.util.spec_from_file_location(
+    'patrimoine_models.asset', os.path.join(models_dir, 'asset.py')
+)
+asset_module = importlib.util.module_from_spec(spec)
+with patch.dict(sys.modules, {
+    "odoo": odoo, "odoo.exceptions": odoo_exceptions, "odoo.osv": odoo_osv,
+    "odoo.tools": odoo_tools, "odoo.tools.sql": odoo_tools_sql, "patrimoine_models": models_pkg,
+    "dateutil": dateutil, "dateutil.relativedelta": dateutil_relativedelta,
+}):
+    spec.loader.exec_module(asset_module)
+
+
+class _Assets(asset_module.PatrimoineAsset):
+    _fields = {
+        'etat': types.SimpleNamespace(
+            type='selection', string='État', selection=[('service', 'En service')]
+        ),
+        'name': types.SimpleNamespace(type='char', string='Nom du bien'),
+    }
+
+
+def _assets():
+    return _Assets([types.SimpleNamespace(id=1), types.SimpleNamespace(id=2)])
+
+
+class BulkWriteTest(unittest.TestCase):
+    def test_normal_write_leaves_history_to_chatter(self):
+        assets = _assets()
+        assets.write({'etat': 'service'})
+        assets.env['patrimoine.fiche.vie'].record_events.assert_not_called()
+
+    def test_bulk_write_logs_one_summary_per_asset(self):
+        assets = asset_module.bulk_mode(_assets())
+        assets.write({'etat': 'service', 'location_id': 3})
+
+        self.assertTrue(assets.context['tracking_disable'])
+        assets.env['patrimoine.fiche.vie'].record_events.assert_called_once_with([
+            {'asset_id': 1, 'action': 'autre', 'description': "Modification groupée (État : En service)."},
+            {'asset_id': 2, 'action': 'autre', 'description': "Modification groupée (État : En service)."},
+        ])
+
+    def test_bulk_write_without_tracked_field_or_already_logged(self):
+        assets = asset_module.bulk_mode(_assets())
+        assets.write({'location_id': 3})
+        assets.with_context(fiche_vie_skip=True).write({'etat': 'service'})
+        assets.env['patrimoine.fiche.vie'].record_events.assert_not_called()
+
+
+class StatsHookTest(unittest.TestCase):
+    def test_write_moves_assets_between_stats_rows(self):
+        assets = _assets()
+        rows = iter([
+            [(1, 5, 'informatique', 'stock', 2, 800.0)],
+            [(2, 5, 'informatique', 'service', 2, 800.0)],
+        ])
+        assets._stats_rows = lambda: next(rows)
+
+        assets.write({'department_id': 2, 'etat': 'service'})
+
+        assets.env['patrimoine.stats']._apply_changes.assert_called_once_with(
+            removed=[(1, 5, 'informatique', 'stock', 2, 800.0)],
+            added=[(2, 5, 'informatique', 'service', 2, 800.0)],
+        )
+
+    def test_write_outside_stats_fields_skips_snapshot(self):
+        assets = _assets()
+        assets.write({'name': 'Portable'})
+        self.assertFalse(hasattr(assets, 'read_groups'))
+        assets.env['patrimoine.stats']._apply_changes.assert_not_called()
+
+
+class CloneTest(unittest.TestCase):
+    def test_clones_do_not_copy_documents(self):
+        assets = _Assets([types.SimpleNamespace(id=1)])
+        assets.ensure_one = MagicMock()
+        assets.type = 'consommable'
+        assets.copy_data = MagicMock(return_value=[{
+            'name': 'Portable', 'valeur_acquisition': 900.0, 'image': b'img',
+            'facture_file': b'pdf', 'facture_filename': 'facture.pdf',
+            'bon_livraison_file': b'pdf', 'bon_livraison_filename': 'bl.pdf',
+        }])
+        assets.create_copies = MagicMock()
+
+        assets.action_clone(3)
+
+        assets.create_copies.assert_called_once_with(
+            {'name': 'Portable', 'valeur_acquisition': 900.0}, 3, {}
+        )
+
+
+    def test_extension_fields_exclude_link_inherited_and_documents(self):
+        def field(copy=True, inherited=False, automatic=False):
+            return types.SimpleNamespace(copy=copy, inherited=inherited, automatic=automatic)
+
+        assets = _assets()
+        assets.env['patrimoine.asset.mobilier']._fields = {
+            'id': field(automatic=True),
+            'asset_id': field(),
+            'name': field(inherited=True),
+            'image': field(),
+            'categorie_mobilier': field(),
+            'etat_conservation': field(),
+            'reference_interne': field(copy=False),
+        }
+
+        self.assertEqual(
+            assets._clone_extension_fields('mobilier'), {'categorie_mobilier', 'etat_conservation'}
+        )
+        self.assertEqual(assets._clone_extension_fields('consommable'), set())
+
+
+class CountByAgeTest(unittest.TestCase):
+    def test_brackets_are_counted_in_one_grouped_query(self):
+        assets = _assets()
+        assets._table = 'patrimoine_asset'
+        query = MagicMock()
+        query.select.side_effect = lambda column: _SQL('SELECT %s FROM patrimoine_asset', column)
+        assets._search = MagicMock(return_value=query)
+        assets.env.cr.fetchall.return_value = [(0, 4), (3, 2), (4, 7)]
+
+        result = assets._count_by_age([('type', '=', 'vehicule')], today=date(2024, 6, 30))
+
+        self.assertEqual(result, [
+            ("Moins de 1 an", 4), ("1 à 2 ans", 0), ("2 à 3 ans", 0),
+            ("3 à 5 ans", 2), ("Plus de 5 ans", 7),
+        ])
+        assets._search.assert_called_once_with(
+            [('type', '=', 'vehicule'), ('date_acquisition', '!=', False)]
+        )
+        assets.env.cr.execute.assert_called_once()
+        sql = assets.env.cr.execute.call_args.args[0]
+        self.assertIn('GROUP BY bracket', sql.code)
+        self.assertEqual(sql.params, [
+            date(2023, 6, 30), 0, date(2022, 6, 30), 1, date(2021, 6, 30), 2,
+            date(2019, 6, 30), 3, 4,
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,286 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import types
+import importlib.util
+import random
+from datetime import date
+
+import numpy  # noqa: F401 - chargé avant ``patch.dict(sys.modules)``
+
+
+class _SQL:
+    def __init__(self, code, *args):
+        self.code, self.params = code, list(args)
+
+
+odoo = types.ModuleType("odoo")
+odoo.models = types.SimpleNamespace(Model=object)
+odoo.fields = MagicMock()
+odoo.fields.Command = types.SimpleNamespace(create=lambda vals: (0, 0, vals))
+odoo.api = types.SimpleNamespace(model=lambda f: f)
+odoo_tools = types.ModuleType("odoo.tools")
+odoo_tools.SQL = _SQL
+
+models_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
+models_pkg = types.ModuleType('patrimoine_models')
+models_pkg.__path__ = [models_dir]
+
+
+def _load(name):
+    spec = importlib.util.spec_from_file_location(
+        f'patrimoine_models.{name}', os.path.join(models_dir, f'{name}.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+with patch.dict(sys.modules, {
+    "odoo": odoo, "odoo.tools": odoo_tools, "patrimoine_models": models_pkg,
+}):
+    depreciation = _load('depreciation')
+    amortissement = _load('amortissement')
+
+
+def _python_schedules(assets):
+    return list(depreciation.reference_schedules(assets))
+
+
+class ScheduleTest(unittest.TestCase):
+    def _schedules(self, assets):
+        """Plans de référence, après vérification que numpy donne les mêmes."""
+        rows = _python_schedules(assets)
+        self.assertEqual(sorted(depreciation.compute_schedules(assets)), sorted(rows))
+        return rows
+
+    def test_linear_with_first_year_prorata(self):
+        rows = self._schedules([(1, 1200.0, date(2020, 7, 15), 'lineaire', 3)])
+        self.assertEqual(rows, [
+            (1, 2020, 200.0, 1000.0),
+            (1, 2021, 400.0, 600.0),
+            (1, 2022, 400.0, 200.0),
+            (1, 2023, 200.0, 0.0),
+        ])
+
+    def test_degressive_switches_to_linear(self):
+        rows = self._schedules([(1, 10000.0, date(2020, 1, 10), 'degressif', 5)])
+        self.assertEqual([row[1] for row in rows], [2020, 2021, 2022, 2023, 2024])
+        self.assertEqual(rows[0][2], 3500.0)  # taux 1,75 / 5
+        self.assertEqual(rows[1][2], 2275.0)
+        # Les deux derniers exercices passent en linéaire sur la durée restante.
+        self.assertAlmostEqual(rows[3][2], rows[4][2], delta=0.011)
+        self.assertAlmostEqual(sum(row[2] for row in rows), 10000.0, places=2)
+        self.assertEqual(rows[-1][3], 0.0)
+
+    def test_assets_without_policy_are_skipped(self):
+        rows = self._schedules([
+            (1, 500.0, date(2021, 1, 1), 'none', 3),
+            (2, 0.0, date(2021, 1, 1), 'lineaire', 3),
+            (3, 500.0, None, 'lineaire', 3),
+            (4, 500.0, date(2021, 1, 1), 'lineaire', 0),
+        ])
+        self.assertEqual(rows, [])
+
+    def test_one_year_asset_keeps_the_prorata(self):
+        rows = self._schedules([(1, 1000.0, date(2024, 7, 1), 'lineaire', 1)])
+        self.assertEqual(rows, [(1, 2024, 500.0, 500.0), (1, 2025, 500.0, 0.0)])
+
+    def test_restart_from_last_posted_year(self):
+        # Linéaire 5 ans, deux exercices comptabilisés (2 x 200), puis 10 ans :
+        # les 600 restants sont répartis sur les 8 années restantes.
+        rows = self._schedules([(1, 1000.0, date(2020, 1, 1), 'lineaire', 10, 2021, 600.0)])
+        self.assertEqual(rows[0], (1, 2022, 75.0, 525.0))
+        self.assertEqual([row[1] for row in rows], list(range(2022, 2030)))
+        self.assertAlmostEqual(400.0 + sum(row[2] for row in rows), 1000.0, places=2)
+        self.assertEqual(rows[-1][3], 0.0)
+
+    def test_numpy_matches_python(self):
+        rng = random.Random(42)
+        assets = []
+        for asset_id in range(2000):
+            day = date(rng.randint(2000, 2024), rng.randint(1, 12), rng.randint(1, 28))
+            years = rng.randint(1, 20)
+            asset = [asset_id, rng.randint(1, 10_000_000) / 100, day,
+                     rng.choice(('lineaire', 'degressif')), years]
+            if rng.random() < 0.3:
+                posted_year = day.year + rng.randint(0, years)
+                asset += [posted_year, round(asset[1] * rng.random(), 2)]
+            assets.append(tuple(asset))
+
+        vectorized = sorted(depreciation.compute_schedules(assets))
+        self.assertEqual(vectorized, sorted(_python_schedules(assets)))
+        self.assertGreater(len(vectorized), 10000)
+
+
+def _amortissement():
+    model = amortissement.PatrimoineAmortissement()
+    model.env = MagicMock()
+    model.flush_model = MagicMock()
+    model.invalidate_model = MagicMock()
+    return model
+
+
+class RecomputeTest(unittest.TestCase):
+    def _recompute(self, asset_rows):
+        model = _amortissement()
+        model.env.cr.fetchall.return_value = asset_rows
+        model._recompute(MagicMock(ids=[7]))
+        delete, select = [call.args[0] for call in model.env.cr.execute.call_args_list]
+        copy_sql, buffer = model.env.cr.copy_expert.call_args.args
+        rows = [line.split('\t') for line in buffer.getvalue().splitlines()]
+        return delete, select, copy_sql, rows
+
+    def test_rows_are_written_with_copy(self):
+        delete, select, copy_sql, rows = self._recompute(
+            [(7, 1200.0, date(2020, 7, 15), 'lineaire', 3, None, None)]
+        )
+        self.assertIn('move_id IS NULL', delete.code)
+        self.assertEqual(delete.params[0].params, [[7]])
+        self.assertIn('depreciation_method IN', select.code)
+        self.assertIn('COPY patrimoine_amortissement', copy_sql)
+        self.assertEqual(rows[0], ['7', '2020', '200.0', '1000.0'])
+
+    def test_policy_change_after_posting_restarts_from_posted_value(self):
+        # Linéaire 5 ans, 2020 et 2021 comptabilisés (valeur nette 600), puis
+        # la durée passe à 10 ans.
+        delete, select, _copy_sql, rows = self._recompute(
+            [(7, 1000.0, date(2020, 1, 1), 'lineaire', 10, 2021, 600.0)]
+        )
+        self.assertIn('MAX(posted.year)', delete.code)
+        self.assertIn('move_id IS NOT NULL', select.code)
+        self.assertEqual(rows[0][1], '2022')
+        self.assertAlmostEqual(400.0 + sum(float(row[2]) for row in rows), 1000.0, places=2)
+        self.assertEqual(rows[-1][3], '0.0')
+
+    def test_empty_recordset_does_nothing(self):
+        model = amortissement.PatrimoineAmortissement()
+        model.env = MagicMock()
+        model._recompute(MagicMock(__bool__=lambda self: False))
+        model.env.cr.execute.assert_not_called()
+
+
+class _Moves(list):
+    action_post = MagicMock()
+
+
+class GenerateMovesTest(unittest.TestCase):
+    def _model(self, rows, lock_dates=None):
+        lock_dates = lock_dates or {}
+        model = _amortissement()
+        model.env.cr.fetchall.return_value = rows
+        departments = MagicMock()
+        departments.browse.side_effect = lambda ids: [
+            MagicMock(id=department_id, display_name=f"Dép. {department_id}") for department_id in ids
+        ]
+        moves = MagicMock()
+        moves.create.side_effect = lambda vals_list: _Moves(
+            MagicMock(id=100 + index) for index in range(len(vals_list))
+        )
+        journals = MagicMock()
+        journals.browse.side_effect = lambda ids: [
+            MagicMock(id=journal_id, **{
+                'company_id._get_user_fiscal_lock_date.return_value': lock_dates.get(journal_id)
+            })
+            for journal_id in ids
+        ]
+        model.env.__getitem__.side_effect = {
+            'hr.department': departments, 'account.move': moves, 'account.journal': journals,
+        }.__getitem__
+        return model, moves
+
+    def test_one_balanced_move_per_journal_and_department(self):
+        # (ligne, dotation, code, nom, département, journal, dotation, amortissement)
+        rows = [
+            (1, 100.0, 'PC-1', 'PC', 3, 9, 681, 2818),
+            (2, 50.0, 'PC-2', 'PC', 3, 9, 681, 2818),
+            (3, 30.0, 'CH-1', 'Chaise', False, 9, 681, 2814),
+        ]
+        model, moves = self._model(rows)
+
+        with patch.object(amortissement, 'MOVE_BATCH_SIZE', 1):
+            model._generate_moves(2024)
+
+        self.assertEqual(moves.create.call_count, 2)
+        first = moves.create.call_args_list[0].args[0][0]
+        self.assertEqual(first['ref'], "Amortissements 2024 - Dép. 3")
+        self.assertEqual(first['date'], date(2024, 12, 31))
+        lines = [line[2] for line in first['line_ids']]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(sum(line['debit'] for line in lines), sum(line['credit'] for line in lines))
+        second = moves.create.call_args_list[1].args[0][0]
+        self.assertEqual(second['ref'], "Amortissements 2024 - Non affecté")
+        update = model.env.cr.execute.call_args_list[1].args[0]
+        self.assertIn('UPDATE patrimoine_amortissement', update.code)
+        self.assertEqual(update.params, [[1, 2], [100, 100]])
+
+    def test_large_departments_are_split(self):
+        rows = [(index, 1.0, f'B-{index}', 'Bien', 3, 9, 681, 2818) for index in range(5)]
+        model, moves = self._model(rows)
+
+        with patch.object(amortissement, 'MAX_LINES_PER_MOVE', 2):
+            model._generate_moves(2024)
+
+        vals_list = moves.create.call_args.args[0]
+        self.assertEqual([len(vals['line_ids']) for vals in vals_list], [3, 3, 2])
+
+    def test_locked_fiscal_years_are_skipped(self):
+        rows = [
+            (1, 100.0, 'PC-1', 'PC', 3, 9, 681, 2818),
+            (2, 50.0, 'PC-2', 'PC', 3, 8, 681, 2818),
+        ]
+        model, moves = self._model(rows, lock_dates={9: date(2024, 12, 31)})
+
+        model._generate_moves(2024)
+
+        vals_list = moves.create.call_args.args[0]
+        self.assertEqual([vals['journal_id'] for vals in vals_list], [8])
+
+    def test_failing_batch_is_logged_and_others_continue(self):
+        rows = [
+            (1, 100.0, 'PC-1', 'PC', 3, 9, 681, 2818),
+            (2, 50.0, 'CH-1', 'Chaise', 4, 9, 681, 2814),
+        ]
+        model, moves = self._model(rows)
+        created = moves.create.side_effect
+        moves.create.side_effect = [Exception("Période verrouillée"), created([{}])]
+
+        with patch.object(amortissement, 'MOVE_BATCH_SIZE', 1), \
+                self.assertLogs(amortissement._logger, 'ERROR'):
+            model._generate_moves(2024, auto_commit=True)
+
+        self.assertEqual(moves.create.call_count, 2)
+        self.assertEqual(model.env.cr.commit.call_count, 2)
+        update = model.env.cr.execute.call_args_list[-1].args[0]
+        self.assertEqual(update.params, [[2], [100]])
+
+
+class CronTest(unittest.TestCase):
+    def _model(self, first_year):
+        model = _amortissement()
+        amortissement.fields.Date.context_today.return_value = date(2025, 3, 1)
+        model.env['ir.config_parameter'].sudo.return_value.get_param.return_value = first_year
+        model.env.cr.fetchall.return_value = [(2023,), (2024,)]
+        model._generate_moves = MagicMock(side_effect=[Exception("Exercice verrouillé"), None])
+        return model
+
+    def test_only_years_from_the_first_posting_year(self):
+        model = self._model(False)
+        with self.assertLogs(amortissement._logger, 'ERROR'):
+            model._cron_post_depreciation()
+        self.assertEqual(model.env.cr.execute.call_args.args[1], [2024, 2025])
+        # L'échec de 2023 n'empêche pas 2024.
+        self.assertEqual(model._generate_moves.call_count, 2)
+        model.env.cr.rollback.assert_called_once()
+
+    def test_configured_first_posting_year(self):
+        model = self._model('2019')
+        with self.assertLogs(amortissement._logger, 'ERROR'):
+            model._cron_post_depreciation()
+        self.assertEqual(model.env.cr.execute.call_args.args[1], [2019, 2025])
+
+
+if __name__ == '__main__':
+    unittest.main()
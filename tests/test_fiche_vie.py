@@ -0,0 +1,265 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import types
+import importlib.util
+
+odoo = types.ModuleType("odoo")
+odoo.models = types.SimpleNamespace(Model=object)
+odoo.fields = MagicMock()
+odoo.api = types.SimpleNamespace(
+    model=lambda f: f, model_create_multi=lambda f: f, constrains=lambda *a: (lambda f: f)
+)
+odoo_exceptions = types.ModuleType("odoo.exceptions")
+odoo_exceptions.ValidationError = type("ValidationError", (Exception,), {})
+
+
+models_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
+models_pkg = types.ModuleType('patrimoine_models')
+models_pkg.__path__ = [models_dir]
+
+
+def _load(name):
+    path = os.path.join(models_dir, f'{name}.py')
+    spec = importlib.util.spec_from_file_location(f'patrimoine_models.{name}', path)
+    module = importlib.util.module_from_spec(spec)
+    with patch.dict(sys.modules, {
+        "odoo": odoo, "odoo.exceptions": odoo_exceptions, "patrimoine_models": models_pkg,
+    }):
+        spec.loader.exec_module(module)
+    return module
+
+
+fiche_vie = _load('fiche_vie')
+mouvement = _load('mouvement')
+
+
+class RecordEventsTest(unittest.TestCase):
+    def test_events_are_created_in_one_call(self):
+        model = fiche_vie.PatrimoineFicheVie()
+        model.env = MagicMock(uid=3)
+        model.create = MagicMock()
+
+        model.record_events([
+            {'asset_id': 1, 'action': 'creation'},
+            {'asset_id': 2, 'action': 'creation', 'utilisateur_id': 9},
+        ])
+
+        model.create.assert_called_once_with([
+            {'utilisateur_id': 3, 'asset_id': 1, 'action': 'creation'},
+            {'utilisateur_id': 9, 'asset_id': 2, 'action': 'creation'},
+        ])
+
+    def test_empty_batch_skips_insert(self):
+        model = fiche_vie.PatrimoineFicheVie()
+        model.create = MagicMock()
+        model.browse = MagicMock(return_value='empty')
+
+        self.assertEqual(model.record_events([]), 'empty')
+        model.create.assert_not_called()
+
+
+class _Mouvements(mouvement.PatrimoineMouvement):
+    """Recordset minimal : itération, ``filtered``, ``asset_id.ids`` et ``write``."""
+
+    _fields = {'type_mouvement': types.SimpleNamespace(
+        selection=[('transfert', 'Transfert'), ('sortie', 'Sortie définitive')]
+    )}
+
+    def __init__(self, records, env, write=None):
+        self.records = records
+        self.env = env
+        self.write = write or MagicMock()
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __bool__(self):
+        return bool(self.records)
+
+    def filtered(self, func):
+        return _Mouvements([record for record in self.records if func(record)], self.env, self.write)
+
+    @property
+    def asset_id(self):
+        return types.SimpleNamespace(ids=[record.asset_id.id for record in self.records])
+
+
+class _Mouvement(mouvement.PatrimoineMouvement):
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+    def ensure_one(self):
+        pass
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+def _mouvement(mouvement_id, asset_id, state='draft', type_mouvement='transfert',
+               conserver_etat=False):
+    return _Mouvement(
+        id=mouvement_id,
+        state=state,
+        type_mouvement=type_mouvement,
+        conserver_etat=conserver_etat,
+        motif=None,
+        asset_id=types.SimpleNamespace(id=asset_id),
+        to_department_id=types.SimpleNamespace(id=4),
+        to_employee_id=types.SimpleNamespace(id=5),
+        to_location_id=types.SimpleNamespace(id=6),
+    )
+
+
+def _env():
+    assets_model = MagicMock()
+    assets_model.with_context.return_value = assets_model
+    models = {'patrimoine.fiche.vie': MagicMock(), 'patrimoine.asset': assets_model}
+    env = MagicMock()
+    env.__getitem__.side_effect = models.__getitem__
+    return env
+
+
+class ActionValiderTest(unittest.TestCase):
+    def test_history_is_flushed_once(self):
+        env = _env()
+        fiche_model = env['patrimoine.fiche.vie']
+        records = [_mouvement(1, 10), _mouvement(2, 20), _mouvement(3, 30, state='valide')]
+
+        _Mouvements(records, env).action_valider()
+
+        fiche_model.record_events.assert_called_once()
+        events = fiche_model.record_events.call_args.args[0]
+        self.assertEqual([e['mouvement_id'] for e in events], [1, 2])
+        self.assertEqual(
+            events[0]['description'], "Mouvement de type 'Transfert' validé. Motif: N/A"
+        )
+        fiche_model.create.assert_not_called()
+
+    def test_asset_updates_are_grouped_by_target(self):
+        env = _env()
+        assets_model = env['patrimoine.asset']
+        records = [
+            _mouvement(1, 10), _mouvement(2, 20),
+            _mouvement(3, 30, type_mouvement='sortie'),
+            # Deux mouvements du même bien : le dernier l'emporte.
+            _mouvement(4, 40), _mouvement(5, 40, type_mouvement='sortie'),
+        ]
+
+        mouvements = _Mouvements(records, env)
+        mouvements.action_valider()
+
+        browsed = [call.args[0] for call in assets_model.browse.call_args_list]
+        self.assertEqual(browsed, [[10, 20], [30, 40]])
+        assets_model.browse.return_value.write.assert_any_call(
+            {'department_id': 4, 'employee_id': 5, 'location_id': 6, 'etat': 'service'}
+        )
+        self.assertEqual(assets_model.browse.return_value.write.call_count, 2)
+        mouvements.write.assert_called_once_with({'state': 'valide'})
+
+    def test_assets_are_locked_once_in_id_order(self):
+        env = _env()
+        records = [_mouvement(1, 30), _mouvement(2, 10), _mouvement(3, 30)]
+
+        _Mouvements(records, env).action_valider()
+
+        env.cr.execute.assert_called_once()
+        sql, params = env.cr.execute.call_args.args
+        self.assertIn("ORDER BY id FOR UPDATE", sql)
+        self.assertEqual(params, [(10, 30)])
+
+    def test_nothing_to_validate(self):
+        env = _env()
+        _Mouvements([_mouvement(1, 10, state='valide')], env).action_valider()
+        env.cr.execute.assert_not_called()
+        env['patrimoine.fiche.vie'].record_events.assert_not_called()
+
+
+class _Created(list):
+    def __or__(self, other):
+        return _Created(self + other)
+
+
+class _Reorganisation(mouvement.PatrimoineMouvement):
+    def __init__(self, assets):
+        self.env = MagicMock()
+        self.env.__getitem__.return_value.search.return_value = assets
+        self.batches = []
+
+    def browse(self, ids=()):
+        return _Created()
+
+    def _create_and_validate(self, vals_list):
+        self.batches.append(vals_list)
+        return _Created(vals_list)
+
+
+def _asset(asset_id, employee_id, location_id, etat='service'):
+    return types.SimpleNamespace(
+        id=asset_id,
+        etat=etat,
+        employee_id=types.SimpleNamespace(id=employee_id),
+        location_id=types.SimpleNamespace(id=location_id),
+    )
+
+
+class ReorganisationTest(unittest.TestCase):
+    def test_department_merge_keeps_employee_and_location(self):
+        model = _Reorganisation([_asset(1, 5, 7), _asset(2, False, 8)])
+        department = types.SimpleNamespace(id=3, name='DSI')
+        target = types.SimpleNamespace(id=4, name='DAF')
+
+        created = model.reassign_department(department, to_department=target)
+
+        model.env.__getitem__.return_value.search.assert_called_once_with(
+            [('department_id', '=', 3)]
+        )
+        self.assertEqual(len(created), 2)
+        self.assertEqual(model.batches[0][1], {
+            'asset_id': 2, 'type_mouvement': 'transfert', 'from_employee_id': False,
+            'to_department_id': 4, 'to_employee_id': False, 'to_location_id': 8,
+            'motif': 'Réorganisation : DSI vers DAF', 'conserver_etat': True,
+        })
+
+    def test_department_merge_keeps_asset_state(self):
+        model = _Reorganisation([_asset(1, False, 7, etat='hs'), _asset(2, False, 7, etat='reforme')])
+        env = _env()
+
+        def create_and_validate(vals_list):
+            records = [
+                _mouvement(index, vals['asset_id'], conserver_etat=vals['conserver_etat'])
+                for index, vals in enumerate(vals_list, 1)
+            ]
+            _Mouvements(records, env).action_valider()
+            return _Created(records)
+
+        model._create_and_validate = create_and_validate
+        model.reassign_department(
+            types.SimpleNamespace(id=3, name='DSI'), to_department=types.SimpleNamespace(id=4, name='DAF')
+        )
+
+        assets_model = env['patrimoine.asset']
+        assets_model.browse.assert_called_once_with([1, 2])
+        written = assets_model.browse.return_value.write.call_args.args[0]
+        self.assertNotIn('etat', written)
+        self.assertEqual(written['department_id'], 4)
+
+    def test_offboarding_returns_assets_to_stock_in_slices(self):
+        assets = [_asset(index, 5, 7) for index in range(3)]
+        model = _Reorganisation(assets)
+        model.bulk_move = MagicMock(side_effect=lambda batch, *a, **k: _Created(batch))
+        employee = types.SimpleNamespace(id=5, name='Awa')
+
+        with patch.object(mouvement, 'MAX_BULK_MOUVEMENTS', 2):
+            created = model.offboard_employee(employee, to_location_id=9)
+
+        self.assertEqual(len(created), 3)
+        self.assertEqual(model.bulk_move.call_count, 2)
+        model.bulk_move.assert_called_with(
+            assets[2:], 'retour_stock', to_location_id=9, motif='Départ de Awa'
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import types
+import importlib.util
+
+odoo = types.ModuleType("odoo")
+odoo.models = types.SimpleNamespace(Model=object)
+odoo.api = types.SimpleNamespace(model=lambda f: f)
+
+sequence_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'ir_sequence.py')
+spec = importlib.util.spec_from_file_location('ir_sequence_under_test', sequence_path)
+ir_sequence = importlib.util.module_from_spec(spec)
+with patch.dict(sys.modules, {"odoo": odoo, "odoo.models": odoo.models, "odoo.api": odoo.api}):
+    spec.loader.exec_module(ir_sequence)
+
+
+def _sequence(**values):
+    sequence = ir_sequence.IrSequence()
+    sequence.ensure_one = MagicMock()
+    sequence.invalidate_recordset = MagicMock()
+    sequence._cr = MagicMock()
+    sequence.id = 7
+    sequence.number_increment = 1
+    for name, value in values.items():
+        setattr(sequence, name, value)
+    return sequence
+
+
+class IrSequenceBatchTest(unittest.TestCase):
+    def test_standard_sequence_reserves_in_one_query(self):
+        sequence = _sequence(implementation='standard')
+        sequence._cr.fetchall.return_value = [(12,), (13,), (14,)]
+
+        numbers = sequence._reserve_numbers(3)
+
+        self.assertEqual(numbers, [12, 13, 14])
+        sequence._cr.execute.assert_called_once_with(
+            "SELECT nextval(%s) FROM generate_series(1, %s)", ("ir_sequence_007", 3)
+        )
+
+    def test_no_gap_sequence_is_bumped_once(self):
+        sequence = _sequence(implementation='no_gap', number_increment=2)
+        sequence._cr.fetchone.return_value = (41,)
+
+        numbers = sequence._reserve_numbers(3)
+
+        self.assertEqual(numbers, [41, 43, 45])
+        self.assertEqual(sequence._cr.execute.call_count, 2)
+        update_sql, update_params = sequence._cr.execute.call_args.args
+        self.assertIn("number_next = number_next + %s", update_sql)
+        self.assertEqual(update_params, (6, 7))
+
+    def test_next_by_code_batch_formats_reserved_numbers(self):
+        found = MagicMock(use_date_range=False)
+        found.sudo.return_value = found
+        found._reserve_numbers.return_value = [5, 6]
+        found.get_next_char.side_effect = lambda number: f"{number:04d}"
+        sequence = _sequence()
+        sequence.check_access_rights = MagicMock()
+        sequence.env = MagicMock()
+        sequence.search = MagicMock(return_value=found)
+
+        codes = sequence.next_by_code_batch('patrimoine.asset.initial_code', 2)
+
+        self.assertEqual(codes, ['0005', '0006'])
+        found._reserve_numbers.assert_called_once_with(2)
+
+    def test_next_by_code_batch_without_sequence(self):
+        sequence = _sequence()
+        sequence.check_access_rights = MagicMock()
+        sequence.env = MagicMock()
+        sequence.search = MagicMock(return_value=[])
+        sequence.next_by_code = MagicMock(return_value=False)
+
+        self.assertEqual(sequence.next_by_code_batch('inconnu', 2), [False, False])
+        self.assertEqual(sequence.next_by_code_batch('inconnu', 0), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import types
+import importlib.util
+
+odoo = types.ModuleType("odoo")
+
+
+class _ValidationError(Exception):
+    pass
+
+
+odoo.exceptions = types.SimpleNamespace(ValidationError=_ValidationError)
+ValidationError = _ValidationError
+
+pagination_path = os.path.join(os.path.dirname(__file__), '..', 'controllers', 'pagination.py')
+spec = importlib.util.spec_from_file_location('pagination_under_test', pagination_path)
+pagination = importlib.util.module_from_spec(spec)
+# Stubs limités au chargement du module pour ne pas masquer ceux des autres tests.
+with patch.dict(sys.modules, {"odoo": odoo, "odoo.exceptions": odoo.exceptions}):
+    spec.loader.exec_module(pagination)
+
+
+class PaginationTest(unittest.TestCase):
+    def test_cursor_roundtrip(self):
+        token = pagination.encode_cursor('date_acquisition', ['2024-01-31', 42])
+        self.assertNotIn('=', token)
+        self.assertEqual(
+            pagination.decode_cursor(token), ('date_acquisition', ['2024-01-31', 42])
+        )
+
+    def test_decode_rejects_garbage_and_unknown_order(self):
+        with self.assertRaises(ValidationError):
+            pagination.decode_cursor('%%%')
+        with self.assertRaises(ValidationError):
+            pagination.decode_cursor(pagination.encode_cursor('name', ['x']))
+
+    def test_parse_limit_is_capped(self):
+        self.assertEqual(pagination.parse_limit(None), pagination.DEFAULT_LIMIT)
+        self.assertEqual(pagination.parse_limit('10000'), pagination.MAX_LIMIT)
+        with self.assertRaises(ValidationError):
+            pagination.parse_limit('0')
+
+    def test_keyset_domain_handles_null_leading_column(self):
+        self.assertEqual(
+            pagination.keyset_domain(('date_acquisition', 'id'), ['2024-01-31', 7]),
+            ['|', '|',
+             ('date_acquisition', '>', '2024-01-31'),
+             ('date_acquisition', '=', False),
+             '&', ('date_acquisition', '=', '2024-01-31'),
+             ('id', '>', 7)],
+        )
+        self.assertEqual(
+            pagination.keyset_domain(('date_acquisition', 'id'), [None, 7]),
+            ['&', ('date_acquisition', '=', False), ('id', '>', 7)],
+        )
+
+    def test_paginate_applies_cursor_and_detects_last_page(self):
+        model = MagicMock()
+        model.search.return_value = [{'id': 8}, {'id': 9}]
+        cursor = pagination.encode_cursor('id', [7])
+
+        records, next_cursor = pagination.paginate(
+            model, [('etat', '=', 'stock')], {'limit': '2', 'cursor': cursor}
+        )
+
+        model.search.assert_called_with(
+            [('etat', '=', 'stock'), ('id', '>', 7)], order='id asc', limit=3
+        )
+        self.assertEqual(records, [{'id': 8}, {'id': 9}])
+        self.assertIsNone(next_cursor)
+
+    def test_search_page_without_pagination_returns_everything(self):
+        model = MagicMock()
+        records, next_cursor = pagination.search_page(model, [], {})
+        model.search.assert_called_with([])
+        self.assertIsNone(next_cursor)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -97,6 +97,7 @@ common_module.handle_api_errors = handle_api_errors
 common_module.CORS_HEADERS = {}
 common_module.ALLOWED_ORIGIN = "http://testserver"
 common_module.json_response = lambda data, status=200: data
+common_module.json_dumps = lambda data: json.dumps(data, default=str)
 def _common_response_side_effect(*args, **kwargs):
     resp = MagicMock()
     headers = {"Content-Type": "application/json"}
@@ -110,6 +111,12 @@ controllers_pkg.common = common_module
 sys.modules.setdefault('controllers', controllers_pkg)
 sys.modules.setdefault('controllers.common', common_module)
 
+serializers_path = os.path.join(os.path.dirname(__file__), '..', 'controllers', 'serializers.py')
+spec_serializers = importlib.util.spec_from_file_location('controllers.serializers', serializers_path)
+serializers_module = importlib.util.module_from_spec(spec_serializers)
+spec_serializers.loader.exec_module(serializers_module)
+sys.modules.setdefault('controllers.serializers', serializers_module)
+
 post_path = os.path.join(os.path.dirname(__file__), '..', 'controllers', 'post_controller.py')
 spec = importlib.util.spec_from_file_location('controllers.post_controller', post_path)
 post_controller = importlib.util.module_from_spec(spec)
@@ -0,0 +1,247 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import datetime
+import os
+import sys
+import types
+import importlib.util
+
+odoo = types.ModuleType("odoo")
+
+
+class _ValidationError(Exception):
+    pass
+
+
+odoo.exceptions = types.SimpleNamespace(ValidationError=_ValidationError)
+ValidationError = _ValidationError
+
+serializers_path = os.path.join(os.path.dirname(__file__), '..', 'controllers', 'serializers.py')
+spec = importlib.util.spec_from_file_location('serializers_under_test', serializers_path)
+serializers = importlib.util.module_from_spec(spec)
+# Stubs limités au chargement du module pour ne pas masquer ceux des autres tests.
+with patch.dict(sys.modules, {"odoo": odoo, "odoo.exceptions": odoo.exceptions}):
+    spec.loader.exec_module(serializers)
+
+
+class FakeRecords(list):
+    def __init__(self, rows):
+        super().__init__(rows)
+        self.read_calls = []
+
+    @property
+    def ids(self):
+        return [row['id'] for row in self]
+
+    def read(self, fields, load=None):
+        self.read_calls.append((tuple(fields), load))
+        return [{'id': row['id'], **{f: row.get(f, False) for f in fields}} for row in self]
+
+
+def _env(names_by_model):
+    """Environnement factice ; les valeurs sont un nom ou un dict d'attributs."""
+    env = MagicMock()
+    models = {}
+
+    def _row(values, record_id):
+        value = values[record_id]
+        return {'id': record_id, **(value if isinstance(value, dict) else {'name': value})}
+
+    def getitem(model):
+        if model not in models:
+            comodel = MagicMock()
+            values = names_by_model.get(model, {})
+            comodel.browse.side_effect = lambda ids: MagicMock(
+                read=MagicMock(return_value=[_row(values, i) for i in ids])
+            )
+            comodel.sudo.return_value.browse.side_effect = comodel.browse.side_effect
+            models[model] = comodel
+        return models[model]
+
+    env.__getitem__.side_effect = getitem
+    return env, models
+
+
+class AssetSerializerTest(unittest.TestCase):
+    def test_list_profile_batches_relation_reads(self):
+        records = FakeRecords([
+            {'id': 1, 'name': 'PC', 'code': 'C1', 'type': 'informatique', 'etat': 'service',
+             'date_acquisition': datetime.date(2023, 5, 2), 'valeur_acquisition': 10.0,
+             'location_id': 4, 'employee_id': 7, 'department_id': 3,
+             'category_id': 2, 'subcategory_id': 5, 'custom_values': {'1': 'x'},
+             'has_image': False},
+            {'id': 2, 'name': 'PC2', 'code': 'C2', 'type': 'informatique', 'etat': 'stock',
+             'date_acquisition': False, 'valeur_acquisition': 0.0,
+             'location_id': 4, 'employee_id': False, 'department_id': False,
+             'category_id': 2, 'subcategory_id': 5, 'custom_values': False,
+             'has_image': True, 'image_checksum': 'a94a8fe5ccb19ba61c4c0873d391e987982fbbd3'},
+        ])
+        env, models = _env({
+            'stock.location': {4: 'Bureau 1'},
+            'hr.employee': {7: 'Awa'},
+            'hr.department': {3: 'DSI'},
+            'asset.category': {2: 'Informatique'},
+            'asset.subcategory': {5: 'Ordinateurs'},
+        })
+
+        data = serializers.AssetSerializer(env, 'list').serialize(records)
+
+        self.assertEqual(len(records.read_calls), 1)
+        self.assertEqual(records.read_calls[0][1], None)
+        self.assertNotIn('image', records.read_calls[0][0])
+        for model in ('stock.location', 'hr.employee', 'hr.department',
+                      'asset.category', 'asset.subcategory'):
+            self.assertEqual(models[model].browse.call_count, 1)
+        self.assertNotIn('res.partner', models)
+        self.assertNotIn('ir.attachment', models)
+        self.assertIn('has_image', records.read_calls[0][0])
+        self.assertEqual(data[0]['location'], 'Bureau 1')
+        self.assertEqual(data[0]['assignedTo'], 'Awa')
+        self.assertEqual(data[0]['category_general_name'], 'Informatique')
+        self.assertEqual(data[0]['category_detailed_name'], 'Ordinateurs')
+        self.assertEqual(data[0]['acquisitionDate'], '2023-05-02')
+        self.assertIsNone(data[0]['image'])
+        self.assertEqual(
+            data[1]['image'], '/web/image/patrimoine.asset/2/image_256?unique=a94a8fe5ccb1'
+        )
+        self.assertIsNone(data[1]['assignedTo'])
+        self.assertEqual(data[1]['customValues'], {})
+        self.assertEqual(data[1]['details'], {})
+
+    def test_detail_profile_uses_original_image(self):
+        records = FakeRecords([{'id': 3, 'has_image': True, 'image_checksum': 'abc'}])
+        env, _ = _env({})
+        data = serializers.AssetDetailSerializer(env, 'detail', fields='image').serialize(records)
+        self.assertEqual(data, [{'id': 3, 'image': '/web/image/patrimoine.asset/3/image?unique=abc'}])
+
+    def test_versioned_url_without_checksum(self):
+        self.assertEqual(
+            serializers.versioned_image_url('asset.category', 4, False, 'image_128'),
+            '/web/image/asset.category/4/image_128',
+        )
+
+    def test_empty_recordset(self):
+        env, _ = _env({})
+        self.assertEqual(serializers.AssetSerializer(env, 'list').serialize(FakeRecords([])), [])
+
+    def test_sparse_fields_only_read_needed_columns(self):
+        records = FakeRecords([{'id': 1, 'name': 'PC', 'code': 'C1', 'location_id': 4}])
+        env, models = _env({'stock.location': {4: 'Bureau 1'}})
+
+        data = serializers.AssetSerializer(env, 'list', fields='code, name,location').serialize(records)
+
+        self.assertEqual(data, [{'id': 1, 'name': 'PC', 'code': 'C1', 'location': 'Bureau 1'}])
+        self.assertEqual(sorted(records.read_calls[0][0]), ['code', 'location_id', 'name'])
+        self.assertEqual(list(models), ['stock.location'])
+
+    def test_sparse_fields_id_only_skips_read(self):
+        records = FakeRecords([{'id': 1}, {'id': 2}])
+        env, models = _env({})
+        data = serializers.AssetSerializer(env, 'list', fields='id').serialize(records)
+        self.assertEqual(data, [{'id': 1}, {'id': 2}])
+        self.assertEqual(records.read_calls, [])
+        self.assertEqual(models, {})
+
+    def test_unknown_field_is_rejected(self):
+        env, _ = _env({})
+        with self.assertRaises(ValidationError):
+            serializers.AssetSerializer(env, 'list', fields='name,password')
+
+    def test_empty_custom_values_are_not_shared_between_rows(self):
+        records = FakeRecords([{'id': 1}, {'id': 2}])
+        env, _ = _env({})
+
+        data = serializers.AssetSerializer(env, 'list', fields='customValues').serialize(records)
+
+        self.assertEqual([row['customValues'] for row in data], [{}, {}])
+        data[0]['customValues']['ram'] = '8'
+        self.assertEqual(data[1]['customValues'], {})
+
+    def test_undeclared_prefetch_is_rejected(self):
+        class _Serializer(serializers.RecordSerializer):
+            _fields = {'id': serializers.column('id'), 'extra': serializers.prefetched('extra')}
+            profiles = {'list': ('id', 'extra')}
+
+        env, _ = _env({})
+        with self.assertRaises(ValidationError):
+            _Serializer(env, 'list').serialize(FakeRecords([{'id': 1}]))
+
+
+class WorkflowSerializerTest(unittest.TestCase):
+    def test_perte_reads_asset_name_and_code_together(self):
+        records = FakeRecords([
+            {'id': 9, 'name': 'PERTE/1', 'asset_id': 1, 'declarer_par_id': 2,
+             'date_perte': datetime.date(2024, 2, 1), 'state': 'to_approve'},
+        ])
+        env, models = _env({
+            'patrimoine.asset': {1: {'name': 'PC', 'code': 'C1'}},
+            'res.users': {2: 'Awa'},
+        })
+        models_attachment = env['ir.attachment']
+        models_attachment.search_read.return_value = [
+            {'id': 31, 'res_id': 9, 'name': 'pv.pdf'},
+            {'id': 30, 'res_id': 9, 'name': 'ancien.pdf'},
+        ]
+
+        data = serializers.PerteSerializer(env, 'list').serialize(records)
+
+        self.assertEqual(models['patrimoine.asset'].browse.call_count, 1)
+        self.assertEqual(data[0]['asset_name'], 'PC')
+        self.assertEqual(data[0]['asset_code'], 'C1')
+        self.assertEqual(data[0]['date_perte'], '2024-02-01 00:00:00')
+        self.assertEqual(data[0]['document_url'], '/web/content/31/pv.pdf')
+
+        manager = serializers.PerteManagerSerializer(
+            env, 'manager', fields='date_perte', sudo_relations=('asset_id',)
+        ).serialize(records)
+        self.assertEqual(manager, [{'id': 9, 'date_perte': '2024-02-01'}])
+
+    def test_demande_groups_lignes_and_departments(self):
+        records = FakeRecords([
+            {'id': 1, 'name': 'DEM/1', 'demandeur_id': 5, 'state': 'pending',
+             'date_demande': False, 'date_traitement': False, 'motif_demande': 'x'},
+            {'id': 2, 'name': 'DEM/2', 'demandeur_id': 6, 'state': 'pending',
+             'date_demande': False, 'date_traitement': False, 'motif_demande': 'y'},
+        ])
+        env, models = _env({
+            'res.users': {5: 'Awa', 6: 'Moussa'},
+            'asset.subcategory': {3: 'Ordinateurs'},
+            'hr.department': {4: 'DSI'},
+        })
+        env['hr.employee'].search_read.return_value = [
+            {'user_id': 5, 'department_id': 4},
+        ]
+        env['patrimoine.demande.materiel.ligne'].search.return_value = FakeRecords([
+            {'id': 11, 'demande_id': 1, 'demande_subcategory_id': 3, 'quantite': 2},
+        ])
+
+        data = serializers.DemandeSerializer(env, 'list').serialize(records)
+
+        self.assertEqual(data[0]['departement_demandeur'], 'DSI')
+        self.assertEqual(data[1]['departement_demandeur'], 'N/A')
+        self.assertEqual(len(data[0]['lignes']), 1)
+        self.assertEqual(data[0]['lignes'][0]['demande_subcategory_name'], 'Ordinateurs')
+        self.assertNotIn('demande_id', data[0]['lignes'][0])
+        self.assertEqual(data[1]['lignes'], [])
+
+    def test_demande_department_is_the_short_name_of_a_child_department(self):
+        records = FakeRecords([
+            {'id': 1, 'name': 'DEM/1', 'demandeur_id': 5, 'state': 'pending',
+             'date_demande': False, 'date_traitement': False, 'motif_demande': 'x'},
+        ])
+        env, models = _env({
+            'res.users': {5: 'Awa'},
+            'hr.department': {7: {'name': 'Support', 'complete_name': 'DSI / Support'}},
+        })
+        env['hr.employee'].search_read.return_value = [{'user_id': 5, 'department_id': 7}]
+        env['patrimoine.demande.materiel.ligne'].search.return_value = FakeRecords([])
+
+        data = serializers.DemandeSerializer(env, 'list').serialize(records)
+
+        self.assertEqual(data[0]['departement_demandeur'], 'Support')
+        self.assertEqual(env['hr.employee'].search_read.call_args.kwargs, {'load': None})
+        models['hr.department'].browse.assert_called_once_with([7])
+
+
+if __name__ == '__main__':
+    unittest.main()
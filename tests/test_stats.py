@@ -0,0 +1,193 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import types
+import importlib.util
+from datetime import date
+
+
+class _SQL:
+    def __init__(self, code, *args):
+        self.code, self.params = code, list(args)
+
+    def join(self, items):
+        return _SQL(self.code, *items)
+
+
+odoo = types.ModuleType("odoo")
+odoo.models = types.SimpleNamespace(Model=object)
+odoo.fields = MagicMock()
+odoo.api = types.SimpleNamespace(model=lambda f: f)
+odoo_tools = types.ModuleType("odoo.tools")
+odoo_tools.SQL = _SQL
+odoo_tools_sql = types.ModuleType("odoo.tools.sql")
+odoo_tools_sql.table_exists = MagicMock(return_value=True)
+
+
+class _relativedelta:
+    def __init__(self, months=0):
+        self.months = months
+
+    def __radd__(self, day):
+        index = day.year * 12 + day.month - 1 + self.months
+        return day.replace(year=index // 12, month=index % 12 + 1)
+
+    def __rsub__(self, day):
+        return day + _relativedelta(-self.months)
+
+
+dateutil = types.ModuleType("dateutil")
+dateutil_relativedelta = types.ModuleType("dateutil.relativedelta")
+dateutil_relativedelta.relativedelta = _relativedelta
+
+stats_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'stats.py')
+spec = importlib.util.spec_from_file_location('stats_under_test', stats_path)
+stats = importlib.util.module_from_spec(spec)
+with patch.dict(sys.modules, {
+    "odoo": odoo, "odoo.tools": odoo_tools, "odoo.tools.sql": odoo_tools_sql,
+    "dateutil": dateutil, "dateutil.relativedelta": dateutil_relativedelta,
+}):
+    spec.loader.exec_module(stats)
+
+
+class _Department:
+    """Base ORM minimale de ``hr.department`` : enregistre ``unlink``."""
+
+    def unlink(self):
+        self.unlinked = True
+        return True
+
+
+department_odoo = types.ModuleType("odoo")
+department_odoo.models = types.SimpleNamespace(Model=_Department)
+department_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'hr_department.py')
+spec = importlib.util.spec_from_file_location('hr_department_under_test', department_path)
+hr_department = importlib.util.module_from_spec(spec)
+with patch.dict(sys.modules, {"odoo": department_odoo}):
+    spec.loader.exec_module(hr_department)
+
+
+def _stats():
+    model = stats.PatrimoineStats()
+    model.env = MagicMock()
+    model.invalidate_model = MagicMock()
+    return model
+
+
+class ApplyChangesTest(unittest.TestCase):
+    def test_deltas_are_merged_into_one_upsert(self):
+        model = _stats()
+
+        model._apply_changes(
+            removed=[(1, 5, 'informatique', 'stock', 2, 800.0)],
+            added=[
+                (2, 5, 'informatique', 'service', 1, 400.0),
+                (1, 5, 'informatique', 'stock', 1, 400.0),
+            ],
+        )
+
+        model.env.cr.execute.assert_called_once()
+        sql = model.env.cr.execute.call_args.args[0]
+        self.assertIn('ON CONFLICT', sql.code)
+        self.assertIn('DELETE FROM patrimoine_stats WHERE asset_count = 0', sql.code)
+        rows = [value.params for value in sql.params[0].params]
+        self.assertEqual(rows, [
+            [1, 5, 'informatique', 'stock', -1, -400.0],
+            [2, 5, 'informatique', 'service', 1, 400.0],
+        ])
+        model.invalidate_model.assert_called_once()
+
+    def test_init_skips_reconcile_before_assets_table_exists(self):
+        model = _stats()
+        model._cron_reconcile = MagicMock()
+
+        with patch.object(stats, 'table_exists', return_value=False):
+            model.init()
+        model._cron_reconcile.assert_not_called()
+
+        with patch.object(stats, 'table_exists', return_value=True):
+            model.init()
+        model._cron_reconcile.assert_called_once()
+
+    def test_balanced_changes_skip_the_query(self):
+        model = _stats()
+        row = (1, 5, 'mobilier', 'stock', 3, 90.0)
+
+        model._apply_changes(removed=[row], added=[row])
+
+        model.env.cr.execute.assert_not_called()
+
+
+class DepartmentUnlinkTest(unittest.TestCase):
+    def test_assets_move_to_the_no_department_row(self):
+        department = hr_department.HrDepartment()
+        department.ids = [3]
+        department.env = MagicMock()
+        assets = department.env['patrimoine.asset'].sudo.return_value.search.return_value
+        assets._stats_rows.return_value = [(3, 5, 'informatique', 'stock', 2, 800.0)]
+
+        department.unlink()
+
+        department.env['patrimoine.asset'].sudo.return_value.search.assert_called_once_with(
+            [('department_id', 'in', [3])]
+        )
+        department.env['patrimoine.stats']._apply_changes.assert_called_once_with(
+            removed=[(3, 5, 'informatique', 'stock', 2, 800.0)],
+            added=[(None, 5, 'informatique', 'stock', 2, 800.0)],
+        )
+        self.assertTrue(department.unlinked)
+
+
+def _monthly(today):
+    model = stats.PatrimoineStatsMonthly()
+    model.env = MagicMock()
+    model.invalidate_model = MagicMock()
+    stats.fields.Date.context_today.return_value = today
+    stats.fields.Date.to_date.side_effect = lambda value: value
+    return model
+
+
+def _inserted_ranges(model):
+    return [
+        tuple(call.args[0].params[:2])
+        for call in model.env.cr.execute.call_args_list
+        if 'INSERT' in call.args[0].code
+    ]
+
+
+class MonthlySnapshotTest(unittest.TestCase):
+    def test_snapshot_rewrites_the_current_month(self):
+        model = _monthly(date(2024, 6, 10))
+
+        model._cron_snapshot()
+
+        delete, insert = [call.args[0] for call in model.env.cr.execute.call_args_list]
+        self.assertIn('DELETE', delete.code)
+        self.assertEqual(delete.params, [date(2024, 6, 1)])
+        self.assertIn('GROUP BY type, department_id', insert.code)
+        self.assertEqual(insert.params, [date(2024, 6, 1)])
+
+    def test_backfill_writes_one_query_per_batch_of_months(self):
+        model = _monthly(date(2024, 6, 10))
+
+        model._backfill(date(2022, 3, 15), date(2024, 5, 1), batch_months=12, auto_commit=True)
+
+        self.assertEqual(_inserted_ranges(model), [
+            (date(2022, 3, 1), date(2023, 2, 1)),
+            (date(2023, 3, 1), date(2024, 2, 1)),
+            (date(2024, 3, 1), date(2024, 5, 1)),
+        ])
+        self.assertEqual(model.env.cr.commit.call_count, 3)
+
+    def test_backfill_never_touches_the_current_month(self):
+        model = _monthly(date(2024, 6, 10))
+
+        model._backfill(date(2024, 4, 1), date(2024, 6, 1))
+
+        self.assertEqual(_inserted_ranges(model), [(date(2024, 4, 1), date(2024, 5, 1))])
+        model.env.cr.commit.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()